@@ -0,0 +1,13 @@
+"""
+Utilidades compartidas por los benchmarks.
+"""
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+def redirect_state(state_dir: Path) -> None:
+    """Apunta los archivos de estado de todos los registros a state_dir."""
+    from zoomtube.registries import set_state_dir
+
+    set_state_dir(state_dir)
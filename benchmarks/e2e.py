@@ -0,0 +1,281 @@
+"""
+Benchmark end-to-end de download.run, upload.run_batch y process.run contra
+APIs locales (benchmarks/fakes.py), sin cuentas reales de Zoom ni YouTube.
+
+Genera MP4 sintéticos con ffmpeg (lavfi: testsrc2 + tono o silencio), los
+publica como grabaciones en un Zoom falso y mide cada etapa: archivos/s, MB/s
+y el tiempo acumulado en descarga, chequeo de audio y subida. Las grabaciones
+silenciosas se descartan en la descarga, como en producción.
+
+Para process las reuniones tienen que durar al menos 10 minutos (filtro de
+process.run), por eso el default de --seconds es 600.
+
+Uso:
+    python benchmarks/e2e.py [--files 8] [--silent 0.25] [--workers 4]
+        [--latency-ms 20] [--throttle-mbps 50] [--fail-rate 0.02]
+        [--json out.json] [--baseline base.json --max-regression 0.2]
+"""
+import argparse
+import functools
+import json
+import logging
+import math
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import redirect_state  # noqa: E402
+from fakes import Faults, FakeZoom, FakeYouTube  # noqa: E402
+
+DATE = "2024-03-15"
+RECORDING_TYPE = "shared_screen_with_speaker_view"
+
+
+class _Timings:
+    """Tiempo acumulado (suma entre threads) por operación instrumentada."""
+
+    def __init__(self):
+        self.totals: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.totals.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def snapshot(self) -> dict[str, list]:
+        with self._lock:
+            return {k: list(v) for k, v in self.totals.items()}
+
+
+TIMINGS = _Timings()
+
+
+def _instrument(cls, name: str, key: str) -> None:
+    original = getattr(cls, name)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            TIMINGS.add(key, time.perf_counter() - t0)
+
+    setattr(cls, name, wrapper)
+
+
+def make_mp4(path: Path, seconds: int, silent: bool, video_kbps: int, ffmpeg: str = "ffmpeg") -> Path:
+    """Genera un MP4 sintético: video de prueba + tono de 440 Hz o silencio absoluto."""
+    audio = "anullsrc=r=44100:cl=mono" if silent else "sine=frequency=440:sample_rate=44100"
+    subprocess.run(
+        [
+            ffmpeg, "-y", "-v", "error",
+            "-f", "lavfi", "-i", "testsrc2=size=320x180:rate=5",
+            "-f", "lavfi", "-i", audio,
+            "-t", str(seconds),
+            "-c:v", "libx264", "-preset", "ultrafast", "-b:v", f"{video_kbps}k",
+            "-c:a", "aac", "-b:a", "64k",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def setup_clients(zoom: FakeZoom, youtube: FakeYouTube, chunk_mb: float) -> None:
+    """Configura zoomtube para hablar con los servidores locales."""
+    from google.oauth2.credentials import Credentials
+
+    import zoomtube.clients.zoom as zoom_module
+    import zoomtube.clients.youtube as youtube_module
+    from zoomtube.clients import get_youtube_client
+    from zoomtube import config
+
+    config.ZOOM_ACCOUNT_ID = config.ZOOM_CLIENT_ID = config.ZOOM_CLIENT_SECRET = "bench"
+    config.YOUTUBE_DAILY_QUOTA = 10 ** 9
+    config.YOUTUBE_UPLOAD_CHUNKSIZE = max(1, round(chunk_mb * 4)) * 256 * 1024
+    zoom_module.ZOOM_API_BASE = zoom.api_base
+    zoom_module.ZOOM_OAUTH_URL = zoom.oauth_url
+
+    document = youtube_module._load_discovery_document_core(config.API_SERVICE_NAME, config.API_VERSION)
+    document["rootUrl"] = youtube.url + "/"
+    get_youtube_client()._creds = Credentials(token="bench")
+
+    from zoomtube.clients.zoom import ZoomClient
+    from zoomtube.clients.youtube import YoutubeClient
+    from zoomtube.utils.audio import AudioAnalyzer
+
+    _instrument(ZoomClient, "download_recording", "descarga")
+    _instrument(AudioAnalyzer, "has_audio", "chequeo de audio")
+    _instrument(YoutubeClient, "upload_video", "subida")
+
+
+def _server_bytes(zoom: FakeZoom, youtube: FakeYouTube) -> int:
+    return zoom.stats.get("bytes_served", 0) + youtube.stats.get("bytes_received", 0)
+
+
+def run_stage(name: str, fn, zoom: FakeZoom, youtube: FakeYouTube) -> dict:
+    """Corre una etapa y devuelve sus métricas (MB = bytes que pasaron por los servidores)."""
+    before_timings = TIMINGS.snapshot()
+    before_bytes = _server_bytes(zoom, youtube)
+
+    t0 = time.perf_counter()
+    files = fn()
+    seconds = time.perf_counter() - t0
+
+    mb = (_server_bytes(zoom, youtube) - before_bytes) / 1_000_000
+    breakdown = {}
+    for key, (count, total) in TIMINGS.snapshot().items():
+        prev_count, prev_total = before_timings.get(key, [0, 0.0])
+        if count > prev_count:
+            breakdown[key] = {"calls": count - prev_count, "seconds": round(total - prev_total, 3)}
+
+    return {
+        "files": files,
+        "mb": round(mb, 2),
+        "seconds": round(seconds, 3),
+        "files_per_s": round(files / seconds, 3) if seconds else 0.0,
+        "mb_per_s": round(mb / seconds, 2) if seconds else 0.0,
+        "breakdown": breakdown,
+    }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--files", type=int, default=8, help="Cantidad de grabaciones")
+    p.add_argument("--silent", type=float, default=0.25, help="Proporción de grabaciones silenciosas")
+    p.add_argument("--seconds", type=int, default=600, help="Duración de cada MP4 sintético")
+    p.add_argument("--video-kbps", type=int, default=400, help="Bitrate de video de los MP4 sintéticos")
+    p.add_argument("--users", type=int, default=2, help="Usuarios de Zoom entre los que se reparten las reuniones")
+    p.add_argument("--workers", type=int, default=1, help="Subidas en paralelo (upload/process)")
+    p.add_argument("--chunk-mb", type=float, default=4, help="Tamaño de chunk de subida (múltiplo de 256 KiB)")
+    p.add_argument("--latency-ms", type=float, default=0, help="Latencia por request de los servidores falsos")
+    p.add_argument("--throttle-mbps", type=float, help="Ancho de banda máximo por conexión (MB/s)")
+    p.add_argument("--fail-rate", type=float, default=0, help="Proporción de requests que responden 503")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--stages", nargs="+", default=["download", "upload", "process"],
+                   choices=["download", "upload", "process"])
+    p.add_argument("--ffmpeg", default="ffmpeg")
+    p.add_argument("--json", help="Guardar los resultados en este archivo")
+    p.add_argument("--baseline", help="Resultados previos (--json) contra los que comparar")
+    p.add_argument("--max-regression", type=float, default=0.2,
+                   help="Caída máxima tolerada de archivos/s respecto del baseline (default: 0.2)")
+    p.add_argument("--verbose", action="store_true", help="Mostrar los logs de zoomtube")
+    args = p.parse_args()
+
+    from zoomtube.utils.logger import set_console_level
+    if not args.verbose:
+        set_console_level(logging.WARNING)
+
+    import zoomtube.registries  # noqa: F401  (carga los módulos de registro)
+    from zoomtube import config
+    from zoomtube.pipeline import download, upload, process
+
+    duration = max(1, math.ceil(args.seconds / 60))
+    if "process" in args.stages and duration < 10:
+        print("Aviso: process.run ignora reuniones de menos de 10 min; usar --seconds 600 o más")
+
+    faults = dict(
+        latency=args.latency_ms / 1000,
+        throttle_bps=args.throttle_mbps * 1_000_000 if args.throttle_mbps else None,
+        fail_rate=args.fail_rate,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"Generando MP4 sintéticos ({args.seconds}s, {args.video_kbps} kbps)...")
+        templates = {
+            silent: make_mp4(tmp / f"template_{'silent' if silent else 'tone'}.mp4",
+                             args.seconds, silent, args.video_kbps, args.ffmpeg)
+            for silent in (False, True)
+        }
+
+        zoom = FakeZoom(Faults(seed=args.seed, **faults)).start()
+        youtube = FakeYouTube(Faults(seed=args.seed + 1, **faults)).start()
+        try:
+            silent_count = round(args.files * args.silent)
+            for u in range(args.users):
+                zoom.add_user(f"user{u}")
+            for i in range(args.files):
+                zoom.add_meeting(
+                    user_id=f"user{i % args.users}",
+                    topic=f"Clase {i:03d}",
+                    start_time=f"{DATE}T{10 + i % 10:02d}:00:00Z",
+                    duration=duration,
+                    files={RECORDING_TYPE: templates[i < silent_count]},
+                )
+
+            setup_clients(zoom, youtube, args.chunk_mb)
+            results = {}
+
+            if "download" in args.stages or "upload" in args.stages:
+                redirect_state(tmp / "state_split")
+                dl_dir = tmp / "split"
+
+                def _download():
+                    download.run(date=DATE, min_duration=0, output_path=str(dl_dir), check_audio=True)
+                    return sum(1 for _ in (dl_dir / DATE).glob("*.mp4"))
+
+                results["download"] = run_stage("download", _download, zoom, youtube)
+
+                if "upload" in args.stages:
+                    results["upload"] = run_stage(
+                        "upload",
+                        lambda: len(upload.run_batch(folder=str(dl_dir / DATE), workers=args.workers)),
+                        zoom, youtube,
+                    )
+                if "download" not in args.stages:
+                    del results["download"]
+
+            if "process" in args.stages:
+                redirect_state(tmp / "state_process")
+                config.RECORDINGS_BASE_PATH = str(tmp / "process")
+
+                def _process():
+                    process.run(date=DATE, check_audio=True, workers=args.workers)
+                    return sum(
+                        1 for u in zoomtube.registries.uploads.get_all_uploads() if u["status"] == "success"
+                    )
+
+                results["process"] = run_stage("process", _process, zoom, youtube)
+
+            server_stats = {"zoom": dict(zoom.stats), "youtube": dict(youtube.stats)}
+        finally:
+            zoom.stop()
+            youtube.stop()
+
+    print(f"\n{'etapa':<10} {'archivos':>8} {'MB':>8} {'s':>8} {'arch/s':>8} {'MB/s':>8}  desglose (tiempo acumulado)")
+    for stage, r in results.items():
+        breakdown = ", ".join(f"{k} {v['seconds']:.2f}s/{v['calls']}" for k, v in r["breakdown"].items())
+        print(f"{stage:<10} {r['files']:>8} {r['mb']:>8.1f} {r['seconds']:>8.2f} "
+              f"{r['files_per_s']:>8.2f} {r['mb_per_s']:>8.1f}  {breakdown}")
+    print(f"\nservidores: {json.dumps(server_stats)}")
+
+    report = {"args": vars(args), "results": results, "servers": server_stats}
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    failed = False
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        for stage, r in results.items():
+            base = baseline.get(stage)
+            if not base or not base["files_per_s"]:
+                continue
+            change = r["files_per_s"] / base["files_per_s"] - 1
+            mark = "✗" if change < -args.max_regression else "✓"
+            print(f"  {mark} {stage}: {base['files_per_s']:.2f} → {r['files_per_s']:.2f} arch/s ({change:+.0%})")
+            failed |= mark == "✗"
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Benchmark de generación de embeds (zoomtube embeds) sobre un catálogo sintético.
+
+Arma un uploads.json con --videos subidas en un directorio temporal, hace una
+generación completa y después simula una corrida nocturna (--new subidas
+nuevas) para medir la actualización incremental.
+
+Uso:
+    python benchmarks/embeds.py [--videos 20000] [--new 50] [--budget-ms 500]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import redirect_state  # noqa: E402
+from zoomtube.pipeline import embeds  # noqa: E402
+
+
+def _records(start: int, count: int) -> list[dict]:
+    return [
+        {
+            "local_path": f"/recordings/2024-01-01/clase_{i}__shared_screen_with_speaker_view.mp4",
+            "youtube_id": f"vid{i:08d}",
+            "title": f"Clase {i} – Álgebra & <Geometría>",
+            "uploaded_at": "2024-01-01T10:00:00",
+            "status": "success" if i % 20 else "failed",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _timed(fn, *args, **kwargs) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--videos", type=int, default=20000, help="Tamaño del catálogo inicial")
+    p.add_argument("--new", type=int, default=50, help="Subidas nuevas de la corrida incremental")
+    p.add_argument("--budget-ms", type=float, help="Falla si la actualización incremental supera este tiempo")
+    args = p.parse_args()
+
+    uploads_mod = sys.modules["zoomtube.registries.uploads"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        redirect_state(tmp)
+        json_path, html_path = tmp / "iframes.json", tmp / "iframes.html"
+
+        records = _records(0, args.videos)
+        uploads_mod.UPLOADS_FILE.write_text(json.dumps(records), encoding="utf-8")
+        full_ms, full_n = _timed(embeds.run, json_path, html_path, full=True)
+
+        noop_ms, _ = _timed(embeds.run, json_path, html_path)
+
+        records += _records(args.videos, args.new)
+        uploads_mod.UPLOADS_FILE.write_text(json.dumps(records), encoding="utf-8")
+        inc_ms, inc_n = _timed(embeds.run, json_path, html_path)
+
+        # Sanity check: el incremental debe dejar lo mismo que una generación completa
+        incremental_output = (json_path.read_bytes(), html_path.read_bytes())
+        embeds.run(json_path, html_path, full=True)
+        consistent = incremental_output == (json_path.read_bytes(), html_path.read_bytes())
+        json.loads(incremental_output[0])
+
+    print(f"{'completa':<12} {full_ms:>8.1f} ms  ({full_n} embeds)")
+    print(f"{'sin cambios':<12} {noop_ms:>8.1f} ms")
+    print(f"{'incremental':<12} {inc_ms:>8.1f} ms  ({inc_n} embeds nuevos)")
+
+    failed = False
+    if not consistent:
+        print("  ✗ la salida incremental difiere de la generación completa")
+        failed = True
+    if args.budget_ms is not None and inc_ms > args.budget_ms:
+        print(f"  ✗ la actualización incremental supera el presupuesto de {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
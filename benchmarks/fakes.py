@@ -0,0 +1,341 @@
+"""
+Servidores locales que imitan las APIs de Zoom y YouTube para los benchmarks.
+
+- FakeZoom: OAuth (account_credentials), /users y /users/{id}/recordings
+  paginados con next_page_token (recordings filtrado por from/to), y
+  descarga de archivos con soporte de Range.
+- FakeYouTube: endpoint de subida resumable (POST de inicio + PUT por chunk,
+  consulta de offset con "bytes */N"), como lo usa googleapiclient.
+
+Los dos aceptan Faults para inyectar latencia, límite de ancho de banda por
+conexión y una proporción de respuestas 503.
+"""
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+_BLOCK = 64 * 1024
+
+
+@dataclass
+class Faults:
+    """
+    Fallas inyectables:
+    - latency: segundos de espera antes de cada respuesta
+    - throttle_bps: bytes/s máximos por conexión al transferir archivos/chunks
+    - fail_rate: proporción de requests que responden 503
+    """
+    latency: float = 0.0
+    throttle_bps: Optional[float] = None
+    fail_rate: float = 0.0
+    seed: int = 0
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def should_fail(self) -> bool:
+        if not self.fail_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.fail_rate
+
+    def throttle(self, nbytes: int, started: float, sent: int) -> None:
+        """Duerme lo necesario para que `sent` bytes desde `started` no superen throttle_bps."""
+        if self.throttle_bps:
+            wait = sent / self.throttle_bps - (time.monotonic() - started)
+            if wait > 0:
+                time.sleep(wait)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def faults(self) -> Faults:
+        return self.server.faults
+
+    def _read_body(self) -> bytes:
+        n = int(self.headers.get("Content-Length", 0))
+        started, data = time.monotonic(), bytearray()
+        while len(data) < n:
+            block = self.rfile.read(min(_BLOCK, n - len(data)))
+            if not block:
+                break
+            data += block
+            self.faults.throttle(len(block), started, len(data))
+        return bytes(data)
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_json(self, data, status: int = 200) -> None:
+        self._send(status, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"})
+
+    def _inject(self) -> bool:
+        """Aplica latencia/fallas. Devuelve True si ya se respondió con un error."""
+        if self.faults.latency:
+            time.sleep(self.faults.latency)
+        if self.faults.should_fail():
+            self.server.count("injected_failures")
+            self._send_json({"error": {"code": 503, "message": "backendError",
+                                       "errors": [{"reason": "backendError"}]}}, 503)
+            return True
+        return False
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, faults: Optional[Faults]):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.faults = faults or Faults()
+        self.stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> "_Server":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+# =========================
+# Zoom
+# =========================
+
+class _ZoomHandler(_Handler):
+    def do_POST(self):
+        self._read_body()
+        if urlparse(self.path).path == "/oauth/token":
+            self.server.count("token")
+            return self._send_json({"access_token": "fake-zoom-token", "token_type": "bearer", "expires_in": 3600})
+        self._send_json({"message": "not found"}, 404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send_json({"code": 124, "message": "Invalid access token."}, 401)
+        if self._inject():
+            return
+
+        if url.path == "/v2/users":
+            return self._paginate(self.server.users, "users", query)
+
+        m = re.fullmatch(r"/v2/users/([^/]+)/recordings", url.path)
+        if m:
+            meetings = [
+                meeting for meeting in self.server.meetings.get(m.group(1), [])
+                if query.get("from", "") <= meeting["start_time"][:10] <= query.get("to", "9999")
+            ]
+            return self._paginate(meetings, "meetings", query)
+
+        m = re.fullmatch(r"/rec/(.+)", url.path)
+        if m and m.group(1) in self.server.files:
+            return self._send_file(self.server.files[m.group(1)])
+
+        self._send_json({"message": "not found"}, 404)
+
+    def _paginate(self, items: List[dict], key: str, query: Dict[str, str]) -> None:
+        self.server.count(f"list_{key}")
+        page_size = min(int(query.get("page_size", 30)), 300)
+        start = int(query.get("next_page_token") or 0)
+        page = items[start:start + page_size]
+        next_start = start + page_size
+        self._send_json({
+            "page_size": page_size,
+            "total_records": len(items),
+            "next_page_token": str(next_start) if next_start < len(items) else "",
+            key: page,
+        })
+
+    def _send_file(self, path: Path) -> None:
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        status = 200
+        headers = {"Content-Type": "video/mp4", "Accept-Ranges": "bytes"}
+
+        m = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if m:
+            if m.group(1):
+                start = int(m.group(1))
+                end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+            else:
+                start = max(size - int(m.group(2)), 0)
+            if start > end:
+                return self._send(416, headers={"Content-Range": f"bytes */{size}"})
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        length = end - start + 1
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+        started, sent = time.monotonic(), 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            while sent < length:
+                block = f.read(min(_BLOCK, length - sent))
+                if not block:
+                    break
+                self.wfile.write(block)
+                sent += len(block)
+                self.faults.throttle(len(block), started, sent)
+        self.server.count("files_served")
+        self.server.count("bytes_served", sent)
+
+
+class FakeZoom(_Server):
+    """
+    API de Zoom local. add_meeting() registra una reunión con sus archivos;
+    los download_url apuntan a este mismo servidor.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None):
+        super().__init__(_ZoomHandler, faults)
+        self.users: List[dict] = []
+        self.meetings: Dict[str, List[dict]] = {}
+        self.files: Dict[str, Path] = {}
+
+    @property
+    def api_base(self) -> str:
+        return f"{self.url}/v2"
+
+    @property
+    def oauth_url(self) -> str:
+        return f"{self.url}/oauth/token"
+
+    def add_user(self, user_id: str) -> None:
+        self.users.append({"id": user_id, "email": f"{user_id}@example.com", "type": 1})
+        self.meetings.setdefault(user_id, [])
+
+    def add_meeting(
+        self,
+        user_id: str,
+        topic: str,
+        start_time: str,
+        duration: int,
+        files: Dict[str, Path],
+        status: str = "completed",
+    ) -> dict:
+        """
+        files: recording_type → archivo local a servir.
+        status: estado de los archivos en Zoom ("processing" hasta que terminan).
+        Devuelve la reunión, para poder cambiarle el estado después.
+        """
+        start = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
+        recording_end = (start + timedelta(minutes=duration)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        meeting_id = sum(len(m) for m in self.meetings.values()) + 1
+        recording_files = []
+        for recording_type, path in files.items():
+            name = f"{meeting_id}_{recording_type}.mp4"
+            self.files[name] = Path(path)
+            recording_files.append({
+                "recording_type": recording_type,
+                "file_type": "MP4",
+                "file_size": Path(path).stat().st_size,
+                "download_url": f"{self.url}/rec/{name}",
+                "recording_start": start_time,
+                "recording_end": recording_end,
+                "status": status,
+            })
+        meeting = {
+            "id": meeting_id,
+            "topic": topic,
+            "start_time": start_time,
+            "duration": duration,
+            "recording_files": recording_files,
+        }
+        self.meetings[user_id].append(meeting)
+        return meeting
+
+
+# =========================
+# YouTube
+# =========================
+
+class _YouTubeHandler(_Handler):
+    def do_POST(self):
+        self._read_body()
+        url = urlparse(self.path)
+        if url.path != "/upload/youtube/v3/videos":
+            return self._send_json({"error": {"code": 404, "message": "not found"}}, 404)
+        if self._inject():
+            return
+        session_id = self.server.new_session()
+        self._send(200, headers={"Location": f"{self.server.url}/session/{session_id}"})
+
+    def do_PUT(self):
+        body = self._read_body()
+        session_id = self.path.rsplit("/", 1)[-1]
+        if session_id not in self.server.sessions:
+            return self._send_json({"error": {"code": 404, "message": "session not found"}}, 404)
+        if body and self._inject():
+            return
+
+        content_range = self.headers.get("Content-Range", "")
+        total = int(content_range.rsplit("/", 1)[-1]) if "/" in content_range else len(body)
+        m = re.match(r"bytes (\d+)-(\d+)/", content_range)
+        with self.server.lock:
+            if m and int(m.group(1)) == self.server.sessions[session_id]:
+                self.server.sessions[session_id] = int(m.group(2)) + 1
+            received = self.server.sessions[session_id]
+        self.server.count("bytes_received", len(body))
+
+        if received >= total:
+            self.server.count("videos")
+            return self._send_json({"id": f"fake{session_id}", "kind": "youtube#video"})
+        headers = {"Range": f"bytes=0-{received - 1}"} if received else {}
+        self._send(308, headers=headers)
+
+
+class FakeYouTube(_Server):
+    """
+    Endpoint de subida resumable local. Para usarlo, el documento de discovery
+    tiene que apuntar rootUrl a self.url + "/".
+    """
+
+    def __init__(self, faults: Optional[Faults] = None):
+        super().__init__(_YouTubeHandler, faults)
+        self.sessions: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def new_session(self) -> str:
+        with self.lock:
+            session_id = str(len(self.sessions))
+            self.sessions[session_id] = 0
+        self.count("sessions")
+        return session_id
@@ -0,0 +1,117 @@
+"""
+Benchmark de tiempo de import por subcomando (python -X importtime).
+
+Para cada subcomando importa zoomtube.cli y los módulos que carga su rama
+del dispatch, en un intérprete limpio, y reporta el tiempo total de import
+y los módulos más caros. Falla (exit 1) si un subcomando importa librerías
+que no usa (ej: "list" no debe cargar googleapiclient ni requests) o si se
+pasa del presupuesto indicado con --budget-ms.
+
+Uso:
+    python benchmarks/import_time.py [--repeat 5] [--budget-ms 150] [--top 5]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+# Módulos que importa cada subcomando (espejo del dispatch de cli.main)
+SUBCOMMANDS = {
+    "list": ["zoomtube.pipeline.listing"],
+    "optimize": ["zoomtube.pipeline.optimize"],
+    "download": ["zoomtube.pipeline.download"],
+    "upload": ["zoomtube.pipeline.upload"],
+    "process": ["zoomtube.pipeline.process"],
+    "embeds": ["zoomtube.pipeline.embeds"],
+    "watch": ["zoomtube.pipeline.watch"],
+    "serve": ["zoomtube.pipeline.serve"],
+    "jobs": ["zoomtube.pipeline.jobs"],
+}
+
+# Librerías pesadas que cada subcomando NO debe importar al arrancar
+HEAVY = ["googleapiclient", "google_auth_oauthlib", "google.auth", "httplib2", "requests", "dotenv"]
+FORBIDDEN = {
+    "list": HEAVY,
+    "optimize": HEAVY,
+    "download": HEAVY,
+    "upload": HEAVY,
+    "process": HEAVY,
+    "embeds": HEAVY,
+    "watch": HEAVY,
+    "serve": HEAVY,
+    "jobs": HEAVY,
+}
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _measure(modules: list[str]) -> tuple[int, dict[str, int], set[str]]:
+    """
+    Corre un intérprete nuevo con -X importtime y devuelve
+    (total_us, self_us por módulo, módulos importados).
+    """
+    code = "import zoomtube.cli\n" + "".join(f"import {m}\n" for m in modules)
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR), PYTHONDONTWRITEBYTECODE="")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    self_us: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            self_us[m.group(4)] = int(m.group(1))
+
+    # Solo contamos lo que cuelga de zoomtube.cli en adelante (no el arranque del intérprete)
+    names = list(self_us)
+    first = next((i for i, n in enumerate(names) if n.startswith("zoomtube")), 0)
+    relevant = {n: self_us[n] for n in names[first:]}
+    return sum(relevant.values()), relevant, set(relevant)
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--repeat", type=int, default=5, help="Corridas por subcomando (se reporta la mediana)")
+    p.add_argument("--budget-ms", type=float, help="Falla si algún subcomando supera este tiempo")
+    p.add_argument("--top", type=int, default=5, help="Módulos más caros a mostrar")
+    args = p.parse_args()
+
+    failed = False
+    print(f"{'subcomando':<10} {'mediana ms':>10} {'módulos':>8}  más caros")
+    for cmd, modules in SUBCOMMANDS.items():
+        runs = [_measure(modules) for _ in range(args.repeat)]
+        totals = [r[0] for r in runs]
+        median_ms = statistics.median(totals) / 1000
+        _, self_us, imported = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+        top = sorted(self_us.items(), key=lambda kv: kv[1], reverse=True)[: args.top]
+        top_str = ", ".join(f"{name} {us / 1000:.1f}" for name, us in top)
+        print(f"{cmd:<10} {median_ms:>10.1f} {len(imported):>8}  {top_str}")
+
+        leaked = sorted(
+            name for name in imported
+            if any(name == f or name.startswith(f + ".") for f in FORBIDDEN.get(cmd, []))
+        )
+        if leaked:
+            roots = sorted({name.split(".")[0] for name in leaked})
+            print(f"  ✗ {cmd} importa librerías que no usa al arrancar: {', '.join(roots)}")
+            failed = True
+        if args.budget_ms is not None and median_ms > args.budget_ms:
+            print(f"  ✗ {cmd} supera el presupuesto de {args.budget_ms:.0f} ms")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
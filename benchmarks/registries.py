@@ -0,0 +1,261 @@
+"""
+Microbenchmark de los registros (downloads, uploads, recordings) con 1k, 10k
+y 100k registros sintéticos.
+
+Para cada tamaño siembra el estado en un directorio temporal, mide cada
+operación del registro (ops/s y ms por operación) y su pico de memoria
+(tracemalloc, en una corrida aparte), y mide los comandos "zoomtube list"
+en un intérprete nuevo (tiempo total y RSS máximo), con y sin filtros.
+
+El backend se elige con --backend; un backend nuevo solo tiene que sembrar
+sus datos y exponer las mismas operaciones (ver BACKENDS).
+
+Uso:
+    python benchmarks/registries.py [--sizes 1000 10000 100000] [--ops 20]
+        [--max-seconds 3] [--json out.json] [--baseline base.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import SRC_DIR, redirect_state  # noqa: E402
+
+RECORDING_TYPES = ["shared_screen_with_speaker_view", "gallery_view", "audio_only"]
+
+
+# =========================
+# Backend JSON (registros actuales)
+# =========================
+
+def _local_path(i: int) -> str:
+    return f"/recordings/2024-01-{i % 28 + 1:02d}/Clase_{i}__shared_screen_with_speaker_view.mp4"
+
+
+def _seed_json(state_dir: Path, n: int) -> None:
+    """Escribe n registros sintéticos en cada archivo, con el mismo formato que _save."""
+    downloads = [
+        {
+            "local_path": _local_path(i),
+            "topic": f"Clase {i}",
+            "duration": 60,
+            "downloaded_at": "2024-01-01T10:00:00",
+            "status": "success",
+            "metrics": {"direction": "download", "bytes": 150_000_000, "avg_mbps": 20.0},
+        }
+        for i in range(n)
+    ]
+    uploads = [
+        {
+            "local_path": _local_path(i),
+            "youtube_id": f"vid{i:08d}",
+            "title": f"Clase {i}",
+            "uploaded_at": "2024-01-01T11:00:00",
+            "status": "success" if i % 10 else "failed",
+            "metrics": {"direction": "upload", "bytes": 150_000_000, "avg_mbps": 8.0},
+        }
+        for i in range(n)
+    ]
+    recordings = [
+        {
+            "meeting_id": i,
+            "topic": f"Clase {i}",
+            "start_time": "2024-01-01T10:00:00Z",
+            "duration": 60,
+            "files": [{"type": t, "status": "available"} for t in RECORDING_TYPES],
+            "registered_at": "2024-01-01T10:00:00",
+        }
+        for i in range(n)
+    ]
+    for name, data in (("downloads", downloads), ("uploads", uploads), ("recordings", recordings)):
+        with open(state_dir / f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _json_ops(n: int) -> Dict[str, Callable[[int], object]]:
+    """Operaciones a medir; cada una recibe el número de iteración."""
+    from zoomtube.registries import downloads, uploads, recordings
+
+    rng = random.Random(n)
+    return {
+        "register_download": lambda k: downloads.register_download(
+            _local_path(n + k), f"Nueva {k}", 60, "success"
+        ),
+        "register_download (update)": lambda k: downloads.register_download(
+            _local_path(rng.randrange(n)), "Clase", 60, "success"
+        ),
+        "register_upload": lambda k: uploads.register_upload(
+            _local_path(n + k), f"new{k:08d}", f"Nueva {k}", "success"
+        ),
+        "update_file_status": lambda k: recordings.update_file_status(
+            rng.randrange(n), "gallery_view", "downloaded"
+        ),
+        "is_uploaded (hit)": lambda k: uploads.is_uploaded(_local_path(rng.randrange(n))),
+        "is_uploaded (miss)": lambda k: uploads.is_uploaded("/no/existe.mp4"),
+        "get_all_downloads": lambda k: downloads.get_all_downloads(),
+        "get_all_uploads": lambda k: uploads.get_all_uploads(),
+        "get_all_recordings": lambda k: recordings.get_all_recordings(),
+    }
+
+
+BACKENDS = {
+    "json": {"seed": _seed_json, "ops": _json_ops},
+}
+
+
+# =========================
+# Medición
+# =========================
+
+def _time_op(op: Callable[[int], object], max_ops: int, max_seconds: float) -> tuple[int, float]:
+    """Corre op hasta max_ops veces o max_seconds segundos. Devuelve (ops, segundos)."""
+    done, t0 = 0, time.perf_counter()
+    while done < max_ops:
+        op(done)
+        done += 1
+        if time.perf_counter() - t0 >= max_seconds:
+            break
+    return done, time.perf_counter() - t0
+
+
+def _peak_memory(op: Callable[[int], object]) -> float:
+    """Pico de memoria (MB) de una sola llamada, medido con tracemalloc."""
+    tracemalloc.start()
+    try:
+        op(10 ** 9)
+        return tracemalloc.get_traced_memory()[1] / 1_000_000
+    finally:
+        tracemalloc.stop()
+
+
+_LIST_CODE = """
+import contextlib, io, resource, sys, time
+sys.path.insert(0, {bench_dir!r})
+from common import redirect_state
+from pathlib import Path
+redirect_state(Path({state_dir!r}))
+sys.argv = ["zoomtube", "--quiet", "list", *{argv!r}]
+from zoomtube import cli
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    cli.main()
+elapsed = time.perf_counter() - t0
+try:
+    # VmHWM es del proceso actual; ru_maxrss hereda el pico del padre a través de fork/exec
+    with open("/proc/self/status") as f:
+        maxrss_kb = next(int(l.split()[1]) for l in f if l.startswith("VmHWM:"))
+except OSError:
+    maxrss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stderr.write(f"BENCH {{elapsed}} {{maxrss_kb}}\\n")
+"""
+
+
+# Variantes de "zoomtube list" a medir (sin filtros, filtradas y resumen)
+LIST_COMMANDS = [
+    ["downloads"],
+    ["uploads"],
+    ["recordings"],
+    ["uploads", "--status", "failed", "--since", "2024-01-01", "--format", "json"],
+    ["downloads", "--topic", "clase 1", "--limit", "100", "--format", "csv"],
+    ["uploads", "--summary"],
+]
+
+
+def _time_list(state_dir: Path, argv: list[str]) -> tuple[float, float]:
+    """Corre 'zoomtube list <argv>' en un proceso nuevo. Devuelve (segundos, RSS máx en MB)."""
+    code = _LIST_CODE.format(bench_dir=str(Path(__file__).resolve().parent), state_dir=str(state_dir), argv=argv)
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    line = next(l for l in result.stderr.splitlines() if l.startswith("BENCH "))
+    _, elapsed, maxrss_kb = line.split()
+    return float(elapsed), int(maxrss_kb) / 1024
+
+
+def bench_size(backend: dict, n: int, max_ops: int, max_seconds: float, with_list: bool) -> list[dict]:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        state_dir = Path(tmp)
+        redirect_state(state_dir)
+        backend["seed"](state_dir, n)
+
+        for name, op in backend["ops"](n).items():
+            peak_mb = _peak_memory(op)
+            ops, seconds = _time_op(op, max_ops, max_seconds)
+            rows.append({
+                "records": n,
+                "op": name,
+                "ops": ops,
+                "ops_per_s": round(ops / seconds, 2),
+                "ms_per_op": round(seconds / ops * 1000, 3),
+                "peak_mb": round(peak_mb, 1),
+            })
+
+        if with_list:
+            for argv in LIST_COMMANDS:
+                seconds, rss_mb = _time_list(state_dir, argv)
+                rows.append({
+                    "records": n,
+                    "op": f"list {' '.join(argv)}",
+                    "ops": 1,
+                    "ops_per_s": round(1 / seconds, 2),
+                    "ms_per_op": round(seconds * 1000, 3),
+                    "peak_mb": round(rss_mb, 1),
+                })
+    return rows
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--backend", choices=sorted(BACKENDS), default="json")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.add_argument("--ops", type=int, default=20, help="Máximo de llamadas por operación")
+    p.add_argument("--max-seconds", type=float, default=3.0, help="Tiempo máximo por operación")
+    p.add_argument("--no-list", action="store_true", help="No medir los comandos 'zoomtube list'")
+    p.add_argument("--json", help="Guardar los resultados en este archivo")
+    p.add_argument("--baseline", help="Resultados previos (--json) contra los que comparar")
+    p.add_argument("--max-regression", type=float, default=0.5,
+                   help="Aumento máximo tolerado de ms/op respecto del baseline (default: 0.5)")
+    args = p.parse_args()
+
+    from zoomtube.utils.logger import logger
+    logger.disabled = True   # cada escritura loguea; no medir el logging
+
+    backend = BACKENDS[args.backend]
+    rows = []
+    print(f"{'registros':>9}  {'operación':<62} {'ops':>5} {'ops/s':>10} {'ms/op':>10} {'pico MB':>8}")
+    for n in args.sizes:
+        for row in bench_size(backend, n, args.ops, args.max_seconds, not args.no_list):
+            rows.append(row)
+            print(f"{row['records']:>9}  {row['op']:<62} {row['ops']:>5} {row['ops_per_s']:>10.1f} "
+                  f"{row['ms_per_op']:>10.2f} {row['peak_mb']:>8.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"backend": args.backend, "results": rows}, indent=2), encoding="utf-8")
+
+    failed = False
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        base_by_key = {(r["records"], r["op"]): r for r in baseline}
+        for row in rows:
+            base = base_by_key.get((row["records"], row["op"]))
+            if not base:
+                continue
+            change = row["ms_per_op"] / base["ms_per_op"] - 1
+            if change > args.max_regression:
+                print(f"  ✗ {row['op']} ({row['records']}): {base['ms_per_op']:.2f} → {row['ms_per_op']:.2f} ms/op ({change:+.0%})")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
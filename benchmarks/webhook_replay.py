@@ -0,0 +1,211 @@
+"""
+Replayer de eventos de webhook de Zoom para `zoomtube serve`.
+
+Sin --url arma todo en local: Zoom y YouTube falsos (benchmarks/fakes.py),
+MP4 sintéticos y el receptor de zoomtube serve en un puerto libre. Manda la
+validación de URL, un evento con firma inválida, --meetings eventos
+recording.completed firmados (más un reintento duplicado) y mide la latencia
+de cada reunión desde el evento hasta que queda registrada la subida (p50,
+p95, máx), verificando que no se listó ningún usuario ni grabación.
+
+Con --url reenvía los eventos de --events (JSON: un evento o una lista, o
+JSON Lines) a un `zoomtube serve` que ya esté corriendo, firmándolos con
+--secret y timestamps actuales, y muestra la respuesta de cada uno.
+
+Uso:
+    python benchmarks/webhook_replay.py [--meetings 8] [--workers 2] [--seconds 600]
+    python benchmarks/webhook_replay.py --url http://127.0.0.1:8080/zoom/webhook \\
+        --secret TOKEN --events eventos.json
+"""
+import argparse
+import json
+import logging
+import math
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import redirect_state  # noqa: E402
+from fakes import FakeZoom, FakeYouTube  # noqa: E402
+
+DATE = "2024-03-15"
+RECORDING_TYPE = "shared_screen_with_speaker_view"
+
+
+def post(url: str, body: bytes, headers: dict) -> tuple[int, dict]:
+    request = urllib.request.Request(url, data=body, method="POST",
+                                     headers={"Content-Type": "application/json", **headers})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return resp.status, json.loads(resp.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def send_event(url: str, secret: str, event: dict, bad_signature: bool = False) -> tuple[int, dict]:
+    """Firma el evento con un timestamp actual y lo manda."""
+    from zoomtube.pipeline.serve import signature_headers
+
+    body = json.dumps(event).encode("utf-8")
+    headers = signature_headers("otro-secret" if bad_signature else secret, body)
+    return post(url, body, headers)
+
+
+def load_events(path: Path) -> list[dict]:
+    text = path.read_text(encoding="utf-8").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return data if isinstance(data, list) else [data]
+
+
+def recording_completed(meeting: dict) -> dict:
+    """Evento recording.completed de Zoom para una reunión del Zoom falso."""
+    return {
+        "event": "recording.completed",
+        "event_ts": int(time.time() * 1000),
+        "payload": {
+            "account_id": "bench",
+            "object": {**meeting, "uuid": f"uuid-{meeting['id']}", "host_id": "user0"},
+        },
+        "download_token": "bench",
+    }
+
+
+def replay(args) -> int:
+    """Reenvía eventos grabados a un zoomtube serve externo."""
+    failed = False
+    for event in load_events(Path(args.events)):
+        status, response = send_event(args.url, args.secret, event)
+        print(f"{status}  {event.get('event')}  {response}")
+        failed |= status >= 400
+    return 1 if failed else 0
+
+
+def local(args) -> int:
+    """Levanta Zoom/YouTube falsos y el receptor, y mide la latencia evento → YouTube."""
+    from zoomtube.utils.logger import set_console_level
+    if not args.verbose:
+        set_console_level(logging.WARNING)
+
+    import zoomtube.registries  # noqa: F401  (carga los módulos de registro)
+    from zoomtube import config
+    from zoomtube.clients import get_zoom_client
+    from zoomtube.pipeline import serve
+    from zoomtube.utils.audio import AudioAnalyzer
+    import e2e
+
+    secret = "bench-secret"
+    duration = max(10, math.ceil(args.seconds / 60))
+    latencies: dict[str, float] = {}
+    sent_at: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        redirect_state(tmp / "state")
+        config.RECORDINGS_BASE_PATH = str(tmp / "recordings")
+
+        print(f"Generando MP4 sintético ({args.seconds}s)...")
+        mp4 = e2e.make_mp4(tmp / "template.mp4", args.seconds, False, args.video_kbps, args.ffmpeg)
+
+        zoom, youtube = FakeZoom().start(), FakeYouTube().start()
+        try:
+            e2e.setup_clients(zoom, youtube, args.chunk_mb)
+            zoom.add_user("user0")
+            meetings = [
+                zoom.add_meeting("user0", f"Clase {i}", f"{DATE}T{8 + i % 12:02d}:00:00Z", duration,
+                                 {RECORDING_TYPE: mp4})
+                for i in range(args.meetings)
+            ]
+
+            zoom_client = get_zoom_client()
+            audio_analyzer = AudioAnalyzer()
+
+            def process(meeting: dict) -> None:
+                serve.process_meeting(meeting, zoom_client, audio_analyzer, check_audio=not args.no_check_audio)
+                latencies[meeting["uuid"]] = time.perf_counter() - sent_at[meeting["uuid"]]
+
+            receiver = serve.WebhookReceiver(secret, process, workers=args.workers)
+            server = serve._make_server(receiver, "127.0.0.1", 0)
+            receiver.start_workers()
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f"http://127.0.0.1:{server.server_port}/zoom/webhook"
+
+            checks = []
+            status, response = send_event(url, secret, {"event": "endpoint.url_validation",
+                                                        "payload": {"plainToken": "abc"}})
+            checks.append(("validación de URL", status == 200
+                           and response.get("encryptedToken") == serve.sign(secret, "abc")))
+            status, _ = send_event(url, secret, recording_completed(meetings[0]), bad_signature=True)
+            checks.append(("firma inválida → 401", status == 401))
+
+            t0 = time.perf_counter()
+            for meeting in meetings:
+                event = recording_completed(meeting)
+                sent_at[event["payload"]["object"]["uuid"]] = time.perf_counter()
+                status, _ = send_event(url, secret, event)
+                checks.append((f"evento {meeting['id']} encolado", status == 200))
+            status, response = send_event(url, secret, recording_completed(meetings[0]))
+            checks.append(("reintento duplicado descartado", response.get("message") == "duplicate"))
+
+            receiver.join()
+            total = time.perf_counter() - t0
+            receiver.stop_workers()
+            server.shutdown()
+            server.server_close()
+            checks.append(("sin listados de usuarios/grabaciones",
+                           not zoom.stats.get("list_users") and not zoom.stats.get("list_meetings")))
+            uploaded = [u for u in zoomtube.registries.uploads.get_all_uploads() if u["status"] == "success"]
+            checks.append(("todas las reuniones subidas", len(uploaded) == args.meetings))
+        finally:
+            zoom.stop()
+            youtube.stop()
+
+    values = sorted(latencies.values())
+    print(f"{'reuniones':<12} {len(values)}  ({args.workers} worker(s))")
+    print(f"{'total':<12} {total:8.2f} s   ({len(values) / total:.2f} reuniones/s)")
+    if values:
+        p95 = values[min(len(values) - 1, math.ceil(len(values) * 0.95) - 1)]
+        print(f"{'latencia':<12} p50 {statistics.median(values):.2f} s · p95 {p95:.2f} s · máx {values[-1]:.2f} s")
+
+    failed = False
+    for name, ok in checks:
+        if not ok:
+            print(f"  ✗ {name}")
+            failed = True
+    return 1 if failed else 0
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--url", help="Receptor de un zoomtube serve ya corriendo (modo replay)")
+    p.add_argument("--secret", help="ZOOM_WEBHOOK_SECRET_TOKEN del receptor (modo replay)")
+    p.add_argument("--events", help="Eventos a reenviar (modo replay)")
+    p.add_argument("--meetings", type=int, default=8, help="Eventos recording.completed a mandar")
+    p.add_argument("--workers", type=int, default=2, help="Reuniones procesadas en paralelo")
+    p.add_argument("--seconds", type=int, default=600, help="Duración del MP4 sintético")
+    p.add_argument("--video-kbps", type=int, default=400)
+    p.add_argument("--chunk-mb", type=float, default=4, help="Tamaño de chunk de subida")
+    p.add_argument("--no-check-audio", action="store_true")
+    p.add_argument("--ffmpeg", default="ffmpeg")
+    p.add_argument("--verbose", action="store_true", help="Mostrar los logs de zoomtube")
+    args = p.parse_args()
+
+    if args.url:
+        if not args.secret or not args.events:
+            p.error("--url requiere --secret y --events")
+        return replay(args)
+    return local(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
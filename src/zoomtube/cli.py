@@ -1,17 +1,425 @@
 from argparse import ArgumentParser
-from zoomtube.pipeline import download, upload, process
+from pathlib import Path
 import zoomtube.constants as constants
-from zoomtube.registries import recordings, uploads
 from zoomtube.utils.logger import get_logger
-from zoomtube.registries import downloads  # <-- agregado
+
+# Los pipelines, registros y clientes se importan dentro de cada rama del
+# dispatch: así cada subcomando carga solo lo que usa (ver benchmarks/import_time.py)
+
+
+def _add_optimize_args(parser, standalone: bool = False):
+    """Flags de optimización de video (remux fast-start / recodificación)."""
+    if not standalone:
+        parser.add_argument("--optimize", action="store_true",
+                            help="Optimizar los videos antes de subirlos (remux fast-start)")
+    parser.add_argument("--target-bitrate", type=int,
+                        help="Recodificar con tope de bitrate de video en kbps")
+    parser.add_argument("--max-height", type=int,
+                        help="Recodificar con tope de resolución vertical (ej: 720)")
+    parser.add_argument("--preset", default=constants.DEFAULT_OPTIMIZE_PRESET,
+                        help="Preset de libx264 al recodificar (default: veryfast)")
+    parser.add_argument("--min-saving", type=float, default=constants.DEFAULT_OPTIMIZE_MIN_SAVING,
+                        help="Ahorro estimado mínimo para recodificar (default: 0.10)")
+    if standalone:
+        parser.add_argument("--workers", type=int,
+                            help="Cantidad de encoders en paralelo (default: núcleos disponibles)")
+
+
+def _build_optimizer(args):
+    if not getattr(args, "optimize", True):
+        return None
+    from zoomtube.utils.media import MediaOptimizer
+
+    return MediaOptimizer(
+        target_bitrate_kbps=args.target_bitrate,
+        max_height=args.max_height,
+        preset=args.preset,
+        min_saving=args.min_saving,
+    )
+
+
+def _add_order_arg(parser):
+    parser.add_argument("--order", choices=constants.ORDER_POLICIES,
+                        help="Orden de las transferencias: los más grandes, los más chicos o los más "
+                             "recientes primero, o el de la API (default: TRANSFER_ORDER o largest)")
+
+
+def _add_adaptive_args(parser):
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Ajustar las transferencias en paralelo durante la corrida (AIMD sobre "
+                             "throughput, errores y 429), entre --min-workers y --workers")
+    parser.add_argument("--min-workers", type=int, default=1,
+                        help="Con --adaptive: mínimo de transferencias en paralelo (default: 1)")
+
+
+def _order(p, args) -> str:
+    from zoomtube import config
+
+    order_by = args.order or config.TRANSFER_ORDER
+    if order_by not in constants.ORDER_POLICIES:
+        p.error(f"TRANSFER_ORDER inválido: {order_by}")
+    return order_by
+
+
+def _check_playlist_scopes(p, args):
+    """
+    watch, serve y los workers de jobs no pueden abrir el navegador para
+    autorizar playlists: con --playlist-id, el token ya tiene que tenerlas.
+    """
+    if not args.playlist_id:
+        return
+    from zoomtube import config
+    from zoomtube.clients import get_youtube_client
+
+    if not get_youtube_client().has_scopes(config.MANAGE_SCOPES):
+        p.error(f"{args.cmd}: --playlist-id necesita permisos de YouTube para playlists que el token "
+                f"({config.YOUTUBE_TOKEN_FILE}) no tiene; autorizalos una vez con `zoomtube auth`")
+
+
+def _add_list_args(parser):
+    """Filtros y formato de salida de los subcomandos de list."""
+    parser.add_argument("--status", help="Solo registros con este estado (ej: failed, success)")
+    parser.add_argument("--since", help="Desde esta fecha, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Hasta esta fecha, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--topic", help="Solo títulos que contengan este texto (sin distinguir mayúsculas)")
+    parser.add_argument("--limit", type=int, help="Solo los últimos N registros que pasan los filtros")
+    parser.add_argument("--format", choices=constants.LIST_FORMATS, default="table", dest="fmt",
+                        help="Formato de salida (default: table)")
+    parser.add_argument("--summary", action="store_true",
+                        help="Cantidad y bytes por día y estado, en vez de listar los registros")
+
+
+def _apply_scope(p, args, logger):
+    """
+    Perfil de cuenta (--account) y shard (--shard): fijan credenciales, filtro
+    de usuarios y carpetas de estado/descargas antes de correr el subcomando.
+    También los límites de ancho de banda (--limit-down/--limit-up).
+    """
+    from zoomtube import config
+
+    account = args.account or config.ACCOUNT
+    try:
+        if args.limit_down is not None or args.limit_up is not None:
+            from zoomtube.utils.bandwidth import BandwidthSchedule
+
+            if args.limit_down is not None:
+                config.set_setting("BANDWIDTH_DOWN", BandwidthSchedule.parse(args.limit_down))
+            if args.limit_up is not None:
+                config.set_setting("BANDWIDTH_UP", BandwidthSchedule.parse(args.limit_up))
+        # Un valor inválido en el entorno falla acá y no a mitad de una transferencia
+        for name in ("BANDWIDTH_DOWN", "BANDWIDTH_UP"):
+            getattr(config, name)
+        if account:
+            config.apply_profile(account)
+        if args.shard:
+            from zoomtube.utils.sharding import Shard
+
+            config.set_setting("SHARD", Shard.parse(
+                args.shard, args.shard_by or config.getenv("ZOOMTUBE_SHARD_BY", "user")
+            ))
+        shard = config.SHARD
+    except (ValueError, OSError) as e:
+        p.error(str(e))
+    if account:
+        logger.info(f"Cuenta: {account}")
+
+    if shard is not None:
+        if args.cmd == "serve":
+            p.error("serve: --shard no aplica (cada evento de Zoom llega a un solo receptor); "
+                    "usá un perfil con users para repartir la cuenta")
+        from zoomtube import registries
+
+        # Cada shard tiene su estado (subidas, cursor de watch, checkpoints) y sus
+        # descargas, y una parte de la cuota diaria de YouTube del proyecto
+        state_dir = Path(config.STATE_DIR) if config.STATE_DIR else registries.state_dir()
+        config.set_setting("STATE_DIR", str(state_dir / shard.name))
+        config.set_setting("RECORDINGS_BASE_PATH", str(Path(config.RECORDINGS_BASE_PATH) / shard.name))
+        config.set_setting("YOUTUBE_DAILY_QUOTA", config.YOUTUBE_DAILY_QUOTA // shard.count)
+        logger.info(f"Shard {shard.index}/{shard.count} por {shard.by} "
+                    f"(cuota: {config.YOUTUBE_DAILY_QUOTA} unidades) → {config.STATE_DIR}")
+
+    if config.STATE_DIR:
+        from zoomtube.registries import set_state_dir
+
+        set_state_dir(config.STATE_DIR)
+
+
+def _dispatch(p, args, logger):
+    """Corre el subcomando elegido (cada rama importa solo lo que usa)."""
+    if args.cmd == "download":
+        from zoomtube.pipeline import download
+
+        logger.info("Iniciando descarga de grabaciones...")
+        if args.recording_type and args.recording_type_preferred:
+            logger.error("No se puede usar --recording-type y --recording-type-preferred al mismo tiempo")
+            return
+        download.run(
+            start_date=args.start_date,
+            end_date=args.end_date,
+            date=args.date,
+            min_duration=args.min_duration,
+            max_duration=args.max_duration,
+            output_path=args.output_path,
+            recording_types=args.recording_type,
+            preferred_types=args.recording_type_preferred,
+            check_audio=args.check_audio,
+            silence_threshold=args.silence_threshold,
+            silence_ratio=args.silence_ratio,
+            order_by=_order(p, args),
+            workers=args.workers,
+            adaptive=args.adaptive,
+            min_workers=args.min_workers,
+        )
+
+    elif args.cmd == "upload":
+        from zoomtube.pipeline import upload
+
+        if args.mode == "file":
+            logger.info(f"Subiendo archivo: {args.path}")
+            upload.run_single(
+                path=args.path,
+                title=args.title,
+                description=args.description,
+                tags=args.tags,
+                privacy_status=args.privacy_status,
+                playlist_id=args.playlist_id,
+                # schedule=args.schedule,
+                optimizer=_build_optimizer(args),
+            )
+        elif args.mode == "folder":
+            logger.info(f"Subiendo carpeta: {args.path}")
+            upload.run_batch(
+                folder=args.path,
+                description=args.description,
+                tags=args.tags,
+                privacy_status=args.privacy_status,
+                playlist_id=args.playlist_id,
+                metadata_csv=args.metadata_csv,
+                optimizer=_build_optimizer(args),
+                workers=args.workers,
+                order_by=_order(p, args),
+                adaptive=args.adaptive,
+                min_workers=args.min_workers,
+            )
+        elif args.mode == "metadata":
+            from zoomtube.pipeline import metadata
+
+            logger.info(f"Aplicando metadata desde: {args.path}")
+            metadata.run(args.path, playlist_id=args.playlist_id)
+
+    elif args.cmd == "process":
+        from zoomtube import config
+        from zoomtube.pipeline import process
+
+        logger.info("Ejecutando pipeline completo (descarga + subida)...")
+        if args.date and (args.start_date or args.end_date):
+            p.error("process: --date no se combina con --start-date/--end-date")
+        after_upload = args.after_upload or config.AFTER_UPLOAD
+        archive_dir = args.archive_dir or config.ARCHIVE_DIR
+        if after_upload not in constants.AFTER_UPLOAD_ACTIONS:
+            p.error(f"process: AFTER_UPLOAD inválido: {after_upload}")
+        if after_upload == "archive" and not archive_dir:
+            p.error("process: --after-upload archive requiere --archive-dir (o ARCHIVE_DIR)")
+        process.run(
+            date=args.date,
+            check_audio=args.check_audio,
+            optimizer=_build_optimizer(args),
+            workers=args.workers,
+            playlist_id=args.playlist_id,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            parallel_days=args.parallel_days,
+            resume=args.resume,
+            staging_budget_gb=(
+                args.staging_budget_gb if args.staging_budget_gb is not None else config.STAGING_BUDGET_GB
+            ),
+            after_upload=after_upload,
+            archive_dir=archive_dir,
+            order_by=_order(p, args),
+            adaptive=args.adaptive,
+            min_workers=args.min_workers,
+        )
+
+    elif args.cmd == "auth":
+        from zoomtube import config
+        from zoomtube.clients import get_youtube_client
+
+        client = get_youtube_client()
+        client.require_scopes(config.MANAGE_SCOPES)
+        client.get_credentials()
+        logger.info(f"Token de YouTube guardado en {client.token_file}")
+
+    elif args.cmd == "watch":
+        from zoomtube.pipeline import watch
+
+        _check_playlist_scopes(p, args)
+        watch.run(
+            interval=args.interval,
+            since=args.since,
+            check_audio=args.check_audio,
+            optimizer=_build_optimizer(args),
+            workers=args.workers,
+            playlist_id=args.playlist_id,
+            once=args.once,
+        )
+
+    elif args.cmd == "serve":
+        from zoomtube.pipeline import serve
+
+        _check_playlist_scopes(p, args)
+        serve.run(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            check_audio=args.check_audio,
+            optimizer=_build_optimizer(args),
+            playlist_id=args.playlist_id,
+        )
+
+    elif args.cmd == "optimize":
+        from zoomtube.pipeline import optimize
+
+        optimizer = _build_optimizer(args)
+        if Path(args.path).is_dir():
+            optimize.run(args.path, optimizer, workers=args.workers)
+        else:
+            optimize.run_paths([args.path], optimizer, workers=args.workers)
+
+    elif args.cmd == "embeds":
+        from zoomtube.pipeline import embeds
+
+        embeds.run(json_path=args.json_path, html_path=args.html_path, full=args.full)
+
+    elif args.cmd == "jobs":
+        from zoomtube.pipeline import jobs
+
+        if args.jobs_mode in ("enqueue", "enqueue-folder"):
+            from zoomtube import config
+
+            after_upload = args.after_upload or config.AFTER_UPLOAD
+            archive_dir = args.archive_dir or config.ARCHIVE_DIR
+            if after_upload == "archive" and not archive_dir:
+                p.error("jobs: --after-upload archive requiere --archive-dir (o ARCHIVE_DIR)")
+            _check_playlist_scopes(p, args)
+        if args.jobs_mode == "enqueue":
+            if args.recording_type and args.recording_type_preferred:
+                p.error("jobs enqueue: --recording-type y --recording-type-preferred no se combinan")
+            jobs.enqueue_meetings(
+                start_date=args.start_date,
+                end_date=args.end_date,
+                date=args.date,
+                min_duration=args.min_duration,
+                max_duration=args.max_duration,
+                output_path=args.output_path,
+                recording_types=args.recording_type,
+                preferred_types=args.recording_type_preferred,
+                check_audio=args.check_audio,
+                playlist_id=args.playlist_id,
+                privacy_status=args.privacy_status,
+                after_upload=after_upload,
+                archive_dir=archive_dir,
+                order_by=_order(p, args),
+            )
+        elif args.jobs_mode == "enqueue-folder":
+            try:
+                jobs.enqueue_folder(
+                    args.path,
+                    playlist_id=args.playlist_id,
+                    privacy_status=args.privacy_status,
+                    after_upload=after_upload,
+                    archive_dir=archive_dir,
+                    order_by=_order(p, args),
+                )
+            except NotADirectoryError as e:
+                p.error(str(e))
+        elif args.jobs_mode == "work":
+            jobs.work(
+                workers=args.workers,
+                kinds=args.kinds,
+                lease_seconds=args.lease,
+                drain=args.drain,
+                optimizer=_build_optimizer(args),
+                adaptive=args.adaptive,
+                min_workers=args.min_workers,
+            )
+        elif args.jobs_mode == "status":
+            jobs.show_status(failed=args.failed)
+        elif args.jobs_mode == "retry":
+            from zoomtube.registries import jobs as job_queue
+
+            logger.info(f"Trabajos fallidos vueltos a la cola: {job_queue.retry_failed(args.kinds)}")
+        elif args.jobs_mode == "purge":
+            from zoomtube.registries import jobs as job_queue
+
+            logger.info(f"Trabajos terminados borrados: {job_queue.purge_done()}")
+
+    elif args.cmd == "list":
+        from datetime import date
+
+        for name in ("since", "until"):
+            value = getattr(args, name)
+            try:
+                if value:
+                    date.fromisoformat(value)
+            except ValueError:
+                p.error(f"list: --{name} debe ser YYYY-MM-DD")
+        if args.limit is not None and args.limit < 1:
+            p.error("list: --limit debe ser mayor que 0")
+
+        from zoomtube.pipeline import listing
+
+        listing.run(
+            args.list_mode,
+            status=args.status,
+            since=args.since,
+            until=args.until,
+            topic=args.topic,
+            limit=args.limit,
+            fmt=args.fmt,
+            summary=args.summary,
+        )
 
 
 def main():
-    p = ArgumentParser(prog="zoomtube")
+    # Sin abreviaturas: --limit (list) chocaría con los flags globales --limit-down/--limit-up
+    p = ArgumentParser(prog="zoomtube", allow_abbrev=False)
 
     # Flags globales de logging
     p.add_argument("--verbose", action="store_true", help="Mostrar logs DEBUG en consola")
     p.add_argument("--quiet", action="store_true", help="Mostrar solo errores en consola")
+    p.add_argument("--log-format", choices=constants.LOG_FORMATS,
+                   help="Formato de los logs en consola y archivo: text o json (JSON Lines). "
+                        "Default: $ZOOMTUBE_LOG_FORMAT o text")
+    p.add_argument("--trace", metavar="FILE",
+                   help="Guardar los tiempos por etapa como Chrome trace (chrome://tracing, Perfetto)")
+    p.add_argument("--metrics-textfile", metavar="FILE",
+                   help="Escribir métricas Prometheus al terminar (textfile collector de node_exporter). "
+                        "Default: $ZOOMTUBE_METRICS_TEXTFILE")
+    p.add_argument("--metrics-port", type=int, metavar="PORT",
+                   help="Exponer /metrics en 127.0.0.1:PORT mientras corre download/upload/process/watch/serve. "
+                        "Default: $ZOOMTUBE_METRICS_PORT")
+    p.add_argument("--profile", choices=constants.PROFILE_MODES,
+                   help="Perfilar el subcomando: cpu (cProfile + stacks para flamegraph), "
+                        "mem (tracemalloc) o both; siempre incluye el tiempo en ffmpeg/ffprobe")
+    p.add_argument("--profile-out", metavar="DIR",
+                   help="Carpeta de los resultados de --profile. Default: $ZOOMTUBE_PROFILE_DIR o ./profiles")
+
+    # Varias cuentas / varios procesos
+    p.add_argument("--account", metavar="NAME",
+                   help="Perfil de cuenta de config/profiles.json (credenciales de Zoom, usuarios, "
+                        "token de YouTube, carpetas). Default: $ZOOMTUBE_ACCOUNT")
+    p.add_argument("--shard", metavar="i/N",
+                   help="Procesar solo la parte i (0..N-1) de la cuenta, repartida por hash; "
+                        "N procesos con 0/N … N-1/N no se pisan. Default: $ZOOMTUBE_SHARD")
+    p.add_argument("--shard-by", choices=constants.SHARD_KEYS,
+                   help="Repartir por usuario o por reunión (default: $ZOOMTUBE_SHARD_BY o user)")
+
+    # Ancho de banda (total del proceso, compartido por todas las transferencias)
+    p.add_argument("--limit-down", metavar="SPEC",
+                   help="Límite de bajada en MB/s, opcionalmente por franja horaria "
+                        "(ej: 5 o '08:00-19:00=5,0'; 0 = sin límite). Default: $BANDWIDTH_DOWN")
+    p.add_argument("--limit-up", metavar="SPEC",
+                   help="Límite de subida en MB/s, con el mismo formato que --limit-down. Default: $BANDWIDTH_UP")
 
     sub = p.add_subparsers(dest="cmd", required=True)
 
@@ -36,6 +444,10 @@ def main():
     dl.add_argument("--silence-ratio", type=float,
                     default=constants.DEFAULT_SILENCE_RATIO,
                     help="Proporción máxima de silencio tolerada (default: 0.9)")
+    dl.add_argument("--workers", type=int, default=1,
+                    help="Cantidad de descargas en paralelo (default: 1)")
+    _add_order_arg(dl)
+    _add_adaptive_args(dl)
 
     # --- upload ---
     upload_parser = sub.add_parser("upload", help="Upload videos to YouTube")
@@ -46,8 +458,9 @@ def main():
     single.add_argument("--description", default="")
     single.add_argument("--tags", nargs="+", default=[])
     single.add_argument("--privacy-status", choices=["public", "private", "unlisted"], default="unlisted")
-    # single.add_argument("--playlist-id") -> Agregado en upload.py pero no implementado aún
+    single.add_argument("--playlist-id")
     # single.add_argument("--schedule") -> Programar publicación del video | No implementado aún
+    _add_optimize_args(single)
 
     batch = upload_sub.add_parser("folder", help="Upload multiple videos from a folder")
     batch.add_argument("path", help="Path to folder")
@@ -55,17 +468,139 @@ def main():
     batch.add_argument("--playlist-id")
     batch.add_argument("--tags", nargs="+", default=[])
     batch.add_argument("--description", default="")
-    # batch.add_argument("--metadata-csv")
+    batch.add_argument("--metadata-csv",
+                       help="CSV con title/description/tags/playlist_id por archivo")
+    batch.add_argument("--workers", type=int, default=1,
+                       help="Cantidad de subidas en paralelo (default: 1)")
+    _add_order_arg(batch)
+    _add_adaptive_args(batch)
+    _add_optimize_args(batch)
+
+    meta = upload_sub.add_parser("metadata", help="Update metadata/playlists of uploaded videos from a CSV")
+    meta.add_argument("path", help="Path to metadata CSV (file|local_path|youtube_id, title, description, tags, playlist_id)")
+    meta.add_argument("--playlist-id", help="Playlist por defecto para las filas sin playlist_id")
 
     # --- process ---
     proc = sub.add_parser("process", help="Download and upload in one step")
     proc.add_argument("--date", help="Date to process (YYYY-MM-DD). Default: yesterday")
+    proc.add_argument("--start-date", help="Backfill: primer día del rango (YYYY-MM-DD)")
+    proc.add_argument("--end-date", help="Backfill: último día del rango (YYYY-MM-DD). Default: ayer")
+    proc.add_argument("--parallel-days", type=int, default=1,
+                      help="Backfill: días procesados en paralelo (default: 1)")
+    proc.add_argument("--no-resume", action="store_false", dest="resume",
+                      help="Backfill: volver a procesar también los días ya completados")
+    proc.add_argument("--staging-budget-gb", type=float,
+                      help="Máximo de GB descargados sin subir; las descargas esperan a las subidas "
+                           "(default: STAGING_BUDGET_GB o sin límite)")
+    proc.add_argument("--after-upload", choices=constants.AFTER_UPLOAD_ACTIONS,
+                      help="Qué hacer con cada archivo local ya subido (default: AFTER_UPLOAD o keep)")
+    proc.add_argument("--archive-dir", help="Carpeta destino de --after-upload archive (default: ARCHIVE_DIR)")
     proc.add_argument(
         "--no-check-audio",
         action="store_false",
         dest="check_audio",
         help="No verificar audio de las grabaciones"
     )
+    proc.add_argument("--workers", type=int, default=1,
+                      help="Cantidad de subidas en paralelo (default: 1)")
+    proc.add_argument("--playlist-id", help="Playlist a la que agregar los videos subidos")
+    _add_order_arg(proc)
+    _add_adaptive_args(proc)
+    _add_optimize_args(proc)
+
+    # --- auth ---
+    sub.add_parser("auth", help="Authorize YouTube (uploads, playlists and metadata) and save the token")
+
+    # --- watch ---
+    wt = sub.add_parser("watch", help="Poll Zoom and process new recordings as they complete")
+    wt.add_argument("--interval", type=int, default=constants.WATCH_INTERVAL,
+                    help="Segundos entre consultas a Zoom (default: 300)")
+    wt.add_argument("--since", help="Fecha desde la que empezar si no hay estado guardado (YYYY-MM-DD). Default: ayer")
+    wt.add_argument("--once", action="store_true", help="Hacer una sola consulta y salir")
+    wt.add_argument(
+        "--no-check-audio",
+        action="store_false",
+        dest="check_audio",
+        help="No verificar audio de las grabaciones"
+    )
+    wt.add_argument("--workers", type=int, default=1,
+                    help="Cantidad de subidas en paralelo (default: 1)")
+    wt.add_argument("--playlist-id", help="Playlist a la que agregar los videos subidos")
+    _add_optimize_args(wt)
+
+    # --- serve ---
+    srv = sub.add_parser("serve", help="Receive Zoom recording.completed webhooks and process each meeting")
+    srv.add_argument("--host", default="0.0.0.0", help="Default: 0.0.0.0")
+    srv.add_argument("--port", type=int, default=constants.WEBHOOK_PORT, help="Default: 8080")
+    srv.add_argument("--workers", type=int, default=2,
+                     help="Reuniones procesadas en paralelo (default: 2)")
+    srv.add_argument(
+        "--no-check-audio",
+        action="store_false",
+        dest="check_audio",
+        help="No verificar audio de las grabaciones"
+    )
+    srv.add_argument("--playlist-id", help="Playlist a la que agregar los videos subidos")
+    _add_optimize_args(srv)
+
+    # --- optimize ---
+    opt = sub.add_parser("optimize", help="Optimize videos for upload (fast-start remux / re-encode)")
+    opt.add_argument("path", help="Path to video file or folder")
+    _add_optimize_args(opt, standalone=True)
+
+    # --- embeds ---
+    emb = sub.add_parser("embeds", help="Generate iframes JSON/HTML from uploaded videos")
+    emb.add_argument("--json-path", help="Default: data/iframes.json")
+    emb.add_argument("--html-path", help="Default: output/iframes_clean.html")
+    emb.add_argument("--full", action="store_true",
+                     help="Regenerar todo en vez de agregar solo las subidas nuevas")
+
+    # --- jobs ---
+    jobs_parser = sub.add_parser("jobs", help="Durable job queue: enqueue recordings and run download/upload workers")
+    jobs_sub = jobs_parser.add_subparsers(dest="jobs_mode", required=True)
+
+    enq = jobs_sub.add_parser("enqueue", help="Enqueue a download job per Zoom recording file")
+    enq.add_argument("--date", help="Solo esta fecha (YYYY-MM-DD). Default: ayer")
+    enq.add_argument("--start-date")
+    enq.add_argument("--end-date")
+    enq.add_argument("--min-duration", type=int, default=10)
+    enq.add_argument("--max-duration", type=int)
+    enq.add_argument("--output-path", help="Default: RECORDINGS_BASE_PATH (una carpeta por día)")
+    enq.add_argument("--recording-type", nargs="+", choices=constants.ZOOM_RECORDING_TYPES)
+    enq.add_argument("--recording-type-preferred", nargs="+", choices=constants.ZOOM_RECORDING_TYPES,
+                     help="Default: DEFAULT_PREFERRED_TYPES")
+    enq.add_argument("--no-check-audio", action="store_false", dest="check_audio",
+                     help="No encolar el chequeo de audio (las descargas pasan directo a subirse)")
+
+    enq_folder = jobs_sub.add_parser("enqueue-folder", help="Enqueue an upload job per video in a folder")
+    enq_folder.add_argument("path", help="Path to folder")
+
+    for enq_cmd in (enq, enq_folder):
+        enq_cmd.add_argument("--playlist-id", help="Playlist a la que agregar los videos subidos")
+        enq_cmd.add_argument("--privacy-status", choices=["public", "private", "unlisted"], default="unlisted")
+        enq_cmd.add_argument("--after-upload", choices=constants.AFTER_UPLOAD_ACTIONS,
+                             help="Qué hacer con cada archivo local ya subido (default: AFTER_UPLOAD o keep)")
+        enq_cmd.add_argument("--archive-dir", help="Carpeta destino de --after-upload archive (default: ARCHIVE_DIR)")
+        _add_order_arg(enq_cmd)
+
+    wrk = jobs_sub.add_parser("work", help="Run workers that claim jobs from the queue")
+    wrk.add_argument("--workers", type=int, default=1, help="Trabajos en paralelo en este proceso (default: 1)")
+    wrk.add_argument("--kinds", nargs="+", choices=constants.JOB_KINDS,
+                     help="Tomar solo estos tipos de trabajo (default: todos)")
+    wrk.add_argument("--lease", type=float, default=constants.JOB_LEASE_SECONDS,
+                     help="Segundos de lease; se renueva mientras el trabajo corre (default: 300)")
+    wrk.add_argument("--drain", action="store_true",
+                     help="Salir cuando no queden trabajos en cola ni en curso")
+    _add_adaptive_args(wrk)
+    _add_optimize_args(wrk)
+
+    st = jobs_sub.add_parser("status", help="Show job counts by kind and status")
+    st.add_argument("--failed", type=int, default=10, help="Cuántos fallidos recientes mostrar (default: 10)")
+
+    rty = jobs_sub.add_parser("retry", help="Re-enqueue failed jobs")
+    rty.add_argument("--kinds", nargs="+", choices=constants.JOB_KINDS)
+
+    jobs_sub.add_parser("purge", help="Delete finished jobs")
 
     # --- list ---
     list_parser = sub.add_parser("list", help="List registry data (uploads, downloads, recordings)")
@@ -74,88 +609,53 @@ def main():
     downloads_cmd = list_sub.add_parser("downloads", help="List downloaded recordings from registry")
     uploads_cmd = list_sub.add_parser("uploads", help="List uploaded videos from registry")
     recordings_cmd = list_sub.add_parser("recordings", help="List all recordings found in Zoom (with file types)")
+    for list_cmd in (downloads_cmd, uploads_cmd, recordings_cmd):
+        _add_list_args(list_cmd)
 
     args = p.parse_args()
 
     # --- Configurar logger ---
     # El resto del proyecto usa 'logger' importado desde zoomtube.utils.logger. Acá solo se configura.
-    logger = get_logger(verbose=args.verbose, quiet=args.quiet)
+    logger = get_logger(verbose=args.verbose, quiet=args.quiet, log_format=args.log_format)
+
+    # --- Cuenta y shard ---
+    if args.cmd != "optimize":
+        _apply_scope(p, args, logger)
+
+    # --- Métricas Prometheus ---
+    if args.cmd in ("download", "upload", "process", "watch", "serve", "jobs"):
+        from zoomtube import config
+
+        metrics_textfile = args.metrics_textfile or config.METRICS_TEXTFILE
+        metrics_port = args.metrics_port or config.METRICS_PORT
+        if metrics_port:
+            from zoomtube.utils import metrics
+
+            metrics.serve(metrics_port)
 
     # --- Dispatch ---
-    if args.cmd == "download":
-        logger.info("Iniciando descarga de grabaciones...")
-        if args.recording_type and args.recording_type_preferred:
-            logger.error("No se puede usar --recording-type y --recording-type-preferred al mismo tiempo")
-            return
-        download.run(
-            start_date=args.start_date,
-            end_date=args.end_date,
-            date=args.date,
-            min_duration=args.min_duration,
-            max_duration=args.max_duration,
-            output_path=args.output_path,
-            recording_types=args.recording_type,
-            preferred_types=args.recording_type_preferred,
-            check_audio=args.check_audio,
-            silence_threshold=args.silence_threshold,
-            silence_ratio=args.silence_ratio,
-        )
+    if args.profile:
+        from zoomtube import config
+        from zoomtube.utils.profiling import Profiler
 
-    elif args.cmd == "upload":
-        if args.mode == "file":
-            logger.info(f"Subiendo archivo: {args.path}")
-            upload.run_single(
-                path=args.path,
-                title=args.title,
-                description=args.description,
-                tags=args.tags,
-                privacy_status=args.privacy_status,
-                # playlist_id=args.playlist_id,
-                # schedule=args.schedule,
-            )
-        elif args.mode == "folder":
-            logger.info(f"Subiendo carpeta: {args.path}")
-            upload.run_batch(
-                folder=args.path,
-                description=args.description,
-                tags=args.tags,
-                privacy_status=args.privacy_status,
-                # playlist_id=args.playlist_id,
-                # metadata_csv=args.metadata_csv,
-            )
+        with Profiler(args.profile, args.profile_out or config.PROFILE_DIR, args.cmd):
+            _dispatch(p, args, logger)
+    else:
+        _dispatch(p, args, logger)
 
-    elif args.cmd == "process":
-        logger.info("Ejecutando pipeline completo (descarga + subida)...")
-        process.run(date=args.date, check_audio=args.check_audio)
+    # --- Tiempos por etapa ---
+    if args.cmd in ("download", "upload", "process"):
+        from zoomtube.utils.tracing import tracer
 
-    elif args.cmd == "list":
-        if args.list_mode == "uploads":
-            uploads = uploads.get_all_uploads()
-            if not uploads:
-                print("No hay registros de subidas aún.")
-                return
-            print("\n=== Subidas registradas ===")
-            for u in uploads:
-                print(f"- {u['uploaded_at']} | {u['status']} | {u['title']} ({u['local_path']}) → {u.get('youtube_id')}")
-        elif args.list_mode == "downloads":
-            downloads = downloads.get_all_downloads()
-            if not downloads:
-                print("No hay registros de descargas aún.")
-                return
-            print("\n=== Descargas registradas ===")
-            for d in downloads:
-                print(f"- {d['downloaded_at']} | {d['status']} | {d['topic']} "
-                      f"({d['duration']} min) → {d['local_path']}")
-        elif args.list_mode == "recordings":
-            recordings = recordings.get_all_recordings()
-            if not recordings:
-                print("No hay registros de grabaciones aún.")
-                return
-            print("\n=== Grabaciones encontradas ===")
-            for r in recordings:
-                print(f"* {r['start_time']} | {r['topic']} ({r['duration']} min)")
-                for f in r["files"]:
-                    print(f"   - {f['type']}: {f['status']}")
+        tracer.log_summary()
+        if args.trace:
+            logger.info(f"Trace guardado en {tracer.export_chrome(args.trace)}")
+
+    # --- Métricas al terminar (watch y serve no acumulan spans) ---
+    if args.cmd in ("download", "upload", "process", "watch", "serve", "jobs") and metrics_textfile:
+        from zoomtube.utils import metrics
+
+        logger.info(f"Métricas guardadas en {metrics.write_textfile(metrics_textfile, args.cmd)}")
 
 
 if __name__ == "__main__":
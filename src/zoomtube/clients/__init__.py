@@ -1,15 +1,54 @@
 # src/zoomtube/clients/__init__.py
 
-from .zoom import ZoomClient
-from .youtube import YoutubeClient
+# Las clases y las instancias se resuelven de forma perezosa (PEP 562):
+# importar este paquete no importa requests ni las librerías de Google,
+# y los clientes se construyen recién cuando alguien los pide.
+
+import threading
+
+_lock = threading.Lock()
+_instances = {}
+
+
+def get_zoom_client():
+    """Instancia "oficial" reutilizable de ZoomClient (se crea al primer uso)."""
+    with _lock:
+        if "zoom" not in _instances:
+            from .zoom import ZoomClient
+            _instances["zoom"] = ZoomClient()
+        return _instances["zoom"]
+
+
+def get_youtube_client():
+    """Instancia "oficial" reutilizable de YoutubeClient (se crea al primer uso)."""
+    with _lock:
+        if "youtube" not in _instances:
+            from .youtube import YoutubeClient
+            _instances["youtube"] = YoutubeClient()
+        return _instances["youtube"]
+
+
+def __getattr__(name: str):
+    if name == "ZoomClient":
+        from .zoom import ZoomClient
+        return ZoomClient
+    if name in ("YoutubeClient", "QuotaExceededError", "AuthorizationRequiredError"):
+        from . import youtube
+        return getattr(youtube, name)
+    if name == "zoom_client":
+        return get_zoom_client()
+    if name == "youtube_client":
+        return get_youtube_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Instancias "oficiales" reutilizables en todo el proyecto
-zoom_client = ZoomClient()
-youtube_client = YoutubeClient()
 
 __all__ = [
     "ZoomClient",
     "YoutubeClient",
+    "QuotaExceededError",
+    "AuthorizationRequiredError",
     "zoom_client",
     "youtube_client",
+    "get_zoom_client",
+    "get_youtube_client",
 ]
@@ -1,44 +1,119 @@
 from __future__ import annotations
+import http.client
+import json
 import pickle
+import random
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Callable, TYPE_CHECKING
 
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+if TYPE_CHECKING:
+    from googleapiclient.errors import HttpError
 
+# Las librerías de Google (googleapiclient, google_auth_oauthlib, httplib2) se
+# importan dentro de las funciones que las usan: son pesadas y la mayoría de
+# los subcomandos (ej: "list") no las necesitan.
+
+from zoomtube.models import TransferStats
+from zoomtube.utils.progress import TransferProgress
+from zoomtube.utils import bandwidth, concurrency
 from zoomtube.utils.logger import logger
 from zoomtube import config
 
+# Motivos de error 403 que indican cuota agotada (no tiene sentido reintentar hoy)
+QUOTA_ERROR_REASONS = {"quotaExceeded", "dailyLimitExceeded", "uploadLimitExceeded"}
+
+# Errores transitorios: se reintenta el chunk sobre la misma sesión resumable
+RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRIABLE_ERROR_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+RETRIABLE_EXCEPTIONS = (
+    IOError,  # incluye socket.error, ConnectionError y TimeoutError
+    http.client.NotConnected,
+    http.client.IncompleteRead,
+    http.client.ImproperConnectionState,
+    http.client.CannotSendRequest,
+    http.client.CannotSendHeader,
+    http.client.ResponseNotReady,
+    http.client.BadStatusLine,
+)
+
+# Backoff exponencial con jitter entre reintentos de un mismo chunk
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 64.0
+
+# Documento de discovery: se usa el que trae googleapiclient (o una copia
+# cacheada en disco) y se parsea una sola vez por proceso
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+DISCOVERY_CACHE_DIR = config.DATA_DIR / "discovery"
+_discovery_documents: Dict[tuple, dict] = {}
+_discovery_lock = threading.Lock()
+# build_from_document completa in-place el documento compartido: serializar los builds
+_build_lock = threading.Lock()
+
+# Las subidas resumables exigen chunks múltiplos de 256 KiB
+CHUNK_ALIGN = 256 * 1024
+
+# Requests por round trip en los batch HTTP y reintentos individuales de los que fallen
+BATCH_MAX_REQUESTS = 50
+BATCH_ITEM_RETRIES = 3
+
+
+class QuotaExceededError(Exception):
+    """La YouTube Data API rechazó la operación por cuota diaria agotada."""
+
+
+class AuthorizationRequiredError(Exception):
+    """Hace falta autorizar YouTube en el navegador, pero el cliente no es interactivo (ej: un daemon)."""
+
 
 # =========================
 # Helpers internos (core)
 # =========================
 
+def _read_token_core(token_file: Path):
+    """Credenciales guardadas en token.pickle, o None si no hay (o están corruptas)."""
+    if not token_file.exists():
+        return None
+    try:
+        with token_file.open("rb") as token:
+            return pickle.load(token)
+    except Exception as e:
+        logger.warning(f"Token inválido o corrupto, se regenerará: {e}")
+        return None
+
+
 def _load_credentials_core(
     token_file: Path,
     client_secrets_file: Path,
-    scopes: List[str]
+    scopes: List[str],
+    interactive: bool = True,
 ):
     """
     Carga credenciales desde token.pickle o inicia flujo OAuth.
+    Sin interactive, en vez de iniciar el flujo levanta AuthorizationRequiredError.
     """
-    creds = None
-    if token_file.exists():
-        try:
-            with token_file.open("rb") as token:
-                creds = pickle.load(token)
-        except Exception as e:
-            logger.warning(f"Token inválido o corrupto, se regenerará: {e}")
-            creds = None
+    from google.auth.transport.requests import Request
+
+    creds = _read_token_core(token_file)
+
+    if creds is not None and hasattr(creds, "has_scopes") and not creds.has_scopes(scopes):
+        logger.warning("El token guardado no tiene todos los permisos requeridos, se pedirá autorización de nuevo")
+        creds = None
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             logger.info("Refrescando token de YouTube…")
             creds.refresh(Request())
+        elif not interactive:
+            raise AuthorizationRequiredError(
+                "El token de YouTube no existe o no tiene los permisos necesarios; "
+                "autorizá con `zoomtube auth` antes de arrancar"
+            )
         else:
             logger.info("Iniciando flujo OAuth de YouTube…")
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
             flow = InstalledAppFlow.from_client_secrets_file(
                 str(client_secrets_file), scopes
             )
@@ -52,6 +127,182 @@ def _load_credentials_core(
     return creds
 
 
+def _load_discovery_document_core(api_service_name: str, api_version: str) -> dict:
+    """
+    Devuelve el documento de discovery parseado, sin ir a la red si se puede:
+    1) el documento estático que trae googleapiclient
+    2) una copia cacheada en DISCOVERY_CACHE_DIR
+    3) como último recurso lo descarga y lo guarda en la caché
+    """
+    key = (api_service_name, api_version)
+    with _discovery_lock:
+        if key in _discovery_documents:
+            return _discovery_documents[key]
+
+        from googleapiclient import discovery_cache
+
+        content = discovery_cache.get_static_doc(api_service_name, api_version)
+        cache_file = DISCOVERY_CACHE_DIR / f"{api_service_name}.{api_version}.json"
+
+        if content is None and cache_file.exists():
+            content = cache_file.read_text(encoding="utf-8")
+
+        if content is None:
+            import httplib2
+
+            url = DISCOVERY_URL.format(api=api_service_name, version=api_version)
+            logger.info(f"Descargando documento de discovery: {url}")
+            resp, raw = httplib2.Http(timeout=60).request(url)
+            if resp.status != 200:
+                raise RuntimeError(f"No se pudo obtener el discovery de {api_service_name} {api_version}")
+            content = raw.decode("utf-8")
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(content, encoding="utf-8")
+
+        document = json.loads(content)
+        _discovery_documents[key] = document
+        return document
+
+
+class _SharedCredentials:
+    """
+    Envoltorio de las credenciales OAuth compartido por todos los services.
+    Serializa el refresh del token: si varios threads lo encuentran vencido
+    (o reciben un 401) a la vez, refresca uno solo y el resto reutiliza el nuevo.
+    """
+
+    def __init__(self, creds, on_refresh: Callable[[Any], None]):
+        self._creds = creds
+        self._on_refresh = on_refresh
+        self._lock = threading.Lock()
+
+    @property
+    def valid(self) -> bool:
+        return self._creds.valid
+
+    def before_request(self, request, method, url, headers) -> None:
+        if not self._creds.valid:
+            self.refresh(request, stale_token=self._creds.token)
+        self._creds.apply(headers)
+
+    def refresh(self, request, stale_token: Optional[str] = None) -> None:
+        stale_token = self._creds.token if stale_token is None else stale_token
+        with self._lock:
+            if self._creds.valid and self._creds.token != stale_token:
+                return  # otro thread ya lo refrescó mientras esperábamos
+            if not self._creds.refresh_token:
+                raise RuntimeError("No hay refresh token de YouTube; volver a autenticar")
+            logger.info("Refrescando token de YouTube…")
+            self._creds.refresh(request)
+            self._on_refresh(self._creds)
+
+    def __getattr__(self, name: str):
+        return getattr(self._creds, name)
+
+
+class _ServicePool:
+    """
+    Services de googleapiclient, uno por thread (httplib2 no es thread-safe).
+    - prewarm(n) construye services por adelantado
+    - los services de threads que ya terminaron se reciclan para otros threads
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._idle: List[Any] = []
+        self._owned: Dict[int, tuple] = {}  # ident → (thread, service)
+
+    def _reclaim(self) -> None:
+        for ident, (thread, service) in list(self._owned.items()):
+            if not thread.is_alive():
+                del self._owned[ident]
+                self._idle.append(service)
+
+    def get(self, force_rebuild: bool = False):
+        thread = threading.current_thread()
+        with self._lock:
+            owned = self._owned.get(thread.ident)
+            if owned and owned[0] is thread and not force_rebuild:
+                return owned[1]
+            self._reclaim()
+            service = self._idle.pop() if self._idle and not force_rebuild else None
+
+        if service is None:
+            service = self._factory()
+
+        with self._lock:
+            self._owned[thread.ident] = (thread, service)
+        return service
+
+    def prewarm(self, count: int) -> None:
+        with self._lock:
+            self._reclaim()
+            missing = count - len(self._idle)
+        for _ in range(max(0, missing)):
+            service = self._factory()
+            with self._lock:
+                self._idle.append(service)
+
+
+def _error_reason(error: HttpError) -> str:
+    """
+    Extrae el 'reason' del cuerpo JSON de un HttpError (ej: "quotaExceeded").
+    """
+    try:
+        content = error.content.decode("utf-8") if isinstance(error.content, bytes) else error.content
+        errors = json.loads(content)["error"].get("errors") or [{}]
+        return errors[0].get("reason", "")
+    except Exception:
+        return ""
+
+
+def _is_quota_error(error: HttpError) -> bool:
+    return error.resp.status == 403 and _error_reason(error) in QUOTA_ERROR_REASONS
+
+
+def _retriable_exceptions() -> tuple:
+    import httplib2
+
+    return (httplib2.HttpLib2Error,) + RETRIABLE_EXCEPTIONS
+
+
+def _is_retriable_error(error: HttpError) -> bool:
+    return (
+        error.resp.status in RETRIABLE_STATUS_CODES
+        or _error_reason(error) in RETRIABLE_ERROR_REASONS
+    )
+
+
+def _is_throttled(error: HttpError) -> bool:
+    return error.resp.status == 429 or _error_reason(error) in ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+def _error_label(error: Exception) -> str:
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError):
+        return f"http_{error.resp.status}"
+    return type(error).__name__
+
+
+def _sleep_before_retry(error: Exception, attempt: int, max_retries: int) -> None:
+    """
+    Espera antes del reintento número `attempt` (backoff exponencial con jitter).
+    Si se superó max_retries, relanza el error.
+    """
+    if attempt > max_retries:
+        logger.error(f"Se agotaron los {max_retries} reintentos del chunk: {error}")
+        raise error
+    ceiling = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    logger.warning(
+        f"Error transitorio subiendo chunk ({_error_label(error)}), "
+        f"reintento {attempt}/{max_retries} en {delay:.1f}s"
+    )
+    time.sleep(delay)
+
+
 # =========================
 # API pública
 # =========================
@@ -59,8 +310,9 @@ def _load_credentials_core(
 class YoutubeClient:
     """
     Cliente de YouTube para el proyecto.
-    - Encapsula OAuth/token
-    - Cachea el service (build) para no reconstruirlo cada vez
+    - Encapsula OAuth/token (credenciales compartidas entre threads, refresh bajo lock)
+    - Construye los services desde el documento de discovery local, sin red
+    - Mantiene un pool de services por thread: httplib2 no es thread-safe
     - Expone operaciones de negocio (ej: upload_video)
     """
 
@@ -77,24 +329,109 @@ class YoutubeClient:
         self.scopes = scopes or list(config.SCOPES)
         self.api_service_name = api_service_name or config.API_SERVICE_NAME
         self.api_version = api_version or config.API_VERSION
+        # Los daemons lo apagan: nunca deben quedarse esperando una autorización en el navegador
+        self.interactive = True
+
+        self._creds = None
+        self._shared_creds: Optional[_SharedCredentials] = None
+        self._creds_lock = threading.Lock()
+        self._pool = _ServicePool(self._build_service)
+
+    def get_credentials(self):
+        """
+        Devuelve las credenciales OAuth, cargándolas una sola vez para todos los threads.
+        """
+        with self._creds_lock:
+            if self._creds is None:
+                self._creds = _load_credentials_core(
+                    token_file=self.token_file,
+                    client_secrets_file=self.client_secrets_file,
+                    scopes=self.scopes,
+                    interactive=self.interactive,
+                )
+            return self._creds
+
+    def has_scopes(self, scopes: List[str]) -> bool:
+        """
+        Si las credenciales (las ya cargadas o las de token_file) tienen esos
+        permisos, sin iniciar el flujo OAuth (ej: para chequear al arrancar un daemon).
+        """
+        with self._creds_lock:
+            creds = self._creds
+        if creds is None:
+            creds = _read_token_core(self.token_file)
+        if creds is None:
+            return False
+        return not hasattr(creds, "has_scopes") or creds.has_scopes(scopes)
+
+    def require_scopes(self, scopes: List[str]) -> None:
+        """
+        Amplía los permisos pedidos (ej: config.MANAGE_SCOPES para playlists y
+        metadata). Si el token actual no los tiene, se vuelven a cargar las
+        credenciales (flujo OAuth) y los services se construyen con el nuevo token.
+        """
+        with self._creds_lock:
+            missing = [s for s in scopes if s not in self.scopes]
+            if not missing:
+                return
+            self.scopes = self.scopes + missing
+            creds = self._creds
+            if creds is None or (hasattr(creds, "has_scopes") and creds.has_scopes(self.scopes)):
+                return
+            logger.info("Hacen falta permisos de YouTube adicionales (playlists / metadata)")
+            self._creds = None
+            self._shared_creds = None
+            self._pool = _ServicePool(self._build_service)
+
+    def _get_shared_credentials(self) -> _SharedCredentials:
+        creds = self.get_credentials()
+        with self._creds_lock:
+            if self._shared_creds is None:
+                self._shared_creds = _SharedCredentials(creds, on_refresh=self._save_token)
+            return self._shared_creds
+
+    def _save_token(self, creds) -> None:
+        self.token_file.parent.mkdir(parents=True, exist_ok=True)
+        with self.token_file.open("wb") as token:
+            pickle.dump(creds, token)
+        logger.debug(f"Token guardado en {self.token_file}")
 
-        self._service = None
+    def refresh_credentials(self) -> None:
+        """
+        Fuerza el refresco del access token (ej: tras un 401) y lo persiste.
+        Si otro thread ya lo refrescó, no vuelve a hacerlo.
+        """
+        from google.auth.transport.requests import Request
+
+        self._get_shared_credentials().refresh(Request())
+
+    def _build_service(self):
+        """
+        Construye un service nuevo, con su propio httplib2.Http autorizado,
+        a partir del documento de discovery cacheado (sin red ni re-parseo).
+        """
+        import google_auth_httplib2
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.http import build_http
+
+        document = _load_discovery_document_core(self.api_service_name, self.api_version)
+        http = google_auth_httplib2.AuthorizedHttp(self._get_shared_credentials(), http=build_http())
+        with _build_lock:
+            return build_from_document(document, http=http)
 
     def get_service(self, force_rebuild: bool = False):
         """
-        Devuelve el objeto service de googleapiclient (YouTube).
+        Devuelve el objeto service de googleapiclient (YouTube) del thread actual.
         Si force_rebuild=True, vuelve a construirlo.
         """
-        if self._service is not None and not force_rebuild:
-            return self._service
-        
-        creds = _load_credentials_core(
-            token_file=self.token_file,
-            client_secrets_file=self.client_secrets_file,
-            scopes=self.scopes
-        )
-        self._service = build(self.api_service_name, self.api_version, credentials=creds)
-        return self._service
+        return self._pool.get(force_rebuild=force_rebuild)
+
+    def prewarm(self, count: int) -> None:
+        """
+        Construye por adelantado `count` services (ej: uno por worker de subida),
+        para que los threads no paguen el build al arrancar.
+        """
+        self._pool.prewarm(count)
 
     def upload_video(
         self,
@@ -104,14 +441,40 @@ class YoutubeClient:
         tags: Optional[List[str]] = None,
         category_id: str = "27",
         privacy_status: str = "unlisted",
-        chunksize: int = -1,
+        chunksize: Optional[int] = None,
         resumable: bool = True,
+        resume_uri: Optional[str] = None,
+        on_chunk: Optional[Callable[[str, int], None]] = None,
+        max_retries: Optional[int] = None,
+        stats: Optional[TransferStats] = None,
+        on_restart: Optional[Callable[[], None]] = None,
     ) -> str:
         """
         Sube un video y devuelve el video_id.
         - category_id "27" = Education 
         - privacy_status: "private" | "unlisted" | "public"
+        - chunksize: tamaño de chunk (default: config.YOUTUBE_UPLOAD_CHUNKSIZE)
+        - resume_uri: URI de una sesión resumable previa; se consulta al servidor
+          el offset confirmado y se continúa desde ahí
+        - on_chunk(session_uri, offset): se llama después de cada chunk confirmado,
+          para persistir la sesión y poder reanudar tras un reinicio
+        - max_retries: reintentos por chunk ante errores transitorios (5xx, 429,
+          errores de red), con backoff exponencial y jitter sobre la misma sesión
+          (default: config.YOUTUBE_UPLOAD_MAX_RETRIES)
+        - stats: si se pasa, se completa con bytes, tiempos, throughput y reintentos
+          (start_offset: bytes ya confirmados de la sesión que se reanuda)
+        - on_restart(): se llama antes de reemplazar una sesión expirada (404/410)
+          por una nueva desde cero, que vuelve a cobrar videos.insert (ej: para
+          reservar la cuota); si lanza una excepción, la subida no se reinicia
+        Cada chunk toma sus bytes del límite global de subida (BANDWIDTH_UP,
+        compartido con las demás subidas); con límite, el chunk se achica a
+        ~1 s de transferencia para que el enlace no reciba ráfagas largas.
+        Errores de cuota lanzan QuotaExceededError (sin reintentar). Un 401 refresca
+        el token y reintenta una vez; otros errores 4xx se propagan de inmediato.
         """
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import MediaFileUpload
+
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"No existe el archivo: {file_path}")
@@ -130,6 +493,10 @@ class YoutubeClient:
             },
         }
 
+        chunksize = chunksize or config.YOUTUBE_UPLOAD_CHUNKSIZE
+        limit = bandwidth.UPLOAD.limit()
+        if limit:
+            chunksize = min(chunksize, max(CHUNK_ALIGN, int(limit) // CHUNK_ALIGN * CHUNK_ALIGN))
         media = MediaFileUpload(str(file_path), chunksize=chunksize, resumable=resumable)
 
         request = youtube.videos().insert(
@@ -138,11 +505,198 @@ class YoutubeClient:
             media_body=media,
         )
 
+        resuming = resume_uri is not None
+        if resuming:
+            # En "error state" el próximo next_chunk hace un PUT vacío para
+            # preguntar qué bytes confirmó el servidor y sigue desde ese offset
+            request.resumable_uri = resume_uri
+            request._in_error_state = True
+            logger.info(f"Reanudando subida de {file_path}")
+
+        max_retries = config.YOUTUBE_UPLOAD_MAX_RETRIES if max_retries is None else max_retries
+        stats = stats if stats is not None else TransferStats()
+        stats.direction = "upload"
+        stats.start(media.size())
+        progress = TransferProgress(stats, Path(file_path).name)
+        confirmed = stats.start_offset if resuming else 0   # bytes confirmados por el servidor
+        attempt = 0           # reintentos consecutivos del chunk actual
+        auth_refreshed = False
+        retriable_exceptions = _retriable_exceptions()
+
         response = None
         while response is None:
-            status, response = request.next_chunk()
+            try:
+                bandwidth.UPLOAD.consume(min(chunksize, media.size() - confirmed))
+                status, response = request.next_chunk()
+            except HttpError as e:
+                if resuming and e.resp.status in (404, 410):
+                    # La sesión expiró o ya no existe: empezar una nueva desde cero
+                    logger.warning(f"Sesión de subida expirada, se reinicia desde cero: {file_path}")
+                    if on_restart is not None:
+                        on_restart()
+                    request.resumable_uri = None
+                    request.resumable_progress = 0
+                    request._in_error_state = False
+                    resuming = False
+                    stats.start_offset = confirmed = 0
+                    continue
+                if _is_quota_error(e):
+                    raise QuotaExceededError(f"Cuota de YouTube agotada: {_error_reason(e)}") from e
+                if e.resp.status == 401 and not auth_refreshed:
+                    self.refresh_credentials()
+                    auth_refreshed = True
+                    stats.record_retry(_error_label(e))
+                    continue
+                if not _is_retriable_error(e):
+                    raise
+                attempt += 1
+                stats.record_retry(_error_label(e))
+                concurrency.record_error("upload", throttled=_is_throttled(e))
+                _sleep_before_retry(e, attempt, max_retries)
+                continue
+            except retriable_exceptions as e:
+                # googleapiclient marca la request en "error state": el próximo
+                # next_chunk consulta el offset confirmado antes de reenviar
+                attempt += 1
+                stats.record_retry(_error_label(e))
+                concurrency.record_error("upload")
+                _sleep_before_retry(e, attempt, max_retries)
+                continue
+
+            attempt = 0
+            auth_refreshed = False
+            if resuming:
+                logger.info(
+                    f"Sesión reanudada: {request.resumable_progress} de {media.size()} bytes confirmados"
+                )
+                resuming = False
             if status:
-                logger.info(f"Upload progress: {int(status.progress() * 100)}%")
+                stats.record_bytes(request.resumable_progress - confirmed)
+                concurrency.record_bytes("upload", request.resumable_progress - confirmed)
+                confirmed = request.resumable_progress
+                if on_chunk is not None:
+                    on_chunk(request.resumable_uri, request.resumable_progress)
+                progress.update()
+
+        stats.record_bytes(media.size() - confirmed)
+        concurrency.record_bytes("upload", media.size() - confirmed)
+        progress.done()
         video_id = response.get("id")
+        if stats.retries:
+            logger.info(f"Subida completada con {stats.retries} reintento(s): {', '.join(stats.retry_errors)}")
         logger.info(f"Video subido correctamente: https://youtu.be/{video_id}")
-        return video_id
\ No newline at end of file
+        return video_id
+
+    def execute_batch(self, requests: Dict[str, Callable[[Any], Any]]) -> Dict[str, Any]:
+        """
+        Ejecuta muchas llamadas chicas agrupadas en requests batch HTTP
+        (hasta BATCH_MAX_REQUESTS por round trip).
+        - requests: clave → función que recibe el service y arma la request
+        - Devuelve clave → respuesta, o la excepción si también falló el
+          reintento individual. Los errores de cuota no se reintentan y se
+          devuelven como QuotaExceededError.
+        """
+        from googleapiclient.errors import HttpError
+
+        youtube = self.get_service()
+        results: Dict[str, Any] = {}
+        failed: List[str] = []
+        keys = list(requests)
+
+        for start in range(0, len(keys), BATCH_MAX_REQUESTS):
+            chunk = keys[start:start + BATCH_MAX_REQUESTS]
+
+            def callback(request_id, response, exception, chunk=chunk):
+                key = chunk[int(request_id)]
+                if exception is None:
+                    results[key] = response
+                elif isinstance(exception, HttpError) and _is_quota_error(exception):
+                    results[key] = QuotaExceededError(f"Cuota de YouTube agotada: {_error_reason(exception)}")
+                else:
+                    failed.append(key)
+
+            batch = youtube.new_batch_http_request(callback=callback)
+            for i, key in enumerate(chunk):
+                batch.add(requests[key](youtube), request_id=str(i))
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.warning(f"Falló el batch completo ({len(chunk)} requests): {e}")
+                failed.extend(k for k in chunk if k not in results and k not in failed)
+
+        # Reintento individual (con backoff de googleapiclient) de los que fallaron
+        for key in failed:
+            try:
+                results[key] = requests[key](youtube).execute(num_retries=BATCH_ITEM_RETRIES)
+            except HttpError as e:
+                if _is_quota_error(e):
+                    results[key] = QuotaExceededError(f"Cuota de YouTube agotada: {_error_reason(e)}")
+                else:
+                    results[key] = e
+            except Exception as e:
+                results[key] = e
+
+        if failed:
+            logger.info(f"Batch: {len(failed)} request(s) reintentadas de forma individual")
+        return results
+
+    def add_to_playlists(self, items: List[tuple]) -> Dict[str, Any]:
+        """
+        Agrega videos a playlists en requests batch.
+        - items: lista de (video_id, playlist_id)
+        - Devuelve "video_id:playlist_id" → respuesta o excepción
+        Necesita config.MANAGE_SCOPES (se piden al primer uso).
+        """
+        self.require_scopes(config.MANAGE_SCOPES)
+
+        def make(video_id: str, playlist_id: str):
+            body = {
+                "snippet": {
+                    "playlistId": playlist_id,
+                    "resourceId": {"kind": "youtube#video", "videoId": video_id},
+                }
+            }
+            return lambda youtube: youtube.playlistItems().insert(part="snippet", body=body)
+
+        requests = {f"{v}:{p}": make(v, p) for v, p in items}
+        return self.execute_batch(requests)
+
+    def update_videos_metadata(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Actualiza el snippet (title, description, tags, categoryId) de varios videos.
+        videos.update reemplaza el snippet completo, así que primero se leen los
+        snippets actuales con videos.list (hasta 50 ids por llamada) y se mezclan.
+        - updates: video_id → campos del snippet a cambiar
+        - Devuelve video_id → respuesta o excepción
+        Necesita config.MANAGE_SCOPES (se piden al primer uso).
+        """
+        self.require_scopes(config.MANAGE_SCOPES)
+        youtube = self.get_service()
+        ids = list(updates)
+        snippets: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(ids), BATCH_MAX_REQUESTS):
+            chunk = ids[start:start + BATCH_MAX_REQUESTS]
+            response = youtube.videos().list(part="snippet", id=",".join(chunk)).execute(
+                num_retries=BATCH_ITEM_RETRIES
+            )
+            for item in response.get("items", []):
+                snippets[item["id"]] = item["snippet"]
+
+        results: Dict[str, Any] = {}
+        requests = {}
+        for video_id in ids:
+            if video_id not in snippets:
+                results[video_id] = LookupError(f"Video no encontrado en YouTube: {video_id}")
+                continue
+            snippet = {
+                k: v for k, v in snippets[video_id].items()
+                if k in ("title", "description", "tags", "categoryId", "defaultLanguage")
+            }
+            snippet.update({k: v for k, v in updates[video_id].items() if v is not None})
+            body = {"id": video_id, "snippet": snippet}
+            requests[video_id] = lambda youtube, body=body: youtube.videos().update(part="snippet", body=body)
+
+        results.update(self.execute_batch(requests))
+        return results
+
@@ -3,36 +3,74 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Optional, List, Dict
-
-import requests
+from typing import Optional, List, Dict, TYPE_CHECKING
 
+from zoomtube.models import TransferStats
 from zoomtube.utils.logger import logger
+from zoomtube.utils import metrics as prom
+from zoomtube.utils import bandwidth, concurrency
+from zoomtube.utils.progress import TransferProgress
 from zoomtube import config
 
+if TYPE_CHECKING:
+    import requests
+
 ZOOM_API_BASE = "https://api.zoom.us/v2"
+ZOOM_OAUTH_URL = "https://zoom.us/oauth/token"
+ZOOM_PAGE_SIZE = 300   # máximo que acepta la API en users y recordings
 
 
 # =========================
 # Helpers internos (core)
 # =========================
 
+def _raise_for_status(resp: requests.Response) -> None:
+    """raise_for_status que además cuenta los 429 (rate limit) de Zoom."""
+    if resp.status_code == 429:
+        prom.ZOOM_RATE_LIMITED.inc()
+        concurrency.record_error("download", throttled=True)
+    resp.raise_for_status()
+
+
 def _get_access_token_core(account_id: str, client_id: str, client_secret: str) -> str:
+    import requests
+
     url = (
-        "https://zoom.us/oauth/token"
+        f"{ZOOM_OAUTH_URL}"
         f"?grant_type=account_credentials&account_id={account_id}"
     )
     resp = requests.post(url, auth=(client_id, client_secret))
-    resp.raise_for_status()
+    _raise_for_status(resp)
     return resp.json()["access_token"]
 
 
-def _list_users_core(session: requests.Session, token: str) -> List[Dict]:
-    url = f"{ZOOM_API_BASE}/users"
+def _get_all_pages_core(
+    session: requests.Session,
+    token: str,
+    url: str,
+    key: str,
+    params: Optional[Dict] = None,
+) -> List[Dict]:
+    """
+    Recorre todas las páginas de un listado de la API (next_page_token)
+    y devuelve los elementos de `key` concatenados.
+    """
     headers = {"Authorization": f"Bearer {token}"}
-    resp = session.get(url, headers=headers)
-    resp.raise_for_status()
-    return resp.json().get("users", [])
+    params = {**(params or {}), "page_size": ZOOM_PAGE_SIZE}
+    items: List[Dict] = []
+    while True:
+        resp = session.get(url, headers=headers, params=params)
+        _raise_for_status(resp)
+        data = resp.json()
+        items.extend(data.get(key, []))
+        next_page_token = data.get("next_page_token")
+        if not next_page_token:
+            return items
+        params["next_page_token"] = next_page_token
+
+
+def _list_users_core(session: requests.Session, token: str) -> List[Dict]:
+    return _get_all_pages_core(session, token, f"{ZOOM_API_BASE}/users", "users")
 
 
 def _list_recordings_core(
@@ -45,12 +83,13 @@ def _list_recordings_core(
     max_duration: Optional[int] = None,
 ) -> List[Dict]:
     end_date = end_date or start_date
-    url = f"{ZOOM_API_BASE}/users/{user_id}/recordings?from={start_date}&to={end_date}"
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = session.get(url, headers=headers)
-    resp.raise_for_status()
-
-    meetings = resp.json().get("meetings", [])
+    meetings = _get_all_pages_core(
+        session,
+        token,
+        f"{ZOOM_API_BASE}/users/{user_id}/recordings",
+        "meetings",
+        params={"from": start_date, "to": end_date},
+    )
     filtered: List[Dict] = []
 
     for m in meetings:
@@ -76,17 +115,35 @@ def _download_recording_core(
     token: str,
     file_url: str,
     dest_path: Path,
+    stats: Optional[TransferStats] = None,
 ) -> None:
     headers = {"Authorization": f"Bearer {token}"}
-    with session.get(file_url, headers=headers, stream=True) as r:
-        r.raise_for_status()
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(dest_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-            f.flush()
-            os.fsync(f.fileno())
+    stats = stats if stats is not None else TransferStats(direction="download")
+    stats.start()
+    progress = TransferProgress(stats, dest_path.name)
+    try:
+        with session.get(file_url, headers=headers, stream=True) as r:
+            _raise_for_status(r)
+            if r.headers.get("Content-Length"):
+                stats.total_bytes = int(r.headers["Content-Length"])
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(dest_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=8192):
+                    if chunk:
+                        # Leer más lento frena al servidor (control de flujo de TCP)
+                        bandwidth.DOWNLOAD.consume(len(chunk))
+                        f.write(chunk)
+                        stats.record_bytes(len(chunk))
+                        concurrency.record_bytes("download", len(chunk))
+                        progress.update()
+                f.flush()
+                os.fsync(f.fileno())
+    except Exception as e:
+        # Los 429 ya se contaron en _raise_for_status
+        if getattr(getattr(e, "response", None), "status_code", None) != 429:
+            concurrency.record_error("download")
+        raise
+    progress.done()
 
 
 # =========================
@@ -115,7 +172,16 @@ class ZoomClient:
         self.client_secret = client_secret or config.ZOOM_CLIENT_SECRET
 
         self._token: Optional[str] = token
-        self._session: requests.Session = session or requests.Session()
+        # requests se importa recién al crear la sesión (primer uso)
+        self._session_obj: Optional[requests.Session] = session
+
+    @property
+    def _session(self) -> requests.Session:
+        if self._session_obj is None:
+            import requests
+
+            self._session_obj = requests.Session()
+        return self._session_obj
 
     def get_access_token(self, force_refresh: bool = False) -> str:
         if self._token is not None and not force_refresh:
@@ -150,7 +216,17 @@ class ZoomClient:
             max_duration=max_duration,
         )
 
-    def download_recording(self, file_url: str, dest_path: Path) -> None:
+    def download_recording(
+        self,
+        file_url: str,
+        dest_path: Path,
+        stats: Optional[TransferStats] = None,
+    ) -> None:
+        """
+        Descarga una grabación a disco. Si se pasa stats, se completa con
+        bytes, tiempos y throughput de la descarga. Respeta el límite global
+        de bajada (BANDWIDTH_DOWN, compartido con las demás descargas).
+        """
         token = self.get_access_token()
-        _download_recording_core(self._session, token, file_url, dest_path)
+        _download_recording_core(self._session, token, file_url, dest_path, stats)
         logger.info(f"Grabación guardada en {dest_path}")
@@ -1,7 +1,6 @@
 # src/zoom2yt/config.py
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
 # --- Paths base ---
 BASE_DIR = Path(__file__).resolve().parents[2]   # raíz del repo (nivel arriba de src/)
@@ -21,27 +20,199 @@ YOUTUBE_TOKEN_FILE = CONFIG_DIR / "token.pickle"
 
 # --- Cargar variables de entorno ---
 # Prioridad: ~/.zoom2yt.env > .env local
+# Se cargan recién cuando se pide una variable de entorno (no al importar),
+# así los subcomandos que no las usan no pagan el costo de python-dotenv.
 GLOBAL_ENV = Path.home() / ".zoom2yt.env"
 LOCAL_ENV = BASE_DIR / ".env"
 
-if GLOBAL_ENV.exists():
-    load_dotenv(GLOBAL_ENV)
-if LOCAL_ENV.exists():
-    load_dotenv(LOCAL_ENV, override=True)
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Carga los archivos .env una sola vez."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+
+    if not GLOBAL_ENV.exists() and not LOCAL_ENV.exists():
+        return
+
+    from dotenv import load_dotenv
+
+    if GLOBAL_ENV.exists():
+        load_dotenv(GLOBAL_ENV)
+    if LOCAL_ENV.exists():
+        load_dotenv(LOCAL_ENV, override=True)
+
+
+def getenv(name: str, default=None):
+    """os.getenv, pero asegurando que los .env ya estén cargados."""
+    load_env()
+    return os.getenv(name, default)
 
-# --- Variables de Zoom ---
-ZOOM_ACCOUNT_ID = os.getenv("ZOOM_ACCOUNT_ID")
-ZOOM_CLIENT_ID = os.getenv("ZOOM_CLIENT_ID")
-ZOOM_CLIENT_SECRET = os.getenv("ZOOM_CLIENT_SECRET")
-RECORDINGS_BASE_PATH = os.getenv("RECORDINGS_BASE_PATH", str(DATA_DIR / "recordings"))
 
 # --- Variables de YouTube ---
 API_SERVICE_NAME = "youtube"
 API_VERSION = "v3"
-SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
+SCOPES = [
+    "https://www.googleapis.com/auth/youtube.upload",
+]
+# Playlists y edición de metadata: se piden recién cuando se usan, así un
+# token que solo sube videos no obliga a autorizar de nuevo
+MANAGE_SCOPES = [
+    "https://www.googleapis.com/auth/youtube",
+]
+# Tamaño de chunk de las subidas resumables: múltiplo de 256 KiB
+_CHUNK_ALIGN = 256 * 1024
+
+
+# --- Variables que dependen del entorno (se resuelven al primer acceso) ---
+_ENV_SETTINGS = {
+    # Zoom
+    "ZOOM_ACCOUNT_ID": lambda: getenv("ZOOM_ACCOUNT_ID"),
+    "ZOOM_CLIENT_ID": lambda: getenv("ZOOM_CLIENT_ID"),
+    "ZOOM_CLIENT_SECRET": lambda: getenv("ZOOM_CLIENT_SECRET"),
+    # Secret Token de la app de Zoom (firma de los webhooks, zoomtube serve)
+    "ZOOM_WEBHOOK_SECRET_TOKEN": lambda: getenv("ZOOM_WEBHOOK_SECRET_TOKEN"),
+    # Usuarios a procesar (ids o emails separados por coma; vacío = todos los de la cuenta)
+    "ZOOM_USERS": lambda: [u.strip() for u in getenv("ZOOM_USERS", "").split(",") if u.strip()] or None,
+    "RECORDINGS_BASE_PATH": lambda: getenv("RECORDINGS_BASE_PATH", str(DATA_DIR / "recordings")),
+    # Cuota diaria del proyecto en Google Cloud (unidades de la YouTube Data API)
+    "YOUTUBE_DAILY_QUOTA": lambda: int(getenv("YOUTUBE_DAILY_QUOTA", "10000")),
+    # Tamaño de chunk de las subidas resumables (default 16 MiB)
+    "YOUTUBE_UPLOAD_CHUNKSIZE": lambda: max(
+        _CHUNK_ALIGN,
+        int(getenv("YOUTUBE_UPLOAD_CHUNKSIZE", str(16 * 1024 * 1024))) // _CHUNK_ALIGN * _CHUNK_ALIGN,
+    ),
+    # Reintentos por chunk ante errores transitorios (5xx, 429, errores de red)
+    "YOUTUBE_UPLOAD_MAX_RETRIES": lambda: int(getenv("YOUTUBE_UPLOAD_MAX_RETRIES", "10")),
+    "FFMPEG_BIN": lambda: getenv("FFMPEG_BIN", "ffmpeg"),
+    # Staging: presupuesto de disco para descargas sin subir (0 = sin límite) y limpieza post-subida
+    "STAGING_BUDGET_GB": lambda: float(getenv("STAGING_BUDGET_GB", "0")),
+    "AFTER_UPLOAD": lambda: getenv("AFTER_UPLOAD", "keep"),
+    "ARCHIVE_DIR": lambda: getenv("ARCHIVE_DIR"),
+    # Límite de ancho de banda en MB/s, opcionalmente por franja horaria (ver utils/bandwidth.py)
+    "BANDWIDTH_DOWN": lambda: _parse_bandwidth(getenv("BANDWIDTH_DOWN")),
+    "BANDWIDTH_UP": lambda: _parse_bandwidth(getenv("BANDWIDTH_UP")),
+    # Orden de descargas y subidas: api, largest, smallest o newest (ver utils/scheduling.py)
+    "TRANSFER_ORDER": lambda: getenv("TRANSFER_ORDER", "largest"),
+    # Métricas Prometheus: textfile de node_exporter y/o endpoint /metrics local
+    "METRICS_TEXTFILE": lambda: getenv("ZOOMTUBE_METRICS_TEXTFILE"),
+    "METRICS_PORT": lambda: int(getenv("ZOOMTUBE_METRICS_PORT", "0")) or None,
+    # Carpeta de resultados de --profile
+    "PROFILE_DIR": lambda: getenv("ZOOMTUBE_PROFILE_DIR", "profiles"),
+    # Varias cuentas: perfil a usar (--account) y archivo con los perfiles
+    "ACCOUNT": lambda: getenv("ZOOMTUBE_ACCOUNT"),
+    "PROFILES_FILE": lambda: Path(getenv("ZOOMTUBE_PROFILES", str(CONFIG_DIR / "profiles.json"))),
+    # Carpeta de los registros de estado (default: src/state)
+    "STATE_DIR": lambda: getenv("ZOOMTUBE_STATE_DIR"),
+    # Parte de la cuenta que procesa este proceso ("i/N", ver utils/sharding.py)
+    "SHARD": lambda: _parse_shard(getenv("ZOOMTUBE_SHARD"), getenv("ZOOMTUBE_SHARD_BY", "user")),
+}
+
+
+def __getattr__(name: str):
+    # PEP 562: se calcula una vez y queda cacheado como atributo del módulo
+    if name in _ENV_SETTINGS:
+        value = _ENV_SETTINGS[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _parse_shard(spec, by: str):
+    if not spec:
+        return None
+    from zoomtube.utils.sharding import Shard
+
+    return Shard.parse(spec, by)
+
+
+def _parse_bandwidth(spec):
+    if not spec:
+        return None
+    from zoomtube.utils.bandwidth import BandwidthSchedule
+
+    return BandwidthSchedule.parse(spec)
+
+
+# Settings fijados explícitamente (perfil de cuenta, shard) en vez de leerse del entorno
+_overridden: set[str] = set()
+
+
+def set_setting(name: str, value) -> None:
+    """Fija un setting para el resto del proceso (pisa al entorno y a los .env)."""
+    globals()[name] = value
+    _overridden.add(name)
+
+
+# --- Perfiles de cuenta (config/profiles.json) ---
+# Clave del perfil → setting. Los paths relativos se toman desde la raíz del repo.
+PROFILE_SETTINGS = {
+    "zoom_account_id": "ZOOM_ACCOUNT_ID",
+    "zoom_client_id": "ZOOM_CLIENT_ID",
+    "zoom_client_secret": "ZOOM_CLIENT_SECRET",
+    "zoom_webhook_secret_token": "ZOOM_WEBHOOK_SECRET_TOKEN",
+    "users": "ZOOM_USERS",
+    "youtube_client_secrets": "YOUTUBE_CLIENT_SECRETS",
+    "youtube_token_file": "YOUTUBE_TOKEN_FILE",
+    "youtube_daily_quota": "YOUTUBE_DAILY_QUOTA",
+    "recordings_path": "RECORDINGS_BASE_PATH",
+    "state_dir": "STATE_DIR",
+}
+_PROFILE_PATHS = {"youtube_client_secrets", "youtube_token_file", "recordings_path", "state_dir"}
+
+
+def load_profiles() -> dict:
+    """Perfiles de cuenta definidos en PROFILES_FILE ({} si no existe)."""
+    import json
+
+    path = globals().get("PROFILES_FILE") or __getattr__("PROFILES_FILE")
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def apply_profile(name: str) -> dict:
+    """
+    Aplica un perfil de cuenta: una cuenta de Zoom (y opcionalmente un filtro
+    de usuarios) asociada a un canal de YouTube (su token), con sus propias
+    carpetas de estado y de descargas. Lo que el perfil no define sigue
+    saliendo del entorno.
+
+    Un valor "env:NOMBRE" se lee de esa variable de entorno (para no dejar
+    secretos en el archivo). Devuelve el perfil aplicado.
+    """
+    profiles = load_profiles()
+    if name not in profiles:
+        known = ", ".join(sorted(profiles)) or "ninguno"
+        raise ValueError(f"Perfil de cuenta desconocido: {name} (definidos: {known})")
+    profile = profiles[name]
+    unknown = set(profile) - set(PROFILE_SETTINGS)
+    if unknown:
+        raise ValueError(f"Perfil {name}: claves desconocidas: {', '.join(sorted(unknown))}")
+
+    for key, value in profile.items():
+        if isinstance(value, str) and value.startswith("env:"):
+            env_name, value = value[4:], getenv(value[4:])
+            if value is None:
+                raise ValueError(f"Perfil {name}: {key} usa {env_name}, que no está definida")
+        if key in _PROFILE_PATHS:
+            value = BASE_DIR / Path(value).expanduser()
+            if key in ("recordings_path", "state_dir"):
+                value = str(value)
+        elif key == "users" and isinstance(value, str):
+            value = [u.strip() for u in value.split(",") if u.strip()]
+        elif key == "youtube_daily_quota":
+            value = int(value)
+        set_setting(PROFILE_SETTINGS[key], value)
+    return profile
+
 
 # Directorio por defecto de descargas (puede ser override en CLI)
 def get_download_dir() -> Path:
-    return Path(os.getenv("RECORDINGS_BASE_PATH", Path.home() / "Documents" / "zoomtube"))
-
-FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+    if "RECORDINGS_BASE_PATH" in _overridden:
+        return Path(globals()["RECORDINGS_BASE_PATH"])
+    return Path(getenv("RECORDINGS_BASE_PATH", Path.home() / "Documents" / "zoomtube"))
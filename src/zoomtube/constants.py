@@ -21,4 +21,66 @@ VIDEO_EXTENSIONS = [".mp4", ".mov", ".avi", ".mkv"]
 
 
 DEFAULT_SILENCE_THRESHOLD_DB = -35   # más negativo = más estricto
-DEFAULT_SILENCE_RATIO = 0.9          # 90% de silencio como máximo tolerado
\ No newline at end of file
+DEFAULT_SILENCE_RATIO = 0.9          # 90% de silencio como máximo tolerado
+
+DEFAULT_OPTIMIZE_PRESET = "veryfast"   # preset de libx264 al recodificar
+DEFAULT_OPTIMIZE_MIN_SAVING = 0.10     # no recodificar si se ahorra menos del 10%
+
+
+# Costo en unidades de cuota de la YouTube Data API por operación
+YOUTUBE_QUOTA_COSTS = {
+    "videos.insert": 1600,
+    "videos.list": 1,
+    "videos.update": 50,
+    "playlistItems.insert": 50,
+}
+
+# Progreso de transferencias: como mucho una línea de log cada N segundos por archivo
+PROGRESS_LOG_INTERVAL = 10.0
+
+# zoomtube watch: cada cuánto consultar Zoom y cada cuánto volver a listar los usuarios
+WATCH_INTERVAL = 300          # segundos entre consultas
+WATCH_USERS_REFRESH = 3600    # segundos que se reutiliza la lista de usuarios
+
+# zoomtube serve: receptor del webhook recording.completed de Zoom
+WEBHOOK_PATH = "/zoom/webhook"
+WEBHOOK_PORT = 8080
+WEBHOOK_QUEUE_SIZE = 100      # eventos en espera; con la cola llena se responde 503 y Zoom reintenta
+WEBHOOK_MAX_SKEW = 300        # segundos de antigüedad máxima de x-zm-request-timestamp
+WEBHOOK_SEEN_SIZE = 1000      # uuids de reuniones recordados para descartar reintentos
+WEBHOOK_JOB_KIND = "webhook"  # tipo de trabajo de las reuniones recibidas (cola de jobs.db, no la de `jobs work`)
+
+# Qué hacer con el archivo local después de subirlo con éxito
+AFTER_UPLOAD_ACTIONS = ["keep", "delete", "archive"]
+
+# Formatos de salida de zoomtube list
+LIST_FORMATS = ["table", "json", "csv"]
+
+# zoomtube --profile
+PROFILE_MODES = ["cpu", "mem", "both"]
+
+# Logs: archivo rotativo (ZOOMTUBE_LOG_MAX_MB / ZOOMTUBE_LOG_BACKUPS) y formato (ZOOMTUBE_LOG_FORMAT)
+LOG_MAX_MB = 20
+LOG_BACKUP_COUNT = 10
+LOG_FORMATS = ["text", "json"]
+
+# zoomtube --shard i/N: por qué se reparte la cuenta entre los procesos
+SHARD_KEYS = ["user", "meeting"]
+
+# zoomtube jobs: cola de trabajos (src/state/jobs.db)
+JOB_KINDS = ["download", "analyze", "upload"]
+JOB_LEASE_SECONDS = 300       # un trabajo tomado vuelve a la cola si su worker no renueva el lease
+JOB_HEARTBEAT_SECONDS = 60    # cada cuánto se renuevan los leases de los trabajos en curso
+JOB_MAX_ATTEMPTS = 5          # intentos por trabajo antes de quedar en "failed"
+JOB_RETRY_BASE = 30           # espera antes del reintento n: base * 2**(n-1) segundos…
+JOB_RETRY_CAP = 1800          # …con este tope
+JOB_IDLE_POLL = 5             # segundos entre consultas cuando no hay trabajos listos
+
+# Orden del trabajo en download/upload/process/jobs (--order, TRANSFER_ORDER)
+ORDER_POLICIES = ["api", "largest", "smallest", "newest"]
+
+# Concurrencia adaptativa de transferencias (--adaptive, ver utils/concurrency.py)
+CONCURRENCY_INTERVAL = 15       # segundos por ventana de medición (una decisión por ventana)
+CONCURRENCY_MIN_GAIN = 0.05     # mejora mínima de throughput para que una suba valga la pena
+CONCURRENCY_ERROR_RATE = 0.25   # errores por transferencia activa en una ventana que fuerzan la baja
+CONCURRENCY_HOLD_WINDOWS = 4    # ventanas sin subir después de una baja
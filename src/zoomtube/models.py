@@ -0,0 +1,125 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class MediaOptimizationResult:
+    """
+    Resultado de optimizar un video antes de subirlo.
+    action: "remuxed" | "reencoded" | "skipped" | "failed"
+    """
+    path: str
+    action: str
+    original_size: int
+    final_size: int
+
+    @property
+    def reduction(self) -> float:
+        if not self.original_size:
+            return 0.0
+        return 1 - self.final_size / self.original_size
+
+
+@dataclass
+class TransferStats:
+    """
+    Métricas de una transferencia (subida o descarga): bytes, tiempos,
+    throughput y reintentos. Los tiempos son de time.monotonic().
+    - start_offset: bytes que ya estaban transferidos al empezar (ej: sesión reanudada)
+    - ttfb: segundos hasta el primer byte/chunk confirmado
+    - peak_mbps: máximo de la velocidad instantánea (ventana de INSTANT_WINDOW segundos)
+    """
+    direction: str = "upload"
+    total_bytes: int = 0
+    start_offset: int = 0
+    bytes_transferred: int = 0
+    retries: int = 0
+    retry_errors: list[str] = field(default_factory=list)
+    started_at: Optional[float] = None
+    first_byte_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    peak_mbps: float = 0.0
+    _window: deque = field(default_factory=deque, init=False, repr=False)
+
+    INSTANT_WINDOW = 5.0
+
+    def start(self, total_bytes: Optional[int] = None) -> None:
+        if total_bytes is not None:
+            self.total_bytes = total_bytes
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+            self._window.append((self.started_at, 0))
+
+    def record_bytes(self, n: int) -> None:
+        """Suma n bytes transferidos (confirmados por el servidor, en subidas)."""
+        now = time.monotonic()
+        if self.started_at is None:
+            self.start()
+        if self.first_byte_at is None:
+            self.first_byte_at = now
+        self.bytes_transferred += n
+
+        # Muestras para la velocidad instantánea: a lo sumo una cada 0.5 s
+        if now - self._window[-1][0] >= 0.5:
+            self._window.append((now, self.bytes_transferred))
+            while len(self._window) > 2 and now - self._window[1][0] >= self.INSTANT_WINDOW:
+                self._window.popleft()
+            if now - self._window[0][0] >= 1.0:
+                self.peak_mbps = max(self.peak_mbps, self.instant_mbps)
+
+    def record_retry(self, error: str) -> None:
+        self.retries += 1
+        self.retry_errors.append(error)
+
+    def finish(self) -> None:
+        if self.finished_at is None:
+            self.finished_at = time.monotonic()
+            # Transferencias más cortas que la ventana: el pico es al menos el promedio
+            self.peak_mbps = max(self.peak_mbps, self.avg_mbps)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def ttfb(self) -> Optional[float]:
+        if self.started_at is None or self.first_byte_at is None:
+            return None
+        return self.first_byte_at - self.started_at
+
+    @property
+    def progress(self) -> float:
+        if not self.total_bytes:
+            return 0.0
+        return min((self.start_offset + self.bytes_transferred) / self.total_bytes, 1.0)
+
+    @property
+    def avg_mbps(self) -> float:
+        elapsed = self.elapsed
+        return self.bytes_transferred / elapsed / 1_000_000 if elapsed > 0 else 0.0
+
+    @property
+    def instant_mbps(self) -> float:
+        """Velocidad de los últimos INSTANT_WINDOW segundos."""
+        t0, b0 = self._window[0] if self._window else (self.started_at or 0.0, 0)
+        elapsed = time.monotonic() - t0
+        return (self.bytes_transferred - b0) / elapsed / 1_000_000 if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        ttfb = self.ttfb
+        return {
+            "direction": self.direction,
+            "bytes": self.bytes_transferred,
+            "total_bytes": self.total_bytes,
+            "start_offset": self.start_offset,
+            "elapsed_s": round(self.elapsed, 3),
+            "ttfb_s": round(ttfb, 3) if ttfb is not None else None,
+            "avg_mbps": round(self.avg_mbps, 2),
+            "peak_mbps": round(self.peak_mbps, 2),
+            "retries": self.retries,
+            "retry_errors": list(self.retry_errors),
+        }
@@ -1,12 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, TYPE_CHECKING
 from zoomtube.registries import recordings
 from zoomtube.utils.audio import AudioAnalyzer
-from zoomtube.registries import downloads
+from zoomtube.registries import downloads, uploads
 
-from zoomtube.clients import zoom_client
+from zoomtube.clients import get_zoom_client
+from zoomtube.models import TransferStats
+from zoomtube.utils.concurrency import ConcurrencyController
 from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import span, traced
+from zoomtube.utils.sharding import owns_meeting, select_users
+from zoomtube.utils.scheduling import Eta, order
 from zoomtube.utils.recordings import (
     get_unique_filename,
     sanitize_filename,
@@ -17,7 +24,11 @@ from zoomtube.constants import (
 )
 from zoomtube.config import get_download_dir
 
+if TYPE_CHECKING:
+    from zoomtube.utils.staging import StagingArea
 
+
+@traced("download.run")
 def run(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -30,10 +41,32 @@ def run(
     check_audio: bool = False,
     silence_threshold: int = DEFAULT_SILENCE_THRESHOLD_DB,
     silence_ratio: float = DEFAULT_SILENCE_RATIO,
+    staging: Optional["StagingArea"] = None,
+    on_downloaded: Optional[Callable[[Path], None]] = None,
+    order_by: str = "api",
+    workers: int = 1,
+    adaptive: bool = False,
+    min_workers: int = 1,
+    slots: Optional[ConcurrencyController] = None,
 ) -> None:
     """
-    Descargar grabaciones de Zoom y guardarlas en disco.
+    Descargar grabaciones de Zoom y guardarlas en disco, en una carpeta por día
+    (YYYY-MM-DD) dentro de output_path.
     También registra TODAS las grabaciones encontradas (aunque no se descarguen).
+
+    order_by ordena las reuniones según el file_size de los archivos a bajar
+    ("largest", "smallest"), su fecha ("newest") o el orden de la API ("api");
+    a medida que terminan se loguea el progreso con un ETA.
+
+    Con staging, cada descarga reserva su tamaño antes de empezar y espera si
+    el presupuesto de disco está agotado. on_downloaded recibe cada archivo
+    listo para subir apenas termina (ej: para subirlo mientras sigue la descarga).
+
+    Se descargan hasta `workers` reuniones en paralelo; con adaptive, la
+    cantidad se ajusta durante la corrida entre min_workers y workers según
+    throughput, errores y 429 (ver utils.concurrency.ConcurrencyController).
+    slots es un controlador ya iniciado y compartido con otras corridas (ej:
+    los días de process.run); reemplaza a workers/adaptive/min_workers.
     """
 
     # Resolver fechas
@@ -53,14 +86,23 @@ def run(
     logger.info(f"Destino: {target_dir}")
 
     # Usuarios (el cliente maneja token internamente)
-    users = zoom_client.list_users()
-
+    zoom_client = get_zoom_client()
+    with span("zoom.list_users") as s:
+        users = zoom_client.list_users()
+        s.set(count=len(users))
+    # Filtro de usuarios del perfil y/o shard por usuario
+    selected = select_users(users)
+    if len(selected) != len(users):
+        logger.info(f"Usuarios a procesar: {len(selected)} de {len(users)}")
+    users = selected
 
     audio_analyzer = AudioAnalyzer(
         silence_threshold_db=silence_threshold,
         silence_ratio_threshold=silence_ratio,
     )
     
+    # Primero se listan todas las reuniones, para poder ordenarlas (ver order_by)
+    meetings = []
     for user in users:
         user_id = user.get("id")
         if not user_id:
@@ -68,124 +110,299 @@ def run(
         
         logger.debug(f"Consultando grabaciones de usuario {user_id}")
 
-        meetings = zoom_client.list_recordings(
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date,
-            min_duration=min_duration,
-            max_duration=max_duration,
-        )
+        with span("zoom.list_recordings", user_id=user_id) as s:
+            listed = zoom_client.list_recordings(
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                min_duration=min_duration,
+                max_duration=max_duration,
+            )
+            s.set(count=len(listed))
+        meetings.extend(m for m in listed if owns_meeting(m))
+
+    def planned(meeting: dict) -> list[dict]:
+        return choose_files(meeting.get("recording_files", []), recording_types, preferred_types)
+
+    def planned_bytes(meeting: dict) -> int:
+        return sum(f.get("file_size") or 0 for f in planned(meeting))
+
+    meetings = order(meetings, order_by, size=planned_bytes, newest=lambda m: m.get("start_time") or "")
+    eta = Eta("Descargas", sum(len(planned(m)) for m in meetings), sum(planned_bytes(m) for m in meetings))
+
+    owned = slots is None
+    if owned:
+        workers = max(1, workers)
+        slots = ConcurrencyController("descargas", "download", min_workers if adaptive else workers, workers)
 
+    def fetch(meeting: dict) -> None:
+        # Con un rango, cada reunión va a la carpeta de su día (como con --date),
+        # así upload/process encuentran las descargas por fecha
+        meeting_dir = target_dir if date else target_dir / (meeting.get("start_time") or start_date)[:10]
+        with slots.slot():
+            process_meeting(
+                zoom_client,
+                meeting,
+                meeting_dir,
+                recording_types=recording_types,
+                preferred_types=preferred_types,
+                check_audio=check_audio,
+                audio_analyzer=audio_analyzer,
+                staging=staging,
+                on_downloaded=on_downloaded,
+            )
+        eta.advance(planned_bytes(meeting), files=len(planned(meeting)))
+
+    if slots.ceiling == 1 or len(meetings) <= 1:
         for meeting in meetings:
-            meeting_id = meeting.get("id")
-            topic = sanitize_filename(meeting.get("topic", "sin_titulo"))
-            duration = meeting.get("duration", 0)
-            start_time = meeting.get("start_time")
-            files = meeting.get("recording_files", [])
-
-            if not files:
-                logger.warning(f"Reunión sin grabaciones válidas: {topic}")
-                continue
+            fetch(meeting)
+        return
+
+    if owned:
+        logger.info(f"Descargando {len(meetings)} reunión(es) con hasta {slots.ceiling} descargas en paralelo")
+    with ThreadPoolExecutor(max_workers=slots.ceiling, thread_name_prefix="download") as pool, \
+            (slots if owned else nullcontext()):
+        # list(): que se propague el primer error inesperado
+        list(pool.map(fetch, meetings))
+
 
-            # Registrar todas como disponibles
-            recordings.register_meeting(
-                meeting_id=meeting_id,
-                topic=topic,
-                start_time=start_time,
-                duration=duration,
-                files=[{"type": f.get("recording_type"), "status": "available"} for f in files],
+# =========================
+# Pasos por archivo (también los usan los handlers de zoomtube jobs)
+# =========================
+
+def select_files(
+    meeting: dict,
+    recording_types: Optional[list[str]] = None,
+    preferred_types: Optional[list[str]] = None,
+) -> list[dict]:
+    """
+    Registra una reunión listada desde Zoom (todas sus grabaciones como
+    disponibles) y devuelve los archivos a descargar: el primero de
+    preferred_types que exista, los de recording_types o, sin ninguno de
+    los dos, todos. Los demás quedan como skipped_by_preference.
+    """
+    meeting_id = meeting.get("id")
+    files = meeting.get("recording_files", [])
+    if not files:
+        logger.warning(f"Reunión sin grabaciones válidas: {meeting_topic(meeting)}")
+        return []
+
+    # Registrar todas como disponibles
+    recordings.register_meeting(
+        meeting_id=meeting_id,
+        topic=meeting_topic(meeting),
+        start_time=meeting.get("start_time"),
+        duration=meeting.get("duration", 0),
+        files=[{"type": f.get("recording_type"), "status": "available"} for f in files],
+    )
+
+    if not recording_types and not preferred_types:
+        return list(files)
+    files_to_process = choose_files(files, recording_types, preferred_types)
+
+    # Las demás se marcan como omitidas
+    for f in files:
+        if f not in files_to_process:
+            recordings.update_file_status(
+                meeting_id,
+                f.get("recording_type"),
+                "skipped_by_preference",
+            )
+    return files_to_process
+
+
+def choose_files(
+    files: list[dict],
+    recording_types: Optional[list[str]] = None,
+    preferred_types: Optional[list[str]] = None,
+) -> list[dict]:
+    """Qué archivos de una reunión descargar (sin registrar nada; ver select_files)."""
+    if preferred_types:
+        # Buscar la primera que exista en orden de preferencia
+        for pref in preferred_types:
+            chosen = next(
+                (f for f in files if f.get("recording_type") == pref),
+                None,
             )
+            if chosen:
+                return [chosen]
+        return []
+    if recording_types:
+        return [
+            f for f in files if f.get("recording_type") in recording_types
+        ]
+    return files
+
+
+def meeting_topic(meeting: dict) -> str:
+    return sanitize_filename(meeting.get("topic", "sin_titulo"))
+
+
+def file_name(meeting: dict, file_info: dict) -> str:
+    """Nombre técnico del archivo local (evita colisiones entre tipos de grabación)."""
+    safe_type = (file_info.get("recording_type") or "unknown").lower()
+    return f"{meeting_topic(meeting)}__{safe_type}.mp4"
+
+
+def fetch_file(zoom_client, meeting: dict, file_info: dict, dest_path: Path, stats: TransferStats) -> None:
+    """Descarga un archivo y lo registra como pendiente del chequeo de audio."""
+    meeting_id = meeting.get("id")
+    file_type = file_info.get("recording_type")
+    topic = meeting_topic(meeting)
+    duration = meeting.get("duration", 0)
+    if not file_info.get("download_url"):
+        raise ValueError(f"Grabación sin URL: {topic} ({file_type})")
+
+    logger.info(f"Descargando {topic} ({duration} min) [{file_type}] → {dest_path}")
+    # OO: sin token externo
+    with span("zoom.download", meeting_id=meeting_id, file_type=file_type) as s:
+        zoom_client.download_recording(file_info["download_url"], dest_path, stats=stats)
+        s.set(bytes=stats.bytes_transferred)
+
+    downloads.register_download(
+        str(dest_path), topic, duration, "pending_audio_check", stats.as_dict()
+    )
+    recordings.update_file_status(meeting_id, file_type, "downloaded", local_path=str(dest_path))
+
+
+def check_file_audio(meeting: dict, file_type: str, dest_path: Path, audio_analyzer: AudioAnalyzer) -> bool:
+    """
+    Verifica que un archivo descargado tenga audio. Si está en silencio lo
+    registra como descartado, lo borra y devuelve False.
+    """
+    meeting_id = meeting.get("id")
+    duration = meeting.get("duration", 0)
+    with span("audio.check", meeting_id=meeting_id, file_type=file_type) as s:
+        ok_audio = audio_analyzer.has_audio(dest_path, duration * 60)
+        s.set(has_audio=ok_audio)
+    if ok_audio:
+        return True
+
+    logger.warning(f"Descartada por silencio: {dest_path}")
+    downloads.register_download(str(dest_path), meeting_topic(meeting), duration, "discarded_silence")
+    recordings.update_file_status(meeting_id, file_type, "discarded_audio")
+    dest_path.unlink(missing_ok=True)
+    return False
+
+
+def mark_ready(meeting: dict, dest_path: Path) -> None:
+    """Registra un archivo descargado (y con audio) como listo para subir."""
+    downloads.register_download(str(dest_path), meeting_topic(meeting), meeting.get("duration", 0), "success")
+
+
+def _previous_file(meeting: dict, file_type: str) -> dict:
+    """El archivo de la reunión según recordings.json (estado y ruta local de corridas anteriores)."""
+    record = recordings.get_meeting(meeting.get("id")) or {}
+    return next((f for f in record.get("files", []) if f.get("type") == file_type), {})
 
-            # Selección de qué descargar
-            files_to_process = []
-
-            if preferred_types:
-                # Buscar la primera que exista en orden de preferencia
-                for pref in preferred_types:
-                    chosen = next(
-                        (f for f in files if f.get("recording_type") == pref),
-                        None,
-                    )
-                    if chosen:
-                        files_to_process = [chosen]
-                        break
-                # Las demás se marcan como omitidas
-                for f in files:
-                    if f not in files_to_process:
-                        recordings.update_file_status(
-                            meeting_id,
-                            f.get("recording_type"),
-                            "skipped_by_preference",
-                        )
-
-            elif recording_types:
-                files_to_process = [
-                    f for f in files if f.get("recording_type") in recording_types
-                ]
-                for f in files:
-                    if f not in files_to_process:
-                        recordings.update_file_status(
-                            meeting_id,
-                            f.get("recording_type"),
-                            "skipped_by_preference",
-                        )
-            else:
-                files_to_process = files
-
-            # Descargar/analizar cada archivo elegido
-            for file_info in files_to_process:
-                file_type = file_info.get("recording_type")
-                file_url = file_info.get("download_url")
-
-                if not file_url:
-                    logger.warning(f"Grabación sin URL: {topic} ({file_type})")
-                    recordings.update_file_status(meeting_id, file_type, "failed")
+
+def failed_files(meeting: dict) -> list[str]:
+    """
+    Tipos de archivo de la reunión que quedaron "failed" en recordings.json
+    (sin URL o con error de descarga). Los descartados por silencio no cuentan.
+    """
+    record = recordings.get_meeting(meeting.get("id")) or {}
+    return [f["type"] for f in record.get("files", []) if f.get("status") == "failed"]
+
+
+def register_failed(meeting: dict, file_type: str, dest_path: Path, stats: Optional[TransferStats] = None) -> None:
+    downloads.register_download(
+        str(dest_path), meeting_topic(meeting), meeting.get("duration", 0), "failed",
+        stats.as_dict() if stats else None,
+    )
+    recordings.update_file_status(meeting.get("id"), file_type, "failed")
+
+
+def process_meeting(
+    zoom_client,
+    meeting: dict,
+    target_dir: Path,
+    recording_types: Optional[list[str]] = None,
+    preferred_types: Optional[list[str]] = None,
+    check_audio: bool = False,
+    audio_analyzer: Optional[AudioAnalyzer] = None,
+    staging: Optional["StagingArea"] = None,
+    on_downloaded: Optional[Callable[[Path], None]] = None,
+) -> list[Path]:
+    """
+    Registra una reunión listada desde Zoom, descarga los archivos elegidos
+    (según preferred_types o recording_types) en target_dir y, si check_audio,
+    descarta los que estén en silencio.
+    Devuelve las rutas de los archivos que quedaron listos para subir.
+
+    Con staging, la reserva de cada archivo se libera acá si se descarta o
+    falla; la de los que quedan listos la libera quien los sube.
+
+    Lo que ya se resolvió en una corrida anterior (ej: un resume de process)
+    no se vuelve a descargar: los descartados por silencio y los ya subidos se
+    omiten, y una descarga que sigue en disco se reutiliza. Solo se bajan de
+    nuevo los que fallaron o cuyo archivo ya no está.
+    """
+    kept: list[Path] = []
+    audio_analyzer = audio_analyzer or AudioAnalyzer()
+    meeting_id = meeting.get("id")
+    topic = meeting_topic(meeting)
+
+    # Descargar/analizar cada archivo elegido
+    for file_info in select_files(meeting, recording_types, preferred_types):
+        file_type = file_info.get("recording_type")
+
+        if not file_info.get("download_url"):
+            logger.warning(f"Grabación sin URL: {topic} ({file_type})")
+            recordings.update_file_status(meeting_id, file_type, "failed")
+            continue
+
+        previous = _previous_file(meeting, file_type)
+        if previous.get("status") == "discarded_audio":
+            logger.info(f"Descartada por silencio en una corrida anterior (omitida): {topic} ({file_type})")
+            continue
+        local_path = previous.get("local_path") if previous.get("status") == "downloaded" else None
+        if local_path and uploads.is_uploaded(local_path):
+            logger.info(f"Ya descargada y subida (omitida): {local_path}")
+            continue
+        reuse = bool(local_path) and Path(local_path).is_file()
+
+        dest_path = Path(local_path) if reuse else get_unique_filename(target_dir, file_name(meeting, file_info))
+        if staging is not None:
+            staging.reserve(dest_path, file_info.get("file_size") or 0)
+        stats = TransferStats(direction="download")
+        with span("download.file", meeting_id=meeting_id, file_type=file_type):
+            try:
+                if reuse:
+                    logger.info(f"Ya descargada en una corrida anterior: {dest_path}")
+                else:
+                    fetch_file(zoom_client, meeting, file_info, dest_path, stats)
+
+                already_checked = reuse and downloads.get_status(str(dest_path)) == "success"
+                if check_audio and not already_checked \
+                        and not check_file_audio(meeting, file_type, dest_path, audio_analyzer):
+                    if staging is not None:
+                        staging.release(dest_path)
                     continue
 
-                # Nombre técnico para evitar colisiones
-                safe_type = (file_type or "unknown").lower()
-                dest_filename = f"{topic}__{safe_type}.mp4"
-
-                dest_path = get_unique_filename(target_dir, dest_filename)
-
-
-                try:
-                    logger.info(
-                        f"Descargando {topic} ({duration} min) [{file_type}] → {dest_path}"
-                    )
-
-                    # OO: sin token externo
-                    zoom_client.download_recording(file_url, dest_path)
-
-                    downloads.register_download(
-                        str(dest_path), topic, duration, "pending_audio_check"
-                    )
-                    recordings.update_file_status(meeting_id, file_type, "downloaded")
-
-                    if check_audio:
-                        duration_secs = duration * 60
-                        ok_audio = audio_analyzer.has_audio(
-                            dest_path,
-                            duration_secs,
-                        )
-                        if not ok_audio:
-                            logger.warning(f"Descartada por silencio: {dest_path}")
-                            downloads.register_download(
-                                str(dest_path), topic, duration, "discarded_silence"
-                            )
-                            recordings.update_file_status(
-                                meeting_id, file_type, "discarded_audio"
-                            )
-                            dest_path.unlink(missing_ok=True)
-                            continue
-
-                    downloads.register_download(
-                        str(dest_path), topic, duration, "success"
-                    )
-
-                except Exception as e:
-                    logger.error(f"Error descargando {topic}: {e}")
-                    downloads.register_download(
-                        str(dest_path), topic, duration, "failed"
-                    )
-                    recordings.update_file_status(meeting_id, file_type, "failed")
\ No newline at end of file
+                if not already_checked:
+                    mark_ready(meeting, dest_path)
+                kept.append(dest_path)
+
+            except Exception as e:
+                logger.error(f"Error descargando {topic}: {e}")
+                register_failed(meeting, file_type, dest_path, stats)
+                # Sin esto queda la reserva vacía (o la descarga a medias) y
+                # run_batch / process la tomarían como un video para subir
+                dest_path.unlink(missing_ok=True)
+                if staging is not None:
+                    staging.release(dest_path)
+                continue
+
+        # Fuera del try: un error de quien recibe el archivo no es un error de
+        # descarga (el archivo ya quedó "success" y sigue pendiente de subir)
+        if on_downloaded is not None:
+            try:
+                on_downloaded(dest_path)
+            except Exception as e:
+                logger.error(f"Error entregando {dest_path} para subir: {e}")
+                # Nadie lo va a subir en esta corrida: no retener su reserva
+                if staging is not None:
+                    staging.release(dest_path)
+
+    return kept
@@ -0,0 +1,184 @@
+import hashlib
+import html
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from zoomtube.registries import uploads, embeds
+from zoomtube.utils.logger import logger
+from zoomtube import config
+
+EMBED_URL = "https://www.youtube.com/embed/{video_id}"
+
+HTML_HEADER = (
+    "<!DOCTYPE html>\n"
+    "<html lang=\"es\">\n"
+    "<head>\n"
+    "<meta charset=\"utf-8\">\n"
+    "<title>Videos</title>\n"
+    "</head>\n"
+    "<body>\n"
+)
+HTML_FOOTER = "</body>\n</html>\n"
+JSON_HEADER = "[\n"
+JSON_FOOTER = "\n]\n"
+
+
+def _record_hash(record: dict) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _iframe(video_id: str, title: str) -> str:
+    return (
+        f'<iframe width="560" height="315" src="{EMBED_URL.format(video_id=video_id)}" '
+        f'title="{html.escape(title)}" frameborder="0" allowfullscreen></iframe>'
+    )
+
+
+def _entry(record: dict) -> dict:
+    """Entrada de iframes.json para una subida exitosa."""
+    return {
+        "title": record["title"],
+        "youtube_id": record["youtube_id"],
+        "url": EMBED_URL.format(video_id=record["youtube_id"]),
+        "iframe": _iframe(record["youtube_id"], record["title"]),
+        "local_path": record["local_path"],
+        "uploaded_at": record["uploaded_at"],
+    }
+
+
+def _render_json(entries: List[dict]) -> str:
+    return ",\n".join(json.dumps(e, ensure_ascii=False) for e in entries)
+
+
+def _render_html(entries: List[dict]) -> str:
+    return "".join(f"<h3>{html.escape(e['title'])}</h3>\n{e['iframe']}\n" for e in entries)
+
+
+def _latest_successes(records: List[dict]) -> Dict[str, dict]:
+    """Última subida exitosa por archivo, en orden de primera aparición."""
+    latest: Dict[str, dict] = {}
+    for r in records:
+        if r["status"] == "success" and r.get("youtube_id"):
+            latest[r["local_path"]] = r
+    return latest
+
+
+def _write_full(entries: List[dict], json_path: Path, html_path: Path) -> dict:
+    """Reescribe ambos archivos completos. Devuelve los offsets de fin de contenido."""
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    html_path.parent.mkdir(parents=True, exist_ok=True)
+
+    json_body = (JSON_HEADER + _render_json(entries)).encode("utf-8")
+    html_body = (HTML_HEADER + _render_html(entries)).encode("utf-8")
+    json_path.write_bytes(json_body + JSON_FOOTER.encode("utf-8"))
+    html_path.write_bytes(html_body + HTML_FOOTER.encode("utf-8"))
+    return {"json_end": len(json_body), "html_end": len(html_body)}
+
+
+def _append(path: Path, offset: int, body: str, footer: str) -> int:
+    """
+    Agrega contenido antes del cierre del archivo (pisando el footer en offset)
+    y vuelve a escribir el footer. Devuelve el nuevo offset de fin de contenido.
+    """
+    data = body.encode("utf-8")
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.truncate()
+        f.write(data)
+        f.write(footer.encode("utf-8"))
+    return offset + len(data)
+
+
+def _mark_is_valid(mark: dict, records: List[dict], json_path: Path, html_path: Path) -> bool:
+    """
+    La marca sirve si apunta a los mismos archivos, estos no se tocaron desde la
+    última generación y uploads.json solo creció (el registro en la posición de
+    la marca sigue siendo el mismo).
+    """
+    if not mark:
+        return False
+    if mark.get("json_path") != str(json_path) or mark.get("html_path") != str(html_path):
+        return False
+    try:
+        if json_path.stat().st_size != mark["json_end"] + len(JSON_FOOTER.encode("utf-8")):
+            return False
+        if html_path.stat().st_size != mark["html_end"] + len(HTML_FOOTER.encode("utf-8")):
+            return False
+    except OSError:
+        return False
+    count = mark.get("count", 0)
+    if count > len(records):
+        return False
+    return count == 0 or _record_hash(records[count - 1]) == mark.get("last_hash")
+
+
+def run(
+    json_path: Optional[str] = None,
+    html_path: Optional[str] = None,
+    full: bool = False,
+) -> int:
+    """
+    Genera iframes.json y el HTML de embeds a partir de uploads.json.
+
+    Es incremental: se guarda una marca de agua (cantidad de registros ya
+    procesados + hash del último) y solo se renderizan las subidas nuevas, que
+    se agregan al final de ambos archivos sin reescribirlos. Si un archivo ya
+    publicado cambió (se volvió a subir con otro ID o título), si los archivos
+    generados se editaron a mano o si uploads.json se reescribió, se regenera
+    todo. full=True fuerza la regeneración completa.
+
+    Devuelve la cantidad de entradas renderizadas.
+    """
+    json_path = Path(json_path or config.IFRAME_JSON_FILE)
+    html_path = Path(html_path or config.HTML_FILE)
+
+    records = uploads.get_all_uploads()
+    mark = embeds.get_mark()
+    incremental = not full and _mark_is_valid(mark, records, json_path, html_path)
+
+    if incremental:
+        items: Dict[str, str] = mark["items"]
+        new_entries: List[dict] = []
+        for local_path, record in _latest_successes(records[mark["count"]:]).items():
+            entry = _entry(record)
+            entry_hash = _record_hash({k: entry[k] for k in ("title", "youtube_id")})
+            if items.get(local_path) == entry_hash:
+                continue
+            if local_path in items:
+                logger.info(f"Embed modificado ({local_path}), se regenera todo")
+                incremental = False
+                break
+            items[local_path] = entry_hash
+            new_entries.append(entry)
+
+    if incremental:
+        if new_entries:
+            separator = ",\n" if mark["json_end"] > len(JSON_HEADER) else ""
+            mark["json_end"] = _append(
+                json_path, mark["json_end"], separator + _render_json(new_entries), JSON_FOOTER
+            )
+            mark["html_end"] = _append(html_path, mark["html_end"], _render_html(new_entries), HTML_FOOTER)
+        rendered = len(new_entries)
+    else:
+        entries = [_entry(r) for r in _latest_successes(records).values()]
+        mark = {
+            "json_path": str(json_path),
+            "html_path": str(html_path),
+            **_write_full(entries, json_path, html_path),
+            "items": {
+                e["local_path"]: _record_hash({k: e[k] for k in ("title", "youtube_id")})
+                for e in entries
+            },
+        }
+        rendered = len(entries)
+
+    mark["count"] = len(records)
+    mark["last_hash"] = _record_hash(records[-1]) if records else None
+    embeds.save_mark(mark)
+
+    logger.info(
+        f"Embeds {'actualizados' if incremental else 'regenerados'}: {rendered} renderizado(s), "
+        f"{len(mark['items'])} en total → {json_path}, {html_path}"
+    )
+    return rendered
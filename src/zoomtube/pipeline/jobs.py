@@ -0,0 +1,472 @@
+import os
+import socket
+import sys
+import threading
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, TextIO
+
+from zoomtube.pipeline import download, upload
+from zoomtube.registries import jobs, quota
+from zoomtube.clients import get_youtube_client, get_zoom_client, QuotaExceededError
+from zoomtube.models import TransferStats
+from zoomtube.utils.audio import AudioAnalyzer
+from zoomtube.utils.concurrency import ConcurrencyController
+from zoomtube.utils.logger import logger
+from zoomtube.utils.recordings import get_unique_filename
+from zoomtube.utils.scheduling import priority
+from zoomtube.utils.sharding import owns_meeting, select_users
+from zoomtube.utils.shutdown import GracefulShutdown
+from zoomtube.utils.tracing import span, tracer
+from zoomtube.utils import staging
+from zoomtube import config
+import zoomtube.constants as constants
+
+
+class RetryLater(Exception):
+    """El trabajo todavía no puede correr (ej: sin cuota): vuelve a la cola sin gastar un intento."""
+
+    def __init__(self, reason: str, delay: float):
+        super().__init__(reason)
+        self.delay = delay
+
+
+class Job:
+    """Un trabajo tomado de la cola, a nombre de `owner` mientras dure su lease."""
+
+    def __init__(self, record: dict, owner: str):
+        self.id = record["id"]
+        self.kind = record["kind"]
+        self.key = record["key"]
+        self.payload = record["payload"]
+        self.attempts = record["attempts"]
+        self.priority = record["priority"]
+        self.owner = owner
+
+    def save(self, **changes) -> None:
+        """Actualiza el payload en la cola (sobrevive a un reintento en otro worker)."""
+        self.payload.update(changes)
+        jobs.save_payload(self.id, self.owner, self.payload)
+
+    def __repr__(self) -> str:
+        return f"{self.kind} {self.key}"
+
+
+# =========================
+# Encolar
+# =========================
+
+def _next_payload(job: Job, path: Path) -> dict:
+    return {"meeting": job.payload["meeting"], "file_type": job.payload["file"].get("recording_type"),
+            "path": str(path), "options": job.payload["options"]}
+
+
+def _start_timestamp(meeting: dict) -> float:
+    try:
+        return datetime.fromisoformat((meeting.get("start_time") or "").replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def enqueue_meetings(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    date: Optional[str] = None,
+    min_duration: int = 10,
+    max_duration: Optional[int] = None,
+    output_path: Optional[str] = None,
+    recording_types: Optional[list[str]] = None,
+    preferred_types: Optional[list[str]] = None,
+    check_audio: bool = True,
+    playlist_id: Optional[str] = None,
+    privacy_status: str = "unlisted",
+    after_upload: str = "keep",
+    archive_dir: Optional[str] = None,
+    order_by: str = "api",
+) -> int:
+    """
+    Lista las grabaciones de Zoom del rango (como download.run, con el mismo
+    filtro de usuarios y shard) y encola un trabajo de descarga por cada
+    archivo elegido. Cada descarga encola su análisis de audio (o su subida,
+    sin check_audio) y cada análisis su subida, con estas mismas opciones.
+    Encolar dos veces el mismo rango no duplica trabajos.
+    order_by fija la prioridad de cada trabajo (ver utils.scheduling) según el
+    file_size del archivo o la fecha de la reunión; las etapas siguientes la
+    heredan.
+    Devuelve la cantidad de trabajos nuevos.
+    """
+    if date:
+        start_date = end_date = date
+    elif not start_date and not end_date:
+        start_date = end_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    start_date, end_date = start_date or end_date, end_date or start_date
+    if not recording_types and not preferred_types:
+        preferred_types = constants.DEFAULT_PREFERRED_TYPES
+    base_dir = Path(output_path) if output_path else Path(config.RECORDINGS_BASE_PATH)
+    options = {
+        "check_audio": check_audio,
+        "playlist_id": playlist_id,
+        "privacy_status": privacy_status,
+        "after_upload": after_upload,
+        "archive_dir": archive_dir,
+    }
+
+    zoom_client = get_zoom_client()
+    with span("zoom.list_users") as s:
+        users = select_users(zoom_client.list_users())
+        s.set(count=len(users))
+
+    found = added = 0
+    for user in users:
+        user_id = user.get("id")
+        if not user_id:
+            continue
+        with span("zoom.list_recordings", user_id=user_id) as s:
+            meetings = zoom_client.list_recordings(
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                min_duration=min_duration,
+                max_duration=max_duration,
+            )
+            s.set(count=len(meetings))
+
+        for meeting in meetings:
+            if not owns_meeting(meeting):
+                continue
+            summary = {k: meeting.get(k) for k in ("id", "uuid", "topic", "start_time", "duration")}
+            day = (meeting.get("start_time") or start_date)[:10]
+            for file_info in download.select_files(meeting, recording_types, preferred_types):
+                if not file_info.get("download_url"):
+                    logger.warning(f"Grabación sin URL: {summary['topic']} ({file_info.get('recording_type')})")
+                    continue
+                found += 1
+                file_key = file_info.get("id") or file_info.get("recording_type")
+                key = f"{meeting.get('uuid') or meeting.get('id')}:{file_key}"
+                payload = {"meeting": summary, "file": file_info,
+                           "target_dir": str(base_dir / day), "options": options}
+                rank = priority(order_by, file_info.get("file_size") or 0, _start_timestamp(meeting))
+                if jobs.enqueue("download", key, payload, priority=rank) is not None:
+                    added += 1
+
+    logger.info(f"Trabajos de descarga encolados: {added} nuevo(s) de {found} archivo(s) ({start_date} a {end_date})")
+    return added
+
+
+def enqueue_folder(
+    folder: str,
+    playlist_id: Optional[str] = None,
+    privacy_status: str = "unlisted",
+    after_upload: str = "keep",
+    archive_dir: Optional[str] = None,
+    order_by: str = "api",
+) -> int:
+    """
+    Encola un trabajo de subida por cada video de la carpeta (los ya subidos
+    se saltean al correr), con prioridad según order_by, el tamaño en disco
+    y la fecha de modificación.
+    """
+    folder_path = Path(folder)
+    if not folder_path.is_dir():
+        raise NotADirectoryError(f"Carpeta inválida: {folder}")
+    options = {
+        "playlist_id": playlist_id,
+        "privacy_status": privacy_status,
+        "after_upload": after_upload,
+        "archive_dir": archive_dir,
+    }
+    added = 0
+    for name in sorted(os.listdir(folder_path)):
+        if not any(name.lower().endswith(ext) for ext in constants.VIDEO_EXTENSIONS):
+            continue
+        path = (folder_path / name).resolve()
+        payload = {"path": str(path), "title": upload.title_from_filename(path), "options": options}
+        stat = path.stat()
+        rank = priority(order_by, stat.st_size, stat.st_mtime)
+        if jobs.enqueue("upload", str(path), payload, priority=rank) is not None:
+            added += 1
+    logger.info(f"Trabajos de subida encolados: {added}")
+    return added
+
+
+# =========================
+# Handlers
+# =========================
+
+_audio_analyzer: Optional[AudioAnalyzer] = None
+
+
+def _handle_download(job: Job, optimizer=None) -> None:
+    """Descarga un archivo de Zoom y encola su análisis de audio (o su subida)."""
+    meeting, file_info = job.payload["meeting"], job.payload["file"]
+    file_type = file_info.get("recording_type")
+
+    # El destino se elige una vez por intento: un reintento lo vuelve a reservar
+    if job.payload.get("dest_path"):
+        dest_path = Path(job.payload["dest_path"])
+    else:
+        dest_path = get_unique_filename(Path(job.payload["target_dir"]), download.file_name(meeting, file_info))
+        job.save(dest_path=str(dest_path))
+
+    stats = TransferStats(direction="download")
+    with span("download.file", meeting_id=meeting.get("id"), file_type=file_type):
+        try:
+            download.fetch_file(get_zoom_client(), meeting, file_info, dest_path, stats)
+        except Exception:
+            download.register_failed(meeting, file_type, dest_path, stats)
+            # No dejar la reserva vacía ni la descarga a medias: run_batch,
+            # process y enqueue_folder la tomarían como un video para subir
+            dest_path.unlink(missing_ok=True)
+            job.save(dest_path=None)
+            raise
+
+    if job.payload["options"].get("check_audio"):
+        jobs.enqueue("analyze", job.key, _next_payload(job, dest_path), priority=job.priority)
+    else:
+        download.mark_ready(meeting, dest_path)
+        jobs.enqueue("upload", job.key, _next_payload(job, dest_path), priority=job.priority)
+
+
+def _handle_analyze(job: Job, optimizer=None) -> None:
+    """Verifica el audio de una descarga: la descarta si está en silencio o encola su subida."""
+    global _audio_analyzer
+    if _audio_analyzer is None:
+        _audio_analyzer = AudioAnalyzer(
+            silence_threshold_db=constants.DEFAULT_SILENCE_THRESHOLD_DB,
+            silence_ratio_threshold=constants.DEFAULT_SILENCE_RATIO,
+        )
+    meeting, path = job.payload["meeting"], Path(job.payload["path"])
+    if not path.is_file():
+        raise FileNotFoundError(f"No existe la descarga a analizar: {path}")
+    if download.check_file_audio(meeting, job.payload["file_type"], path, _audio_analyzer):
+        download.mark_ready(meeting, path)
+        jobs.enqueue("upload", job.key, job.payload, priority=job.priority)
+
+
+def _handle_upload(job: Job, optimizer=None) -> None:
+    """Sube un archivo a YouTube (y aplica la política post-subida)."""
+    path = Path(job.payload["path"])
+    options = job.payload["options"]
+    title = job.payload.get("title")
+    if not title and job.payload.get("meeting"):
+        title = download.meeting_topic(job.payload["meeting"])
+    try:
+        video_id = upload.upload_path(
+            str(path),
+            title=title or upload.title_from_filename(path),
+            privacy_status=options.get("privacy_status", "unlisted"),
+            tags=[],
+            playlist_id=options.get("playlist_id"),
+            optimizer=optimizer,
+        )
+    except QuotaExceededError as e:
+        raise RetryLater(str(e), quota.seconds_until_reset()) from e
+
+    if video_id and options.get("after_upload", "keep") != "keep":
+        staging.dispose(path, options["after_upload"], options.get("archive_dir"))
+
+
+HANDLERS = {
+    "download": _handle_download,
+    "analyze": _handle_analyze,
+    "upload": _handle_upload,
+}
+
+# Errores que no se arreglan reintentando
+_PERMANENT = (FileNotFoundError,)
+
+# Sentido de la transferencia de cada tipo de trabajo (para --adaptive)
+_DIRECTIONS = {"download": "download", "upload": "upload"}
+
+
+# =========================
+# Workers
+# =========================
+
+class Heartbeat:
+    """Renueva los leases de los trabajos en curso de este proceso, desde un thread aparte."""
+
+    def __init__(self, lease_seconds: float, every: float):
+        self.lease_seconds = lease_seconds
+        self.every = every
+        self._active: dict[int, Job] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="jobs-heartbeat", daemon=True)
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._active[job.id] = job
+
+    def remove(self, job: Job) -> None:
+        with self._lock:
+            self._active.pop(job.id, None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.every):
+            with self._lock:
+                active = list(self._active.values())
+            for job in active:
+                try:
+                    if not jobs.heartbeat(job.id, job.owner, self.lease_seconds):
+                        with self._lock:
+                            # Si ya no está activo, terminó mientras tanto: no se perdió nada
+                            lost = self._active.pop(job.id, None) is not None
+                        if lost:
+                            logger.warning(f"Se perdió el lease de {job} (otro worker puede retomarlo)")
+                except Exception as e:
+                    logger.error(f"No se pudo renovar el lease de {job}: {e}")
+
+
+def _run_job(job: Job, beat: Heartbeat, optimizer) -> str:
+    """Corre un trabajo y registra el resultado en la cola. Devuelve el estado final."""
+    beat.add(job)
+    try:
+        # El lease deja de renovarse antes de registrar el resultado
+        try:
+            with span(f"job.{job.kind}", attempt=job.attempts):
+                HANDLERS[job.kind](job, optimizer=optimizer)
+        finally:
+            beat.remove(job)
+    except RetryLater as e:
+        logger.warning(f"{job}: {e}; se reintenta en {e.delay / 60:.0f} min")
+        jobs.release(job.id, job.owner, e.delay, str(e))
+        return "queued"
+    except Exception as e:
+        status = jobs.fail(job.id, job.owner, f"{type(e).__name__}: {e}", retry=not isinstance(e, _PERMANENT))
+        if status == "failed":
+            logger.error(f"❌ {job} falló definitivamente tras {job.attempts} intento(s): {e}")
+        elif status == "queued":
+            logger.warning(f"{job} falló (intento {job.attempts}), se reintenta más tarde: {e}")
+        return status or "lost"
+    if not jobs.complete(job.id, job.owner):
+        logger.warning(f"{job} terminó, pero su lease ya había vencido")
+        return "lost"
+    return "done"
+
+
+def work(
+    workers: int = 1,
+    kinds: Optional[list[str]] = None,
+    lease_seconds: float = constants.JOB_LEASE_SECONDS,
+    drain: bool = False,
+    optimizer=None,
+    adaptive: bool = False,
+    min_workers: int = 1,
+) -> dict:
+    """
+    Corre `workers` threads que toman trabajos de la cola (de esos tipos, o
+    de todos) hasta Ctrl+C o, con drain, hasta que no queden trabajos en
+    cola ni tomados. Se pueden correr varios procesos a la vez en el mismo
+    host y con la misma carpeta de estado: cada trabajo lo toma uno solo. La
+    carpeta tiene que estar en un disco local (SQLite en WAL y flock no son
+    confiables sobre NFS/SMB), así que no sirve para repartir entre hosts.
+
+    Mientras un trabajo corre, su lease se renueva cada JOB_HEARTBEAT_SECONDS;
+    si el proceso muere, el lease vence y otro worker lo retoma. Un trabajo
+    que falla se reintenta con espera exponencial hasta JOB_MAX_ATTEMPTS.
+
+    Con adaptive, las descargas y las subidas en curso tienen cada una su
+    límite, ajustado entre min_workers y workers según throughput, errores
+    y 429 (ver utils.concurrency); un worker solo toma un trabajo de un tipo
+    con lugar libre. Los análisis de audio no cuentan.
+
+    Devuelve la cantidad de trabajos por resultado (done, queued, failed, lost).
+    """
+    kinds = kinds or list(constants.JOB_KINDS)
+    workers = max(1, workers)
+    if "upload" in kinds:
+        # Un daemon no puede quedarse esperando una autorización en el navegador (ver `zoomtube auth`)
+        get_youtube_client().interactive = False
+    owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+    results: dict[str, int] = {}
+    results_lock = threading.Lock()
+    heartbeat_every = min(constants.JOB_HEARTBEAT_SECONDS, lease_seconds / 3)
+    slots = {
+        direction: ConcurrencyController(label, direction, min_workers, workers)
+        for direction, label in (("download", "descargas"), ("upload", "subidas"))
+        if adaptive and direction in kinds
+    }
+
+    def claim(owner: str) -> tuple[Optional[dict], bool]:
+        """Toma un trabajo de un tipo con lugar libre. (trabajo, si algún tipo quedó afuera por falta de lugar)."""
+        held = [direction for direction, ctl in slots.items() if ctl.try_acquire()]
+        allowed = [kind for kind in kinds if kind not in _DIRECTIONS or _DIRECTIONS[kind] in held]
+        record = jobs.claim(owner, allowed, lease_seconds) if allowed else None
+        used = _DIRECTIONS.get(record["kind"]) if record else None
+        for direction in held:
+            if direction != used:
+                slots[direction].release()
+        return record, len(allowed) < len(kinds)
+
+    with GracefulShutdown("zoomtube jobs") as shutdown, Heartbeat(lease_seconds, heartbeat_every) as beat, \
+            ExitStack() as stack:
+        for ctl in slots.values():
+            stack.enter_context(ctl)
+
+        def loop() -> None:
+            owner = f"{owner_prefix}:{threading.current_thread().name}"
+            while not shutdown.requested:
+                record, limited = claim(owner)
+                if record is None:
+                    if drain and not jobs.pending(kinds):
+                        return
+                    # Sin lugar para un tipo: un lugar se libera o el límite sube antes del próximo poll
+                    shutdown.event.wait(1 if limited else constants.JOB_IDLE_POLL)
+                    continue
+                try:
+                    status = _run_job(Job(record, owner), beat, optimizer)
+                finally:
+                    if record["kind"] in _DIRECTIONS and _DIRECTIONS[record["kind"]] in slots:
+                        slots[_DIRECTIONS[record["kind"]]].release()
+                    # Los spans ya quedaron en las métricas; no acumularlos indefinidamente
+                    # (con drain la corrida es acotada: se guardan para el resumen final)
+                    if not drain:
+                        tracer.reset()
+                with results_lock:
+                    results[status] = results.get(status, 0) + 1
+
+        logger.info(f"zoomtube jobs: {workers} worker(s) para {', '.join(kinds)}"
+                    + (" (hasta vaciar la cola)" if drain else ""))
+        threads = [threading.Thread(target=loop, name=f"job-{i}") for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        # join con timeout: el thread principal tiene que seguir atendiendo las señales
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+
+    logger.info("Trabajos: " + (", ".join(f"{n} {status}" for status, n in sorted(results.items())) or "ninguno"))
+    return results
+
+
+# =========================
+# Estado
+# =========================
+
+def show_status(failed: int = 10, out: Optional[TextIO] = None) -> None:
+    """Cantidad de trabajos por tipo y estado, y los últimos que fallaron."""
+    out = out or sys.stdout
+    counts = jobs.counts()
+    if not counts:
+        print("La cola de trabajos está vacía.", file=out)
+        return
+    print("\n=== Trabajos ===", file=out)
+    print(f"{'tipo':<10} {'estado':<8} {'cantidad':>8}", file=out)
+    for row in counts:
+        print(f"{row['kind']:<10} {row['status']:<8} {row['count']:>8}", file=out)
+    recent = jobs.get_failed(failed) if failed else []
+    if recent:
+        print("\nÚltimos fallidos:", file=out)
+        for job in recent:
+            print(f"- {job['updated_at']} | {job['kind']} {job['key']} "
+                  f"({job['attempts']} intento(s)): {job['last_error']}", file=out)
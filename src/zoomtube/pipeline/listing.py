@@ -0,0 +1,221 @@
+import csv
+import json
+import sys
+from collections import deque
+from typing import Iterable, Iterator, Optional, TextIO
+
+from zoomtube.registries import recordings, uploads, downloads
+
+# Por registro: cómo recorrerlo, qué campo tiene la fecha y cuál el título
+MODES = {
+    "uploads": {
+        "iter": uploads.iter_uploads,
+        "date": "uploaded_at",
+        "topic": "title",
+        "title": "Subidas registradas",
+        "empty": "No hay registros de subidas aún.",
+        "columns": ["uploaded_at", "status", "title", "local_path", "youtube_id", "bytes", "avg_mbps"],
+    },
+    "downloads": {
+        "iter": downloads.iter_downloads,
+        "date": "downloaded_at",
+        "topic": "topic",
+        "title": "Descargas registradas",
+        "empty": "No hay registros de descargas aún.",
+        "columns": ["downloaded_at", "status", "topic", "duration", "local_path", "bytes", "avg_mbps", "disposal"],
+    },
+    "recordings": {
+        "iter": recordings.iter_recordings,
+        "date": "start_time",
+        "topic": "topic",
+        "title": "Grabaciones encontradas",
+        "empty": "No hay registros de grabaciones aún.",
+        "columns": ["start_time", "meeting_id", "topic", "duration", "type", "status"],
+    },
+}
+
+
+def _format_speed(record: dict) -> str:
+    """Tamaño y velocidad media de la transferencia registrada (si hay métricas)."""
+    metrics = record.get("metrics") or {}
+    if not metrics.get("bytes"):
+        return ""
+    return f" [{metrics['bytes'] / 1_000_000:.0f} MB · {metrics['avg_mbps']:.1f} MB/s]"
+
+
+def _statuses(mode: str, record: dict) -> list[str]:
+    """Estados de un registro; una reunión tiene uno por archivo."""
+    if mode == "recordings":
+        return [f.get("status") for f in record.get("files", [])]
+    return [record.get("status")]
+
+
+def _filter(
+    mode: str,
+    records: Iterable[dict],
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    topic: Optional[str] = None,
+) -> Iterator[dict]:
+    """Filtra los registros a medida que se leen (fechas YYYY-MM-DD, inclusivas)."""
+    spec = MODES[mode]
+    topic = topic.lower() if topic else None
+    for record in records:
+        day = (record.get(spec["date"]) or "")[:10]
+        if since and day < since:
+            continue
+        if until and day > until:
+            continue
+        if topic and topic not in (record.get(spec["topic"]) or "").lower():
+            continue
+        if status and status not in _statuses(mode, record):
+            continue
+        yield record
+
+
+# =========================
+# Formatos de salida
+# =========================
+
+def _rows(mode: str, record: dict) -> Iterator[dict]:
+    """Filas planas (CSV) de un registro; una reunión da una fila por archivo."""
+    if mode == "recordings":
+        for f in record.get("files", []):
+            yield {**record, "type": f.get("type"), "status": f.get("status")}
+        return
+    metrics = record.get("metrics") or {}
+    yield {
+        **record,
+        "bytes": metrics.get("bytes"),
+        "avg_mbps": metrics.get("avg_mbps"),
+        "disposal": (record.get("disposal") or {}).get("action"),
+    }
+
+
+def _write_table(mode: str, records: Iterable[dict], empty: str, out: TextIO) -> int:
+    count = 0
+    for record in records:
+        if not count:
+            print(f"\n=== {MODES[mode]['title']} ===", file=out)
+        count += 1
+        if mode == "uploads":
+            print(f"- {record['uploaded_at']} | {record['status']} | {record['title']} "
+                  f"({record['local_path']}) → {record.get('youtube_id')}{_format_speed(record)}", file=out)
+        elif mode == "downloads":
+            disposal = record.get("disposal")
+            print(f"- {record['downloaded_at']} | {record['status']} | {record['topic']} "
+                  f"({record['duration']} min) → {record['local_path']}{_format_speed(record)}"
+                  + (f" ({disposal['action']})" if disposal else ""), file=out)
+        else:
+            print(f"* {record['start_time']} | {record['topic']} ({record['duration']} min)", file=out)
+            for f in record["files"]:
+                print(f"   - {f['type']}: {f['status']}", file=out)
+    if not count:
+        print(empty, file=out)
+    return count
+
+
+def _write_json(records: Iterable[dict], out: TextIO) -> int:
+    """Array JSON escrito de a un elemento (no arma la lista en memoria)."""
+    count = 0
+    out.write("[")
+    for record in records:
+        out.write(",\n  " if count else "\n  ")
+        out.write(json.dumps(record, ensure_ascii=False))
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _write_csv(columns: list[str], rows: Iterable[dict], out: TextIO) -> int:
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+# =========================
+# Resumen
+# =========================
+
+def summarize(mode: str, records: Iterable[dict]) -> list[dict]:
+    """
+    Cantidad y bytes por día y estado, en una sola pasada.
+    En recordings cuenta archivos (no reuniones) y no hay bytes.
+    """
+    spec = MODES[mode]
+    totals: dict[tuple[str, str], list[int]] = {}
+    for record in records:
+        day = (record.get(spec["date"]) or "")[:10]
+        nbytes = (record.get("metrics") or {}).get("bytes") or 0
+        for status in _statuses(mode, record):
+            entry = totals.setdefault((day, status or ""), [0, 0])
+            entry[0] += 1
+            entry[1] += nbytes
+    return [
+        {"day": day, "status": status, "count": count, "bytes": nbytes}
+        for (day, status), (count, nbytes) in sorted(totals.items())
+    ]
+
+
+def _write_summary(mode: str, rows: list[dict], fmt: str, empty: str, out: TextIO) -> None:
+    if fmt == "json":
+        json.dump(rows, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+    elif fmt == "csv":
+        _write_csv(["day", "status", "count", "bytes"], rows, out)
+    elif not rows:
+        print(empty, file=out)
+    else:
+        print(f"\n=== {MODES[mode]['title']}: resumen por día ===", file=out)
+        print(f"{'día':<10}  {'estado':<22} {'cantidad':>8} {'MB':>10}", file=out)
+        for row in rows:
+            print(f"{row['day']:<10}  {row['status']:<22} {row['count']:>8} "
+                  f"{row['bytes'] / 1_000_000:>10.0f}", file=out)
+
+
+def run(
+    mode: str,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    topic: Optional[str] = None,
+    limit: Optional[int] = None,
+    fmt: str = "table",
+    summary: bool = False,
+    out: Optional[TextIO] = None,
+) -> int:
+    """
+    Lista un registro (uploads, downloads o recordings) leyéndolo de a un
+    registro por vez, así la memoria no crece con el tamaño del archivo.
+
+    - status / since / until (YYYY-MM-DD, inclusivas) / topic (subcadena, sin
+      distinguir mayúsculas) filtran los registros.
+    - limit deja solo los últimos N que pasan los filtros (los más recientes).
+    - fmt: "table" (legible), "json" o "csv" (una fila por archivo en recordings).
+    - summary: en vez de listar, muestra cantidad y bytes por día y estado.
+
+    Devuelve la cantidad de registros listados (o de filas del resumen).
+    """
+    out = out or sys.stdout
+    spec = MODES[mode]
+    filtered = any((status, since, until, topic))
+    empty = "Ningún registro coincide con los filtros." if filtered else spec["empty"]
+    records = _filter(mode, spec["iter"](), status=status, since=since, until=until, topic=topic)
+    if limit:
+        records = iter(deque(records, maxlen=limit))
+
+    if summary:
+        rows = summarize(mode, records)
+        _write_summary(mode, rows, fmt, empty, out)
+        return len(rows)
+
+    if fmt == "json":
+        return _write_json(records, out)
+    if fmt == "csv":
+        return _write_csv(spec["columns"], (row for record in records for row in _rows(mode, record)), out)
+    return _write_table(mode, records, empty, out)
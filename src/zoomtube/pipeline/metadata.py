@@ -0,0 +1,186 @@
+import csv
+import math
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from zoomtube.clients import get_youtube_client, QuotaExceededError
+from zoomtube.clients.youtube import BATCH_MAX_REQUESTS
+from zoomtube.constants import YOUTUBE_QUOTA_COSTS
+from zoomtube.registries import uploads, quota
+from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import traced
+from zoomtube import config
+
+METADATA_FIELDS = ("title", "description", "tags")
+
+
+def load_metadata_csv(csv_path) -> List[Dict]:
+    """
+    Lee un CSV de metadata (una fila por video). Columnas:
+    - file | local_path | youtube_id: a qué video aplica (nombre de archivo, ruta o ID)
+    - title, description, playlist_id: opcionales
+    - tags: opcional, separados por ";"
+    Las celdas vacías se ignoran (no pisan el valor actual).
+    """
+    rows: List[Dict] = []
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for raw in csv.DictReader(f):
+            row = {k.strip(): (v or "").strip() for k, v in raw.items() if k}
+            row = {k: v for k, v in row.items() if v}
+            if "tags" in row:
+                row["tags"] = [t.strip() for t in row["tags"].split(";") if t.strip()]
+            rows.append(row)
+    return rows
+
+
+def find_row(rows: List[Dict], file_path: Path) -> Optional[Dict]:
+    """Busca la fila del CSV que corresponde a un archivo (por ruta o por nombre)."""
+    for row in rows:
+        if row.get("local_path") and Path(row["local_path"]) == file_path:
+            return row
+        if row.get("file") and row["file"] in (file_path.name, file_path.stem):
+            return row
+    return None
+
+
+def _quota_cost(updates: int, playlist_items: int) -> int:
+    return (
+        math.ceil(updates / BATCH_MAX_REQUESTS) * YOUTUBE_QUOTA_COSTS["videos.list"]
+        + updates * YOUTUBE_QUOTA_COSTS["videos.update"]
+        + playlist_items * YOUTUBE_QUOTA_COSTS["playlistItems.insert"]
+    )
+
+
+def _pending_items(updates: Dict[str, Dict], playlist_items: List[tuple]) -> List[Dict]:
+    """Los cambios sin aplicar, en el formato de items de apply()."""
+    return (
+        [{"youtube_id": video_id, **fields} for video_id, fields in updates.items()]
+        + [{"youtube_id": video_id, "playlist_id": playlist_id} for video_id, playlist_id in playlist_items]
+    )
+
+
+@traced("youtube.metadata")
+def apply(items: List[Dict]) -> Dict[str, int]:
+    """
+    Aplica metadata y asignación a playlists a videos ya subidos, en requests
+    batch (pocos round trips para N videos). Los que fallan dentro del batch
+    se reintentan de forma individual.
+
+    items: dicts con "youtube_id" y opcionalmente title, description, tags, playlist_id.
+    Devuelve un resumen {"updated", "added_to_playlist", "failed"}.
+
+    Lo que no se puede aplicar por cuota (no alcanza para reservar, o la API
+    responde quotaExceeded) queda pendiente en el registro de subidas y se
+    suma a la próxima llamada (ver apply_pending). Si la llamada termina con
+    una excepción (ej: sin permisos), todo vuelve a quedar pendiente.
+    """
+    summary = {"updated": 0, "added_to_playlist": 0, "failed": 0}
+    items = uploads.take_pending_metadata() + list(items)
+
+    updates = {
+        i["youtube_id"]: {k: i[k] for k in METADATA_FIELDS if i.get(k)}
+        for i in items
+        if i.get("youtube_id") and any(i.get(k) for k in METADATA_FIELDS)
+    }
+    playlist_items = list(dict.fromkeys(
+        (i["youtube_id"], i["playlist_id"])
+        for i in items
+        if i.get("youtube_id") and i.get("playlist_id")
+    ))
+    if not updates and not playlist_items:
+        return summary
+
+    try:
+        return _apply(updates, playlist_items, summary)
+    except Exception:
+        # Ya se sacaron del registro: que no se pierdan
+        uploads.add_pending_metadata(_pending_items(updates, playlist_items))
+        raise
+
+
+def _apply(updates: Dict[str, Dict], playlist_items: List[tuple], summary: Dict[str, int]) -> Dict[str, int]:
+    """apply() con los cambios ya agrupados por video y por playlist."""
+    cost = _quota_cost(len(updates), len(playlist_items))
+    if not quota.try_consume(cost, config.YOUTUBE_DAILY_QUOTA):
+        logger.warning(
+            f"Cuota diaria de YouTube insuficiente ({cost} unidades) para actualizar "
+            f"metadata/playlists de: {', '.join(sorted({v for v, _ in playlist_items} | set(updates)))}"
+        )
+        summary["failed"] = len(updates) + len(playlist_items)
+        uploads.add_pending_metadata(_pending_items(updates, playlist_items))
+        return summary
+
+    client = get_youtube_client()
+    results = {}
+
+    if updates:
+        logger.info(f"Actualizando metadata de {len(updates)} video(s)")
+        for video_id, result in client.update_videos_metadata(updates).items():
+            results[f"metadata {video_id}"] = result
+            if not isinstance(result, Exception):
+                summary["updated"] += 1
+
+    if playlist_items:
+        logger.info(f"Agregando {len(playlist_items)} video(s) a playlists")
+        for key, result in client.add_to_playlists(playlist_items).items():
+            results[f"playlist {key}"] = result
+            if not isinstance(result, Exception):
+                summary["added_to_playlist"] += 1
+
+    skipped_updates: Dict[str, Dict] = {}
+    skipped_playlist_items: List[tuple] = []
+    for key, result in results.items():
+        if isinstance(result, Exception):
+            summary["failed"] += 1
+            logger.error(f"❌ Error en {key}: {result}")
+            if isinstance(result, QuotaExceededError):
+                quota.mark_exhausted(config.YOUTUBE_DAILY_QUOTA)
+                kind, _, target = key.partition(" ")
+                if kind == "metadata":
+                    skipped_updates[target] = updates[target]
+                else:
+                    skipped_playlist_items.append(tuple(target.split(":", 1)))
+
+    if skipped_updates or skipped_playlist_items:
+        uploads.add_pending_metadata(_pending_items(skipped_updates, skipped_playlist_items))
+
+    logger.info(
+        f"Metadata: {summary['updated']} actualizado(s), "
+        f"{summary['added_to_playlist']} agregado(s) a playlists, {summary['failed']} error(es)"
+    )
+    return summary
+
+
+def apply_pending() -> Dict[str, int]:
+    """Reintenta los cambios de metadata / playlists que quedaron pendientes por cuota."""
+    return apply([])
+
+
+def run(csv_path: str, playlist_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Aplica un CSV de metadata a videos ya subidos. Las filas por archivo se
+    resuelven a su youtube_id con uploads.json.
+    """
+    rows = load_metadata_csv(csv_path)
+
+    by_path: Dict[str, str] = {}
+    by_name: Dict[str, str] = {}
+    for u in uploads.get_all_uploads():
+        if u["status"] == "success" and u.get("youtube_id"):
+            by_path[u["local_path"]] = u["youtube_id"]
+            by_name[Path(u["local_path"]).name] = u["youtube_id"]
+            by_name[Path(u["local_path"]).stem] = u["youtube_id"]
+
+    items: List[Dict] = []
+    for row in rows:
+        youtube_id = (
+            row.get("youtube_id")
+            or by_path.get(row.get("local_path", ""))
+            or by_name.get(row.get("file", ""))
+        )
+        if not youtube_id:
+            logger.warning(f"Fila sin video subido asociado (omitida): {row}")
+            continue
+        items.append({**row, "youtube_id": youtube_id, "playlist_id": row.get("playlist_id") or playlist_id})
+
+    return apply(items)
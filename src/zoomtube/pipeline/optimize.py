@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from zoomtube.constants import VIDEO_EXTENSIONS
+from zoomtube.models import MediaOptimizationResult
+from zoomtube.utils.logger import logger
+from zoomtube.utils.media import MediaOptimizer, available_cpus
+
+
+def _format_mb(size: int) -> str:
+    return f"{size / 1_000_000:.1f} MB"
+
+
+def run_paths(
+    paths: Iterable,
+    optimizer: MediaOptimizer,
+    workers: Optional[int] = None,
+) -> List[MediaOptimizationResult]:
+    """
+    Optimiza una lista de archivos en paralelo, con un pool dimensionado
+    según los núcleos disponibles. Cada ffmpeg es un subproceso, así que
+    alcanza con threads para coordinarlos.
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        return []
+
+    cpus = available_cpus()
+    workers = max(1, min(workers or cpus, len(paths)))
+    if optimizer.reencode_enabled and not optimizer.threads:
+        # Repartir los núcleos entre los encoders para no sobresuscribir la CPU
+        optimizer.threads = max(1, cpus // workers)
+
+    logger.info(f"Optimizando {len(paths)} archivo(s) con {workers} worker(s)")
+
+    results: List[MediaOptimizationResult] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="optimize") as pool:
+        for result in pool.map(optimizer.optimize, paths):
+            results.append(result)
+            if result.action in ("remuxed", "reencoded"):
+                logger.info(
+                    f"Optimizado ({result.action}): {result.path} "
+                    f"{_format_mb(result.original_size)} → {_format_mb(result.final_size)} "
+                    f"(-{result.reduction:.0%})"
+                )
+            else:
+                logger.debug(f"Optimización {result.action}: {result.path}")
+
+    original = sum(r.original_size for r in results)
+    final = sum(r.final_size for r in results)
+    if original:
+        logger.info(
+            f"Optimización terminada: {_format_mb(original)} → {_format_mb(final)} "
+            f"(-{1 - final / original:.0%})"
+        )
+    return results
+
+
+def run(
+    folder: str,
+    optimizer: MediaOptimizer,
+    workers: Optional[int] = None,
+) -> List[MediaOptimizationResult]:
+    """
+    Optimiza todos los videos de una carpeta.
+    """
+    folder_path = Path(folder)
+    if not folder_path.exists() or not folder_path.is_dir():
+        logger.error(f"Carpeta inválida: {folder}")
+        return []
+
+    paths = [
+        p for p in sorted(folder_path.iterdir())
+        if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS
+    ]
+    return run_paths(paths, optimizer, workers=workers)
@@ -1,32 +1,74 @@
-from datetime import datetime, timedelta
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from datetime import date as date_cls, datetime, timedelta
 from pathlib import Path
+from typing import Optional
 
 from zoomtube.pipeline import download, upload
+from zoomtube.registries import uploads, backfill
 from zoomtube import config
+from zoomtube.utils.concurrency import ConcurrencyController
 from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import traced
+from zoomtube.utils import staging
 import zoomtube.constants as constants
 
 
-def run(date=None, check_audio=True):
-    """
-    Ejecuta el pipeline completo:
-    - Descarga grabaciones de Zoom.
-    - Sube los videos a YouTube.
+def _days(start_date: str, end_date: str) -> list[str]:
+    """Días entre start_date y end_date (inclusive), en orden."""
+    start = date_cls.fromisoformat(start_date)
+    end = date_cls.fromisoformat(end_date)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
 
-    Convenciones:
-    - Fecha por defecto: ayer.
-    - Tipos de grabación preferidos: DEFAULT_PREFERRED_TYPES.
-    - Privacidad en YouTube: unlisted.
-    - El título del video en YouTube se resuelve en upload.py
-      a partir del topic limpio (no del nombre técnico del archivo).
-    """
-    if not date:
-        date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
 
-    logger.info(f"Procesando pipeline completo para fecha {date}")
+def _pending_uploads(folder: Path) -> list[Path]:
+    """Videos de la carpeta que todavía no se subieron (ej: quedaron sin cuota)."""
+    if not folder.is_dir():
+        return []
+    return [
+        folder / name
+        for name in os.listdir(folder)
+        if any(name.lower().endswith(ext) for ext in constants.VIDEO_EXTENSIONS)
+        and not uploads.is_uploaded(str(folder / name))
+    ]
+
+
+def _dispose_uploaded(paths, after_upload: str, archive_dir: Optional[str]) -> None:
+    """Aplica la política post-subida a los archivos que quedaron subidos."""
+    if after_upload == "keep":
+        return
+    for path in paths:
+        if uploads.is_uploaded(str(path)):
+            try:
+                staging.dispose(path, after_upload, archive_dir)
+            except OSError as e:
+                logger.error(f"No se pudo limpiar {path}: {e}")
+
 
-    # --- Descarga ---
-    download.run(
+@traced("process.day")
+def _run_day(
+    date,
+    check_audio=True,
+    optimizer=None,
+    workers=1,
+    playlist_id=None,
+    staging_area: Optional[staging.StagingArea] = None,
+    after_upload: str = "keep",
+    archive_dir: Optional[str] = None,
+    order_by: str = "api",
+    download_slots: Optional[ConcurrencyController] = None,
+    upload_slots: Optional[ConcurrencyController] = None,
+) -> list[str]:
+    """
+    Descarga y sube las grabaciones de un día. Devuelve los IDs de los videos subidos.
+    download_slots / upload_slots: controladores de concurrencia compartidos
+    por todos los días (con --adaptive); sin ellos, las descargas van de a
+    una y cada día usa hasta `workers` subidas.
+    """
+    logger.info(f"Procesando pipeline completo para fecha {date}")
+    folder = Path(config.RECORDINGS_BASE_PATH) / date
+    download_kwargs = dict(
         date=date,
         min_duration=10,
         preferred_types=constants.DEFAULT_PREFERRED_TYPES,
@@ -34,14 +76,177 @@ def run(date=None, check_audio=True):
         check_audio=check_audio,
         silence_threshold=constants.DEFAULT_SILENCE_THRESHOLD_DB,
         silence_ratio=constants.DEFAULT_SILENCE_RATIO,
+        order_by=order_by,
+        slots=download_slots,
     )
-
-    # --- Subida ---
-    folder = Path(config.RECORDINGS_BASE_PATH) / date
-    upload.run_batch(
-        folder=folder,
+    upload_kwargs = dict(
         privacy_status="unlisted",
         tags=[],
         description="",
-        # playlist_id=None,
+        playlist_id=playlist_id,
+        optimizer=optimizer,
+        order_by=order_by,
     )
+
+    if staging_area is None:
+        # --- Descarga ---
+        download.run(**download_kwargs)
+
+        # --- Subida ---
+        video_ids = upload.run_batch(folder=folder, workers=workers, slots=upload_slots, **upload_kwargs)
+        if folder.is_dir():
+            _dispose_uploaded(sorted(folder.iterdir()), after_upload, archive_dir)
+        return video_ids
+
+    # Con presupuesto de disco, cada archivo se sube apenas se descarga: las
+    # subidas liberan espacio mientras la descarga espera por presupuesto
+    owned = upload_slots is None
+    slots = upload_slots or ConcurrencyController("subidas", "upload", workers, workers)
+
+    def upload_one(path: Path) -> list[str]:
+        try:
+            with slots.slot():
+                video_ids = upload.run_paths([path], **upload_kwargs)
+            _dispose_uploaded([path], after_upload, archive_dir)
+            return video_ids
+        finally:
+            staging_area.release(path)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="upload") as pool, ExitStack() as stack:
+        if owned:
+            stack.enter_context(slots)
+        futures = {}
+        download.run(
+            **download_kwargs,
+            staging=staging_area,
+            on_downloaded=lambda path: futures.setdefault(path, pool.submit(upload_one, path)),
+        )
+        video_ids = [video_id for future in futures.values() for video_id in future.result()]
+
+    # Lo que quedó sin subir de corridas anteriores (ej: sin cuota) ya está en disco
+    leftovers = [path for path in _pending_uploads(folder) if path not in futures]
+    if leftovers:
+        video_ids += upload.run_paths(leftovers, workers=workers, slots=upload_slots, **upload_kwargs)
+        _dispose_uploaded(leftovers, after_upload, archive_dir)
+    return video_ids
+
+
+@traced("process.run")
+def run(
+    date=None,
+    check_audio=True,
+    optimizer=None,
+    workers=1,
+    playlist_id=None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    parallel_days: int = 1,
+    resume: bool = True,
+    staging_budget_gb: float = 0,
+    after_upload: str = "keep",
+    archive_dir: Optional[str] = None,
+    order_by: str = "api",
+    adaptive: bool = False,
+    min_workers: int = 1,
+):
+    """
+    Ejecuta el pipeline completo:
+    - Descarga grabaciones de Zoom.
+    - Optimiza los videos (opcional, si se pasa un MediaOptimizer).
+    - Sube los videos a YouTube (y los agrega a playlist_id, si se indica).
+
+    Con start_date/end_date procesa cada día del rango (backfill), hasta
+    `parallel_days` días a la vez. Cada día completo (sin subidas pendientes)
+    queda guardado en state/backfill.json; con resume, una nueva corrida sobre
+    el rango saltea esos días y retoma desde el primero incompleto.
+
+    Con staging_budget_gb, las descargas sin subir (de todos los días en curso)
+    no superan ese tamaño: cada archivo se sube apenas se descarga y las
+    descargas esperan mientras el presupuesto esté agotado. after_upload
+    ("keep", "delete" o "archive" en archive_dir) decide qué pasa con cada
+    archivo local una vez que uploads.json confirma la subida.
+
+    order_by ("api", "largest", "smallest", "newest") ordena las descargas y
+    subidas de cada día (ver utils.scheduling).
+
+    Con adaptive, las descargas y las subidas en paralelo se ajustan (cada
+    sentido por separado) entre min_workers y workers según el throughput y
+    los errores observados. Los límites son para el total de los días en
+    paralelo: un solo controlador por sentido, porque las señales que mira
+    (utils.concurrency) son del proceso. Sin adaptive, las descargas van de
+    a una y cada día sube con hasta `workers` subidas.
+
+    Convenciones:
+    - Fecha por defecto: ayer.
+    - Tipos de grabación preferidos: DEFAULT_PREFERRED_TYPES.
+    - Privacidad en YouTube: unlisted.
+    - El título del video en YouTube se resuelve en upload.py
+      a partir del topic limpio (no del nombre técnico del archivo).
+    """
+    if after_upload == "archive" and not archive_dir:
+        raise ValueError("after_upload='archive' requiere archive_dir")
+    day_kwargs = dict(
+        check_audio=check_audio,
+        optimizer=optimizer,
+        workers=workers,
+        playlist_id=playlist_id,
+        staging_area=staging.StagingArea(int(staging_budget_gb * 1e9)) if staging_budget_gb else None,
+        after_upload=after_upload,
+        archive_dir=archive_dir,
+        order_by=order_by,
+    )
+
+    with ExitStack() as stack:
+        if adaptive:
+            for direction, label in (("download", "descargas"), ("upload", "subidas")):
+                day_kwargs[f"{direction}_slots"] = stack.enter_context(
+                    ConcurrencyController(label, direction, min_workers, workers)
+                )
+        _run_days(date, start_date, end_date, parallel_days, resume, day_kwargs)
+
+
+def _run_days(date, start_date, end_date, parallel_days: int, resume: bool, day_kwargs: dict) -> None:
+    """Un día suelto, o el rango start_date..end_date con hasta parallel_days a la vez (ver run)."""
+    if not start_date and not end_date:
+        if not date:
+            date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        _run_day(date, **day_kwargs)
+        return
+
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    days = _days(start_date or end_date, end_date or yesterday)
+    done = backfill.completed_days() if resume else set()
+    pending = [d for d in days if d not in done]
+    if len(pending) < len(days):
+        logger.info(f"Retomando backfill: {len(days) - len(pending)} de {len(days)} día(s) ya completados")
+    if not pending:
+        return
+
+    parallel_days = max(1, parallel_days)
+    logger.info(f"Backfill de {len(pending)} día(s) ({pending[0]} → {pending[-1]}), {parallel_days} en paralelo")
+
+    incomplete = []
+    with ThreadPoolExecutor(max_workers=parallel_days, thread_name_prefix="day") as pool:
+        futures = {
+            pool.submit(_run_day, day, **day_kwargs): day
+            for day in pending
+        }
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                video_ids = future.result()
+            except Exception as e:
+                logger.error(f"Error procesando {day}: {e}")
+                incomplete.append(day)
+                continue
+
+            left = _pending_uploads(Path(config.RECORDINGS_BASE_PATH) / day)
+            if left:
+                logger.warning(f"{day}: quedan {len(left)} video(s) sin subir; se retoma en la próxima corrida")
+                incomplete.append(day)
+                continue
+            backfill.mark_done(day, len(video_ids))
+            logger.info(f"✅ Día completado: {day} ({len(video_ids)} video(s) subidos)")
+
+    if incomplete:
+        logger.warning(f"Días incompletos: {', '.join(sorted(incomplete))}")
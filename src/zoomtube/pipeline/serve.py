@@ -0,0 +1,355 @@
+import hashlib
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from zoomtube.pipeline import download, upload
+from zoomtube.pipeline.jobs import Heartbeat, Job, RetryLater
+from zoomtube.registries import jobs, quota
+from zoomtube.clients import get_youtube_client, get_zoom_client, QuotaExceededError
+from zoomtube.utils.audio import AudioAnalyzer
+from zoomtube.utils.logger import logger
+from zoomtube.utils.sharding import wants_user
+from zoomtube.utils.shutdown import GracefulShutdown
+from zoomtube.utils.tracing import span, tracer
+from zoomtube.utils import metrics as prom
+from zoomtube import config
+import zoomtube.constants as constants
+
+
+# =========================
+# Firma de Zoom
+# =========================
+
+def sign(secret: str, message: str) -> str:
+    """HMAC-SHA256 en hexadecimal, como lo calcula Zoom."""
+    return hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def signature_headers(secret: str, body: bytes, timestamp: Optional[int] = None) -> dict:
+    """Headers x-zm-* de un evento firmado (los usa también el replayer de eventos)."""
+    timestamp = str(timestamp if timestamp is not None else int(time.time()))
+    return {
+        "x-zm-request-timestamp": timestamp,
+        "x-zm-signature": "v0=" + sign(secret, f"v0:{timestamp}:{body.decode('utf-8')}"),
+    }
+
+
+def verify_signature(secret: str, body: bytes, timestamp: Optional[str], signature: Optional[str]) -> bool:
+    """
+    Verifica x-zm-signature ("v0=" + HMAC de "v0:{timestamp}:{body}") y que
+    el timestamp no tenga más de WEBHOOK_MAX_SKEW segundos (evita reenvíos).
+    """
+    if not timestamp or not signature:
+        return False
+    try:
+        if abs(time.time() - int(timestamp)) > constants.WEBHOOK_MAX_SKEW:
+            return False
+    except ValueError:
+        return False
+    expected = "v0=" + sign(secret, f"v0:{timestamp}:{body.decode('utf-8', errors='replace')}")
+    return hmac.compare_digest(expected, signature)
+
+
+# =========================
+# Receptor
+# =========================
+
+class WebhookReceiver:
+    """
+    Recibe eventos de Zoom, valida la firma y guarda las reuniones de
+    recording.completed en la cola durable (jobs.db, tipo WEBHOOK_JOB_KIND)
+    para que `workers` threads las procesen. Se responde 200 recién cuando el
+    evento quedó guardado: si el proceso se corta, las reuniones pendientes
+    se retoman al volver a arrancar. handle() no hace I/O de red, así que
+    responde dentro del plazo de Zoom (3s).
+
+    Una reunión que falla se reintenta con espera exponencial (como en
+    `zoomtube jobs`); si falla definitivamente, un reintento del evento por
+    parte de Zoom la vuelve a encolar.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        process: Callable[[dict], None],
+        workers: int = 1,
+        queue_size: int = constants.WEBHOOK_QUEUE_SIZE,
+        lease_seconds: float = constants.JOB_LEASE_SECONDS,
+    ):
+        self.secret = secret
+        self.process = process
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.lease_seconds = lease_seconds
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._beat: Optional[Heartbeat] = None
+
+    def pending(self) -> int:
+        """Reuniones en cola o en proceso."""
+        return jobs.pending([constants.WEBHOOK_JOB_KIND])
+
+    def handle(self, body: bytes, headers) -> Tuple[int, dict]:
+        """Procesa un POST del webhook. Devuelve (status HTTP, respuesta JSON)."""
+        if not verify_signature(
+            self.secret, body, headers.get("x-zm-request-timestamp"), headers.get("x-zm-signature")
+        ):
+            prom.WEBHOOK_EVENTS.inc(result="invalid_signature")
+            return 401, {"message": "invalid signature"}
+
+        try:
+            event = json.loads(body)
+        except ValueError:
+            prom.WEBHOOK_EVENTS.inc(result="ignored")
+            return 400, {"message": "invalid JSON"}
+
+        name = event.get("event")
+        payload = event.get("payload") or {}
+
+        if name == "endpoint.url_validation":
+            prom.WEBHOOK_EVENTS.inc(result="validation")
+            plain_token = payload.get("plainToken", "")
+            return 200, {"plainToken": plain_token, "encryptedToken": sign(self.secret, plain_token)}
+
+        if name != "recording.completed":
+            prom.WEBHOOK_EVENTS.inc(result="ignored")
+            return 200, {"message": f"ignored: {name}"}
+
+        meeting = payload.get("object") or {}
+        key = str(meeting.get("uuid") or meeting.get("id"))
+        with self._lock:
+            # Zoom reintenta los eventos: una reunión ya encolada no se procesa dos veces
+            if key in self._seen:
+                prom.WEBHOOK_EVENTS.inc(result="duplicate")
+                return 200, {"message": "duplicate"}
+            try:
+                if self.pending() >= self.queue_size:
+                    prom.WEBHOOK_EVENTS.inc(result="queue_full")
+                    return 503, {"message": "queue full"}
+                added = (
+                    jobs.enqueue(constants.WEBHOOK_JOB_KIND, key, {"meeting": meeting}) is not None
+                    or jobs.requeue(constants.WEBHOOK_JOB_KIND, key, {"meeting": meeting})
+                )
+            except Exception as e:
+                # Sin guardarlo no se responde 200: Zoom lo vuelve a mandar
+                logger.error(f"No se pudo encolar el evento de la reunión {key}: {e}")
+                prom.WEBHOOK_EVENTS.inc(result="error")
+                return 503, {"message": "queue unavailable"}
+            self._seen[key] = None
+            while len(self._seen) > constants.WEBHOOK_SEEN_SIZE:
+                self._seen.popitem(last=False)
+
+        if not added:
+            # Ya estaba en jobs.db (ej: de antes de reiniciar), en cola o terminada
+            prom.WEBHOOK_EVENTS.inc(result="duplicate")
+            return 200, {"message": "duplicate"}
+
+        self._wake.set()
+        prom.WEBHOOK_EVENTS.inc(result="queued")
+        prom.WEBHOOK_QUEUE.set(self.pending())
+        logger.info(f"Evento recording.completed encolado: {meeting.get('topic')} ({key})")
+        return 200, {"message": "queued"}
+
+    def _worker(self) -> None:
+        owner = f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            record = jobs.claim(owner, [constants.WEBHOOK_JOB_KIND], self.lease_seconds)
+            if record is None:
+                if self._wake.wait(constants.JOB_IDLE_POLL):
+                    self._wake.clear()
+                continue
+            job = Job(record, owner)
+            meeting = job.payload["meeting"]
+            self._beat.add(job)
+            try:
+                # El lease deja de renovarse antes de registrar el resultado
+                try:
+                    with span("serve.meeting", meeting_id=meeting.get("id")):
+                        self.process(meeting)
+                finally:
+                    self._beat.remove(job)
+            except RetryLater as e:
+                # Sin cuota no es una falla: vuelve a la cola sin gastar un intento
+                logger.warning(f"Reunión {meeting.get('id')}: {e}; se reintenta en {e.delay / 60:.0f} min")
+                jobs.release(job.id, owner, e.delay, str(e))
+            except Exception as e:
+                logger.error(f"Error procesando la reunión {meeting.get('id')}: {e}")
+                if jobs.fail(job.id, owner, f"{type(e).__name__}: {e}") == "failed":
+                    # Que un reintento del evento de Zoom la vuelva a encolar
+                    with self._lock:
+                        self._seen.pop(job.key, None)
+            else:
+                if not jobs.complete(job.id, owner):
+                    logger.warning(f"La reunión {meeting.get('id')} terminó, pero su lease ya había vencido")
+            finally:
+                prom.WEBHOOK_QUEUE.set(self.pending())
+                # Los spans ya quedaron en las métricas; no acumularlos indefinidamente
+                tracer.reset()
+
+    def start_workers(self) -> None:
+        self._stop.clear()
+        heartbeat_every = min(constants.JOB_HEARTBEAT_SECONDS, self.lease_seconds / 3)
+        self._beat = Heartbeat(self.lease_seconds, heartbeat_every).__enter__()
+        pending = self.pending()
+        if pending:
+            logger.info(f"{pending} reunión(es) en cola de una ejecución anterior")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"webhook-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def join(self, poll: float = 0.2) -> None:
+        """Espera a que no queden reuniones en cola ni en proceso."""
+        while self.pending():
+            time.sleep(poll)
+
+    def stop_workers(self) -> None:
+        """Termina las reuniones en proceso y detiene los workers; las que siguen en cola quedan en jobs.db."""
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join()
+        self._threads.clear()
+        if self._beat is not None:
+            self._beat.__exit__(None, None, None)
+            self._beat = None
+
+
+def _make_server(receiver: WebhookReceiver, host: str, port: int):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            if self.path.split("?", 1)[0] != constants.WEBHOOK_PATH:
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status, response = receiver.handle(body, self.headers)
+            data = json.dumps(response).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    server.daemon_threads = True
+    return server
+
+
+# =========================
+# Pipeline
+# =========================
+
+def process_meeting(
+    meeting: dict,
+    zoom_client,
+    audio_analyzer: AudioAnalyzer,
+    check_audio: bool = True,
+    optimizer=None,
+    playlist_id: Optional[str] = None,
+) -> None:
+    """
+    Descarga, verifica el audio y sube una reunión recibida por webhook.
+    Levanta una excepción si algún archivo no se pudo descargar o subir (la
+    reunión queda como fallida en jobs.db y un reintento de Zoom la reencola),
+    o RetryLater si no queda cuota de YouTube.
+    """
+    if not wants_user({"id": meeting.get("host_id"), "email": meeting.get("host_email")}):
+        logger.info(f"Reunión de un usuario fuera de ZOOM_USERS, se omite: {meeting.get('topic')}")
+        return
+    if meeting.get("duration", 0) < 10:
+        logger.info(f"Reunión de menos de 10 minutos, se omite: {meeting.get('topic')}")
+        return
+    date = (meeting.get("start_time") or time.strftime("%Y-%m-%d"))[:10]
+    target_dir = Path(config.RECORDINGS_BASE_PATH) / date
+    kept = download.process_meeting(
+        zoom_client,
+        meeting,
+        target_dir,
+        preferred_types=constants.DEFAULT_PREFERRED_TYPES,
+        check_audio=check_audio,
+        audio_analyzer=audio_analyzer,
+    )
+    failed = download.failed_files(meeting)
+    if failed:
+        raise RuntimeError(f"No se pudieron descargar: {', '.join(failed)}")
+    # upload_path (y no run_paths) para que los errores lleguen al worker
+    for path in kept:
+        try:
+            upload.upload_path(
+                str(path),
+                title=upload.title_from_filename(path),
+                privacy_status="unlisted",
+                tags=[],
+                description="",
+                playlist_id=playlist_id,
+                optimizer=optimizer,
+            )
+        except QuotaExceededError as e:
+            raise RetryLater(str(e), quota.seconds_until_reset()) from e
+
+
+def run(
+    host: str = "0.0.0.0",
+    port: int = constants.WEBHOOK_PORT,
+    workers: int = 2,
+    check_audio: bool = True,
+    optimizer=None,
+    playlist_id: Optional[str] = None,
+) -> None:
+    """
+    Receptor del webhook recording.completed de Zoom (POST en WEBHOOK_PATH).
+    Cada evento trae una sola reunión, que se descarga y se sube con hasta
+    `workers` reuniones en paralelo; no hace falta listar usuarios ni grabaciones.
+    """
+    secret = config.ZOOM_WEBHOOK_SECRET_TOKEN
+    if not secret:
+        logger.error("Falta ZOOM_WEBHOOK_SECRET_TOKEN: sin él no se pueden verificar los eventos de Zoom")
+        return
+
+    zoom_client = get_zoom_client()
+    # Un daemon no puede quedarse esperando una autorización en el navegador (ver `zoomtube auth`)
+    get_youtube_client().interactive = False
+    audio_analyzer = AudioAnalyzer(
+        silence_threshold_db=constants.DEFAULT_SILENCE_THRESHOLD_DB,
+        silence_ratio_threshold=constants.DEFAULT_SILENCE_RATIO,
+    )
+    receiver = WebhookReceiver(
+        secret,
+        lambda meeting: process_meeting(
+            meeting, zoom_client, audio_analyzer,
+            check_audio=check_audio, optimizer=optimizer, playlist_id=playlist_id,
+        ),
+        workers=workers,
+    )
+    server = _make_server(receiver, host, port)
+
+    receiver.start_workers()
+    threading.Thread(target=server.serve_forever, name="webhook-http", daemon=True).start()
+    logger.info(f"zoomtube serve: escuchando en http://{host}:{server.server_port}{constants.WEBHOOK_PATH} "
+                f"({receiver.workers} worker(s))")
+
+    with GracefulShutdown("zoomtube serve") as shutdown:
+        shutdown.event.wait()
+        server.shutdown()
+        receiver.stop_workers()
+        pending = receiver.pending()
+        if pending:
+            logger.info(f"Quedan {pending} reunión(es) en cola: se procesan al volver a arrancar")
+
+    server.server_close()
+    logger.info("zoomtube serve detenido")
@@ -1,57 +1,179 @@
 import os
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from typing import List, Optional
 
-from zoomtube.clients import youtube_client
+from zoomtube.clients import get_youtube_client, QuotaExceededError
+from zoomtube.models import TransferStats
 from zoomtube.utils.logger import logger
-from zoomtube.constants import VIDEO_EXTENSIONS
+from zoomtube.utils.tracing import span, traced
+from zoomtube.constants import VIDEO_EXTENSIONS, YOUTUBE_QUOTA_COSTS
 from zoomtube.utils.recordings import sanitize_filename
-from zoomtube.registries import uploads
+from zoomtube.utils.concurrency import ConcurrencyController
+from zoomtube.utils.scheduling import Eta, order
+from zoomtube.registries import uploads, quota
+from zoomtube.utils.media import MediaOptimizer
+from zoomtube.pipeline import optimize, metadata
+from zoomtube import config
 
+UPLOAD_QUOTA_COST = YOUTUBE_QUOTA_COSTS["videos.insert"]
 
-def run_single(
+
+def _upload_file(
+    file_path: Path,
+    title: str,
+    description: str = "",
+    tags: Optional[List[str]] = None,
+    privacy_status: str = "unlisted",
+) -> Optional[str]:
+    """
+    Sube un archivo ya validado y registra el resultado en uploads.json.
+    Si hay una sesión resumable guardada para el archivo, continúa desde el
+    offset confirmado por el servidor; la sesión se persiste tras cada chunk.
+    Si esa sesión expiró y hay que empezar de cero, se reserva de nuevo la
+    cuota de videos.insert.
+    QuotaExceededError se propaga sin registrar "failed": el archivo queda
+    pendiente para la próxima ejecución.
+    """
+    local_path = str(file_path)
+    session = uploads.get_session(local_path)
+    stats = TransferStats(direction="upload", start_offset=session["offset"] if session else 0)
+
+    def reserve_restart() -> None:
+        # La sesión guardada venció: la nueva vuelve a cobrar videos.insert,
+        # que no se reservó al reanudar (ver _quota_cost)
+        uploads.clear_session(local_path)
+        if not quota.try_consume(UPLOAD_QUOTA_COST, config.YOUTUBE_DAILY_QUOTA):
+            raise QuotaExceededError("Cuota diaria de YouTube insuficiente para reiniciar la subida")
+
+    try:
+        with span("youtube.upload", path=file_path.name, resumed=session is not None) as s:
+            video_id = get_youtube_client().upload_video(
+                file_path=file_path,
+                title=title,
+                description=description,
+                tags=tags,
+                privacy_status=privacy_status,
+                resume_uri=session["session_uri"] if session else None,
+                on_chunk=lambda uri, offset: uploads.save_session(local_path, uri, offset),
+                stats=stats,
+                on_restart=reserve_restart,
+                # Nota: ver implementación de schedule
+            )
+            s.set(bytes=stats.bytes_transferred, retries=stats.retries)
+
+        uploads.clear_session(local_path)
+        uploads.register_upload(local_path, video_id, title, "success", stats.as_dict())
+        logger.info(f"✅ Subida completada: {video_id}")
+        return video_id
+
+    except QuotaExceededError:
+        quota.mark_exhausted(config.YOUTUBE_DAILY_QUOTA)
+        raise
+
+    except Exception as e:
+        logger.error(f"❌ Error subiendo {file_path}: {e}")
+        uploads.register_upload(local_path, None, title, "failed", stats.as_dict())
+        return None
+
+
+def _quota_cost(file_path: Path) -> int:
+    """
+    Unidades de cuota a reservar para subir un archivo. Reanudar una sesión
+    ya iniciada no vuelve a cobrar videos.insert (si venció, _upload_file
+    reserva la cuota al reiniciarla).
+    """
+    if uploads.get_session(str(file_path)):
+        return 0
+    return UPLOAD_QUOTA_COST
+
+
+def title_from_filename(file_path: Path) -> str:
+    """Título limpio a partir del nombre técnico '<topic>__<tipo>.mp4'."""
+    stem = file_path.stem
+    stem = stem.split("__", 1)[0]
+    return sanitize_filename(stem)
+
+
+class UploadError(Exception):
+    """Una subida falló (ya quedó registrada como "failed" en uploads.json)."""
+
+
+def upload_path(
     path: str,
     title: Optional[str] = None,
     description: str = "",
     tags: Optional[List[str]] = None,
     privacy_status: str = "unlisted",
-    # playlist_id: Optional[str] = None,
-    # schedule: Optional[str] = None,
+    playlist_id: Optional[str] = None,
+    optimizer: Optional[MediaOptimizer] = None,
 ) -> Optional[str]:
     """
-    Sube un solo video a YouTube y lo registra en uploads.json.
+    Sube un solo video a YouTube y lo registra en uploads.json (ver run_single).
+    Devuelve el ID del video, o None si ya estaba subido.
+
+    A diferencia de run_single, los problemas se propagan (los usa el handler
+    de subidas de zoomtube jobs para decidir si reintentar):
+    - FileNotFoundError: el archivo no existe.
+    - QuotaExceededError: no queda cuota diaria; no se registra nada.
+    - UploadError: la subida falló.
     """
     file_path = Path(path)
 
     clean_title = title or sanitize_filename(file_path.stem)
 
-    if not file_path.exists() or not file_path.is_file():
-        logger.error(f"Archivo inválido: {file_path}")
+    if not file_path.is_file():
         uploads.register_upload(str(file_path), None, clean_title, "failed")
-        return None
+        raise FileNotFoundError(f"Archivo inválido: {file_path}")
 
     if uploads.is_uploaded(str(file_path)):
         logger.info(f"Ya estaba subido: {file_path}")
         return None
 
-    try:
-        video_id = youtube_client.upload_video(
-            file_path=file_path,
-            title=clean_title,
-            description=description,
-            tags=tags,
-            privacy_status=privacy_status,
-            # Nota: ver implementación de playlist_id y schedule
-        )
+    if not quota.try_consume(_quota_cost(file_path), config.YOUTUBE_DAILY_QUOTA):
+        raise QuotaExceededError("Cuota diaria de YouTube insuficiente")
 
-        uploads.register_upload(str(file_path), video_id, clean_title, "success")
-        logger.info(f"✅ Subida completada: {video_id}")
-        return video_id
+    if optimizer is not None:
+        with span("optimize", files=1):
+            optimize.run_paths([file_path], optimizer)
 
-    except Exception as e:
-        logger.error(f"❌ Error subiendo {file_path}: {e}")
-        uploads.register_upload(str(file_path), None, clean_title, "failed")
-        return None
+    video_id = _upload_file(file_path, clean_title, description, tags, privacy_status)
+    if video_id is None:
+        raise UploadError(f"Falló la subida de {file_path}")
+
+    if playlist_id:
+        metadata.apply([{"youtube_id": video_id, "playlist_id": playlist_id}])
+    return video_id
+
+
+@traced("upload.run_single")
+def run_single(
+    path: str,
+    title: Optional[str] = None,
+    description: str = "",
+    tags: Optional[List[str]] = None,
+    privacy_status: str = "unlisted",
+    playlist_id: Optional[str] = None,
+    # schedule: Optional[str] = None,
+    optimizer: Optional[MediaOptimizer] = None,
+) -> Optional[str]:
+    """
+    Sube un solo video a YouTube y lo registra en uploads.json.
+    Si se pasa un optimizer, el video se optimiza antes de subirlo.
+    Si se pasa playlist_id, el video se agrega a esa playlist al terminar.
+    Si no queda cuota diaria, no sube ni registra nada.
+    """
+    try:
+        return upload_path(path, title, description, tags, privacy_status, playlist_id, optimizer)
+    except FileNotFoundError as e:
+        logger.error(str(e))
+    except QuotaExceededError as e:
+        logger.warning(f"{e}. Queda pendiente: {path}")
+    except UploadError:
+        pass
+    return None
 
 
 def run_batch(
@@ -59,12 +181,18 @@ def run_batch(
     description: str = "",
     tags: Optional[List[str]] = None,
     privacy_status: str = "unlisted",
-    # playlist_id: Optional[str] = None,
+    playlist_id: Optional[str] = None,
+    metadata_csv: Optional[str] = None,
     # schedule: Optional[str] = None,
+    optimizer: Optional[MediaOptimizer] = None,
+    workers: int = 1,
+    order_by: str = "api",
+    adaptive: bool = False,
+    min_workers: int = 1,
+    slots: Optional[ConcurrencyController] = None,
 ) -> List[str]:
     """
-    Sube múltiples videos desde una carpeta.
-    Omite los que ya estén subidos según uploads.json.
+    Sube los videos de una carpeta (ver run_paths).
     """
     folder_path = Path(folder)
 
@@ -72,34 +200,179 @@ def run_batch(
         logger.error(f"Carpeta inválida: {folder}")
         return []
 
-    video_ids: List[str] = []
+    paths = [
+        folder_path / file_name
+        for file_name in os.listdir(folder_path)
+        if any(file_name.lower().endswith(ext) for ext in VIDEO_EXTENSIONS)
+    ]
+    return run_paths(
+        paths,
+        description=description,
+        tags=tags,
+        privacy_status=privacy_status,
+        playlist_id=playlist_id,
+        metadata_csv=metadata_csv,
+        optimizer=optimizer,
+        workers=workers,
+        order_by=order_by,
+        adaptive=adaptive,
+        min_workers=min_workers,
+        slots=slots,
+    )
 
-    for file_name in os.listdir(folder_path):
-        if not any(file_name.lower().endswith(ext) for ext in VIDEO_EXTENSIONS):
-            continue
 
-        file_path = folder_path / file_name
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _mtime(path: Path) -> str:
+    # Como str de ancho fijo, para ordenar igual que las fechas ISO de Zoom
+    try:
+        return f"{path.stat().st_mtime:020.6f}"
+    except OSError:
+        return ""
+
 
+@traced("upload.run_batch")
+def run_paths(
+    paths: List,
+    description: str = "",
+    tags: Optional[List[str]] = None,
+    privacy_status: str = "unlisted",
+    playlist_id: Optional[str] = None,
+    metadata_csv: Optional[str] = None,
+    optimizer: Optional[MediaOptimizer] = None,
+    workers: int = 1,
+    order_by: str = "api",
+    adaptive: bool = False,
+    min_workers: int = 1,
+    slots: Optional[ConcurrencyController] = None,
+) -> List[str]:
+    """
+    Sube múltiples videos, con hasta `workers` subidas en paralelo. Con
+    adaptive, la cantidad de subidas se ajusta durante la corrida entre
+    min_workers y workers según throughput, errores y 429 (ver
+    utils.concurrency.ConcurrencyController). slots es un controlador ya
+    iniciado y compartido con otras corridas (ej: los días de process.run);
+    reemplaza a adaptive/min_workers.
+    order_by ordena las subidas por tamaño en disco ("largest", "smallest"),
+    por fecha de modificación ("newest") o las deja como vienen ("api"); a
+    medida que terminan se loguea el progreso con un ETA.
+    Omite los que ya estén subidos según uploads.json.
+    Si se pasa un optimizer, los pendientes se optimizan en paralelo antes de subir.
 
-        stem = file_path.stem
-        stem = stem.split("__", 1)[0]
-        title = sanitize_filename(stem)
+    Antes de lanzar cada subida se reservan las unidades de cuota de videos.insert.
+    Si la cuota diaria no alcanza (o la API responde quotaExceeded), se deja de
+    lanzar subidas y los archivos restantes quedan pendientes, sin registrarse
+    como "failed".
 
+    Con metadata_csv, el título/descripción/tags de cada archivo se toman de su
+    fila del CSV (ver metadata.load_metadata_csv). Al final, los videos subidos
+    se agregan a su playlist (la de la fila o playlist_id) en un solo batch;
+    las que no entran en la cuota quedan pendientes para la próxima ejecución.
+    """
+    pending: List[Path] = []
+
+    for file_path in map(Path, paths):
         if uploads.is_uploaded(str(file_path)):
             logger.info(f"Ya estaba subido (omitido): {file_path}")
             continue
 
-        video_id = run_single(
-            path=str(file_path),
-            title=title,
-            description=description,
-            tags=tags,
-            privacy_status=privacy_status,
-            # playlist_id=playlist_id,
-            # schedule=schedule,
+        pending.append(file_path)
+
+    if optimizer is not None:
+        with span("optimize", files=len(pending)):
+            optimize.run_paths(pending, optimizer)
+
+    rows = metadata.load_metadata_csv(metadata_csv) if metadata_csv else []
+
+    # Después de optimizar: el tamaño que cuenta es el que se sube
+    pending = order(pending, order_by, size=_size, newest=_mtime)
+    sizes = {path: _size(path) for path in pending}
+    eta = Eta("Subidas", len(pending), sum(sizes.values()))
+
+    workers = max(1, workers)
+    queue = deque(pending)
+    video_ids: List[str] = []
+    playlist_items: List[dict] = []
+    quota_exhausted = False
+
+    if workers > 1 and queue:
+        logger.info(f"Subiendo {len(queue)} archivo(s) con {workers} subidas en paralelo")
+        get_youtube_client().prewarm(min(workers, len(queue)))
+
+    owned = slots is None
+    if owned:
+        slots = ConcurrencyController("subidas", "upload", min_workers if adaptive else workers, workers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool, \
+            (slots if owned else nullcontext()):
+        in_flight = {}
+
+        while queue or in_flight:
+            # Lanzar subidas mientras haya lugares libres y cuota disponible
+            while queue and not quota_exhausted:
+                if in_flight:
+                    if not slots.try_acquire():
+                        break
+                else:
+                    # Sin subidas propias en curso hay que esperar un lugar
+                    # (con slots compartido, los puede tener otra corrida)
+                    slots.acquire()
+                if not quota.try_consume(_quota_cost(queue[0]), config.YOUTUBE_DAILY_QUOTA):
+                    logger.warning("Cuota diaria de YouTube insuficiente para otra subida")
+                    quota_exhausted = True
+                    slots.release()
+                    break
+
+                file_path = queue.popleft()
+                row = metadata.find_row(rows, file_path) or {}
+                future = pool.submit(
+                    _upload_file,
+                    file_path,
+                    row.get("title") or title_from_filename(file_path),
+                    row.get("description", description),
+                    row.get("tags", tags),
+                    privacy_status,
+                )
+                in_flight[future] = file_path
+
+            if not in_flight:
+                break
+
+            # Con concurrencia adaptativa el límite puede subir sin que termine ninguna
+            timeout = slots.interval if slots.adaptive else None
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = in_flight.pop(future)
+                slots.release()
+                try:
+                    video_id = future.result()
+                except QuotaExceededError as e:
+                    logger.warning(f"{e}. Se detienen las subidas")
+                    quota_exhausted = True
+                    queue.appendleft(file_path)
+                    continue
+                eta.advance(sizes[file_path])
+
+                if video_id:
+                    video_ids.append(video_id)
+                    row = metadata.find_row(rows, file_path) or {}
+                    if row.get("playlist_id") or playlist_id:
+                        playlist_items.append({
+                            "youtube_id": video_id,
+                            "playlist_id": row.get("playlist_id") or playlist_id,
+                        })
+
+    if queue:
+        logger.warning(
+            f"Quedan {len(queue)} archivo(s) en cola por cuota de YouTube; "
+            f"se subirán en la próxima ejecución"
         )
 
-        if video_id:
-            video_ids.append(video_id)
+    # También reintenta las asignaciones que quedaron pendientes por cuota
+    metadata.apply(playlist_items)
 
     return video_ids
@@ -0,0 +1,243 @@
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from zoomtube.pipeline import download, upload
+from zoomtube.registries import uploads, watch
+from zoomtube.clients import get_youtube_client, get_zoom_client
+from zoomtube.utils.audio import AudioAnalyzer
+from zoomtube.utils.logger import logger
+from zoomtube.utils.sharding import owns_meeting, select_users
+from zoomtube.utils.shutdown import GracefulShutdown
+from zoomtube.utils.tracing import span, tracer
+from zoomtube.utils import metrics as prom
+from zoomtube import config
+import zoomtube.constants as constants
+
+
+def _completed_at(meeting: dict) -> Optional[str]:
+    """
+    Momento en que la grabación quedó completa en Zoom: el recording_end más
+    reciente de sus archivos. None si algún archivo todavía se está procesando.
+    """
+    files = meeting.get("recording_files", [])
+    if any(f.get("status", "completed") != "completed" for f in files):
+        return None
+    ends = [f["recording_end"] for f in files if f.get("recording_end")]
+    return max(ends) if ends else meeting.get("start_time")
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _initial_cursor(since: Optional[str]) -> str:
+    """Cursor de la primera corrida: --since (YYYY-MM-DD) o ayer a las 00:00 UTC."""
+    if not since:
+        since = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
+    return f"{since}T00:00:00Z"
+
+
+def _is_new(meeting: dict, completed_at: str, state: dict) -> bool:
+    """Si la reunión completa todavía no fue procesada según el cursor."""
+    if str(meeting.get("id")) in state["pending"]:
+        return True
+    if completed_at > state["cursor"]:
+        return True
+    # Empate con el cursor: solo las que no se procesaron en ese mismo instante
+    return completed_at == state["cursor"] and str(meeting.get("id")) not in state["cursor_ids"]
+
+
+def _advance(state: dict, meeting: dict, completed_at: str) -> None:
+    """Mueve el cursor hasta la reunión recién procesada."""
+    meeting_id = str(meeting.get("id"))
+    state["pending"].pop(meeting_id, None)
+    if completed_at > state["cursor"]:
+        state["cursor"], state["cursor_ids"] = completed_at, [meeting_id]
+    elif completed_at == state["cursor"]:
+        state["cursor_ids"].append(meeting_id)
+    prom.WATCH_CURSOR.set(_parse_time(state["cursor"]).timestamp())
+
+
+def _upload_pending(state: dict, optimizer, workers: int, playlist_id: Optional[str]) -> None:
+    """
+    Sube las descargas pendientes (state["to_upload"]).
+    Quedan pendientes las que no quedaron subidas (sin cuota o con error), para
+    reintentarlas en la próxima consulta; las que ya no están en disco se descartan.
+    """
+    upload.run_paths(
+        state["to_upload"],
+        privacy_status="unlisted",
+        tags=[],
+        description="",
+        playlist_id=playlist_id,
+        optimizer=optimizer,
+        workers=workers,
+    )
+    state["to_upload"] = [p for p in state["to_upload"] if not uploads.is_uploaded(p) and Path(p).is_file()]
+    watch.save_state(state)
+    if state["to_upload"]:
+        logger.info(f"Quedan {len(state['to_upload'])} archivo(s) para subir en la próxima consulta")
+
+
+def poll(
+    state: dict,
+    zoom_client,
+    users: list[dict],
+    shutdown: GracefulShutdown,
+    check_audio: bool = True,
+    optimizer=None,
+    workers: int = 1,
+    playlist_id: Optional[str] = None,
+    audio_analyzer: Optional[AudioAnalyzer] = None,
+) -> int:
+    """
+    Una consulta: lista las grabaciones desde el cursor (y las que quedaron
+    pendientes), descarga las nuevas en orden de finalización guardando el
+    cursor después de cada reunión, y sube lo descargado.
+    Devuelve la cantidad de reuniones procesadas.
+    """
+    prom.WATCH_POLLS.inc()
+    now = datetime.now(timezone.utc)
+    # Zoom filtra por fecha de inicio y el cursor es de fin: una reunión que
+    # empezó el día anterior y terminó después del cursor tiene que entrar.
+    # Las ya procesadas las descarta _is_new (y el registro de descargas)
+    cursor_day = datetime.fromisoformat(state["cursor"][:10]) - timedelta(days=1)
+    start_date = min([cursor_day.strftime("%Y-%m-%d")] + [s[:10] for s in state["pending"].values()])
+    end_date = now.strftime("%Y-%m-%d")
+
+    new = []
+    for user in users:
+        user_id = user.get("id")
+        if not user_id:
+            continue
+        with span("zoom.list_recordings", user_id=user_id) as s:
+            meetings = zoom_client.list_recordings(
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                min_duration=10,
+            )
+            s.set(count=len(meetings))
+
+        for meeting in meetings:
+            if not owns_meeting(meeting):
+                continue
+            completed_at = _completed_at(meeting)
+            if completed_at is None:
+                # Zoom todavía la está procesando: se vuelve a mirar en la próxima consulta
+                state["pending"][str(meeting.get("id"))] = meeting.get("start_time") or state["cursor"]
+                continue
+            if _is_new(meeting, completed_at, state):
+                new.append((completed_at, meeting))
+
+    watch.save_state(state)
+    if new:
+        logger.info(f"{len(new)} grabación(es) nueva(s) desde {state['cursor']}")
+
+    processed = 0
+    for completed_at, meeting in sorted(new, key=lambda item: item[0]):
+        if shutdown.requested:
+            break
+        date = (meeting.get("start_time") or completed_at)[:10]
+        target_dir = Path(config.RECORDINGS_BASE_PATH) / date
+        target_dir.mkdir(parents=True, exist_ok=True)
+        kept = download.process_meeting(
+            zoom_client,
+            meeting,
+            target_dir,
+            preferred_types=constants.DEFAULT_PREFERRED_TYPES,
+            check_audio=check_audio,
+            audio_analyzer=audio_analyzer,
+        )
+        state["to_upload"].extend(str(p) for p in kept)
+        failed = download.failed_files(meeting)
+        if failed:
+            # Queda pendiente (y el cursor no la da por procesada): se reintenta en la próxima consulta
+            logger.warning(f"No se pudieron descargar {', '.join(failed)} de {meeting.get('topic')}; se reintenta")
+            state["pending"][str(meeting.get("id"))] = meeting.get("start_time") or completed_at
+        else:
+            _advance(state, meeting, completed_at)
+        watch.save_state(state)
+        processed += 1
+
+    if state["to_upload"] and not shutdown.requested:
+        _upload_pending(state, optimizer, workers, playlist_id)
+    return processed
+
+
+def run(
+    interval: int = constants.WATCH_INTERVAL,
+    since: Optional[str] = None,
+    check_audio: bool = True,
+    optimizer=None,
+    workers: int = 1,
+    playlist_id: Optional[str] = None,
+    once: bool = False,
+) -> None:
+    """
+    Daemon que consulta Zoom cada `interval` segundos y pasa las grabaciones
+    nuevas por descarga, verificación de audio y subida.
+
+    El progreso se guarda en state/watch.json (ver WatchRegistry): el cursor es
+    el fin de la grabación más reciente ya procesada, así cada consulta solo
+    trae lo nuevo y un reinicio sigue donde quedó. --since solo se usa si no
+    hay estado guardado.
+    """
+    state = watch.get_state()
+    state.setdefault("cursor", _initial_cursor(since))
+    state.setdefault("cursor_ids", [])
+    state.setdefault("pending", {})
+    state.setdefault("to_upload", [])
+    prom.WATCH_CURSOR.set(_parse_time(state["cursor"]).timestamp())
+
+    zoom_client = get_zoom_client()
+    # Un daemon no puede quedarse esperando una autorización en el navegador (ver `zoomtube auth`)
+    get_youtube_client().interactive = False
+    audio_analyzer = AudioAnalyzer(
+        silence_threshold_db=constants.DEFAULT_SILENCE_THRESHOLD_DB,
+        silence_ratio_threshold=constants.DEFAULT_SILENCE_RATIO,
+    )
+    users, users_at = [], 0.0
+
+    logger.info(f"zoomtube watch: consultando cada {interval}s desde {state['cursor']}")
+    with GracefulShutdown("zoomtube watch") as shutdown:
+        if state["to_upload"]:
+            logger.info(f"Retomando {len(state['to_upload'])} subida(s) pendiente(s)")
+            _upload_pending(state, optimizer, workers, playlist_id)
+
+        while not shutdown.requested:
+            try:
+                # La lista de usuarios cambia poco: se reutiliza entre consultas
+                if time.monotonic() - users_at > constants.WATCH_USERS_REFRESH or not users:
+                    with span("zoom.list_users") as s:
+                        users = select_users(zoom_client.list_users())
+                        s.set(count=len(users))
+                    users_at = time.monotonic()
+
+                with span("watch.poll") as s:
+                    processed = poll(
+                        state, zoom_client, users, shutdown,
+                        check_audio=check_audio,
+                        optimizer=optimizer,
+                        workers=workers,
+                        playlist_id=playlist_id,
+                        audio_analyzer=audio_analyzer,
+                    )
+                    s.set(meetings=processed)
+                if processed:
+                    tracer.log_summary()
+            except Exception as e:
+                # Un error de red o de la API no debe tirar el daemon: se reintenta en la próxima consulta
+                logger.error(f"Error en la consulta de zoomtube watch: {e}")
+            finally:
+                # Los spans ya quedaron en las métricas; no acumularlos indefinidamente
+                tracer.reset()
+
+            if once:
+                break
+            shutdown.event.wait(interval)
+
+    watch.save_state(state)
+    logger.info(f"zoomtube watch detenido. Cursor: {state['cursor']}")
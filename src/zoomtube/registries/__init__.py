@@ -1,9 +1,46 @@
 from .uploads import UploadRegistry
 from .downloads import DownloadRegistry
 from .recordings import RecordingRegistry
+from .quota import QuotaRegistry
+from .embeds import EmbedRegistry
+from .watch import WatchRegistry
+from .backfill import BackfillRegistry
+from .jobs import JobRegistry
+from . import uploads as _uploads, downloads as _downloads, recordings as _recordings
+from . import quota as _quota, embeds as _embeds, watch as _watch, backfill as _backfill, jobs as _jobs
+from pathlib import Path
 
 uploads = UploadRegistry()
 downloads = DownloadRegistry()
 recordings = RecordingRegistry()
+quota = QuotaRegistry()
+embeds = EmbedRegistry()
+watch = WatchRegistry()
+backfill = BackfillRegistry()
+jobs = JobRegistry()
 
-__all__ = ["uploads", "downloads", "recordings", "Uploads", "Downloads", "Recordings"]
\ No newline at end of file
+_MODULES = [_uploads, _downloads, _recordings, _quota, _embeds, _watch, _backfill, _jobs]
+
+
+def state_dir() -> Path:
+    """Carpeta actual de los archivos de estado."""
+    return _uploads.STATE_DIR
+
+
+def set_state_dir(path) -> None:
+    """
+    Apunta los archivos de estado de todos los registros a otra carpeta (ej:
+    un perfil de cuenta o un shard). Los módulos fijan STATE_DIR y sus *_FILE
+    al importarse: hay que llamarla antes de leer o escribir cualquier registro.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for module in _MODULES:
+        for attr, value in list(vars(module).items()):
+            if attr == "STATE_DIR":
+                setattr(module, attr, path)
+            elif attr.endswith("_FILE") and isinstance(value, Path):
+                setattr(module, attr, path / value.name)
+
+
+__all__ = ["set_state_dir", "state_dir", "uploads", "downloads", "recordings", "quota", "embeds", "watch", "backfill", "jobs", "Uploads", "Downloads", "Recordings"]
\ No newline at end of file
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+from datetime import datetime
+from zoomtube.utils.filelock import StateLock
+
+# Carpeta y archivo de estado
+STATE_DIR = Path(__file__).resolve().parents[2] / "state"
+BACKFILL_FILE = STATE_DIR / "backfill.json"
+
+# process --start-date/--end-date procesa varios días en paralelo
+# (también entre procesos: varios `zoomtube jobs work` comparten el estado)
+_LOCK = StateLock(lambda: STATE_DIR / "backfill.lock")
+
+
+def _load() -> dict:
+    """Carga los días completados ({} si no hay)."""
+    if not BACKFILL_FILE.exists():
+        return {}
+    with open(BACKFILL_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(days: dict) -> None:
+    """Guarda los días completados (escritura atómica)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = BACKFILL_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(days, f, ensure_ascii=False, indent=2)
+    tmp_file.replace(BACKFILL_FILE)
+
+
+def _mark_done(day: str, uploaded: int) -> None:
+    with _LOCK:
+        days = _load()
+        days[day] = {
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+            "uploaded": uploaded,
+        }
+        _save(days)
+
+
+def _completed_days() -> set[str]:
+    with _LOCK:
+        return set(_load())
+
+
+class BackfillRegistry():
+    """
+    Días que process ya completó (descarga y subida sin pendientes),
+    para que un backfill cortado retome desde el primer día incompleto.
+    """
+
+    @staticmethod
+    def completed_days() -> set[str]:
+        """Días (YYYY-MM-DD) ya completados."""
+        return _completed_days()
+
+    @staticmethod
+    def mark_done(day: str, uploaded: int) -> None:
+        """Marca un día como completado, con la cantidad de videos subidos."""
+        _mark_done(day, uploaded)
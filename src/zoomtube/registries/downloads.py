@@ -1,12 +1,21 @@
 import json
 from pathlib import Path
+from typing import Iterator, Optional
 from datetime import datetime
 from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import span
+from zoomtube.utils.jsonstream import iter_array
+from zoomtube.utils import metrics as prom
+from zoomtube.utils.filelock import StateLock
 
 # Carpeta y archivo de estado
 STATE_DIR = Path(__file__).resolve().parents[2] / "state"
 DOWNLOADS_FILE = STATE_DIR / "downloads.json"
 
+# zoomtube serve procesa reuniones en paralelo: serializar lectura/escritura del JSON
+# (también entre procesos: varios `zoomtube jobs work` comparten el estado)
+_LOCK = StateLock(lambda: STATE_DIR / "downloads.lock")
+
 
 def _ensure_file():
     """Crea la carpeta/archivo si no existen."""
@@ -19,17 +28,23 @@ def _ensure_file():
 def _load() -> list[dict]:
     """Carga el registro completo desde JSON."""
     _ensure_file()
-    with open(DOWNLOADS_FILE, "r", encoding="utf-8") as f:
+    with span("registry.load", registry="downloads"), open(DOWNLOADS_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
 def _save(data: list[dict]) -> None:
     """Guarda el registro completo en JSON."""
-    with open(DOWNLOADS_FILE, "w", encoding="utf-8") as f:
+    with span("registry.save", registry="downloads", records=len(data)), open(DOWNLOADS_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
-def _register_download(local_path: str, topic: str, duration: int, status: str) -> None:
+def _register_download(
+    local_path: str,
+    topic: str,
+    duration: int,
+    status: str,
+    metrics: dict | None = None,
+) -> None:
     """
     Registra o actualiza una descarga de grabación.
 
@@ -42,32 +57,77 @@ def _register_download(local_path: str, topic: str, duration: int, status: str)
             - "success"
             - "discarded_silence"
             - "failed"
+        metrics: métricas de la transferencia (bytes, MB/s, TTFB...), opcional.
+            Al actualizar un registro sin métricas nuevas se conservan las anteriores.
     """
-    records = _load()
-
-    # Buscar si ya existe el registro para este archivo
-    existing = next((r for r in records if r["local_path"] == local_path), None)
-
-    entry = {
-        "local_path": local_path,
-        "topic": topic,
-        "duration": duration,
-        "downloaded_at": datetime.now().isoformat(timespec="seconds"),
-        "status": status,
-    }
-
-    if existing:
-        # Actualizar en lugar de duplicar
-        records = [r if r["local_path"] != local_path else entry for r in records]
-        action = "actualizado"
-    else:
-        records.append(entry)
-        action = "creado"
-
-    _save(records)
+    with _LOCK:
+        records = _load()
+
+        # Buscar si ya existe el registro para este archivo
+        existing = next((r for r in records if r["local_path"] == local_path), None)
+
+        entry = {
+            "local_path": local_path,
+            "topic": topic,
+            "duration": duration,
+            "downloaded_at": datetime.now().isoformat(timespec="seconds"),
+            "status": status,
+        }
+        if metrics:
+            entry["metrics"] = metrics
+        elif existing and existing.get("metrics"):
+            entry["metrics"] = existing["metrics"]
+
+        if existing:
+            # Actualizar en lugar de duplicar
+            records = [r if r["local_path"] != local_path else entry for r in records]
+            action = "actualizado"
+        else:
+            records.append(entry)
+            action = "creado"
+
+        _save(records)
+    prom.DOWNLOADS.inc(status="downloaded" if status == "pending_audio_check" else status)
+    prom.record_transfer(metrics)
     logger.info(f"Registro de descarga {action}: {local_path} → {status}")
 
 
+def _register_disposal(local_path: str, action: str, archive_path: str | None = None) -> None:
+    """
+    Registra qué se hizo con el archivo local después de subirlo.
+
+    Args:
+        local_path: ruta original de la descarga.
+        action: "deleted" o "archived".
+        archive_path: destino del archivo, si se archivó.
+    """
+    with _LOCK:
+        records = _load()
+        entry = next((r for r in records if r["local_path"] == local_path), None)
+        if entry is None:
+            logger.debug(f"Sin registro de descarga para {local_path}; no se registra la limpieza")
+            return
+        entry["disposal"] = {
+            "action": action,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if archive_path:
+            entry["disposal"]["archive_path"] = archive_path
+        _save(records)
+    logger.info(f"Archivo local {action}: {local_path}" + (f" → {archive_path}" if archive_path else ""))
+
+
+def _get_status(local_path: str) -> Optional[str]:
+    """Estado registrado de una descarga, o None si no hay registro."""
+    entry = next((r for r in _load() if r["local_path"] == local_path), None)
+    return entry["status"] if entry else None
+
+
+def _iter_downloads() -> Iterator[dict]:
+    """Recorre los registros de a uno, sin cargar el archivo entero (ej: zoomtube list)."""
+    return iter_array(DOWNLOADS_FILE)
+
+
 def _get_all_downloads() -> list[dict]:
     """
     Devuelve todos los registros (puede usarse para reportes).
@@ -83,8 +143,29 @@ class DownloadRegistry():
         Devuelve todos los registros (puede usarse para reportes).
         """
         return _load()
+
+    @staticmethod
+    def get_status(local_path: str) -> Optional[str]:
+        """Estado registrado de una descarga, o None si no hay registro."""
+        return _get_status(local_path)
+
+    @staticmethod
+    def iter_downloads() -> Iterator[dict]:
+        """Recorre los registros de a uno, sin cargar el archivo entero."""
+        return _iter_downloads()
     
     @staticmethod
-    def register_download(local_path: str, topic: str, duration: int, status: str) -> None:
-        _register_download(local_path, topic, duration, status)
+    def register_download(
+        local_path: str,
+        topic: str,
+        duration: int,
+        status: str,
+        metrics: dict | None = None,
+    ) -> None:
+        _register_download(local_path, topic, duration, status, metrics)
     
+
+    @staticmethod
+    def register_disposal(local_path: str, action: str, archive_path: str | None = None) -> None:
+        """Registra que el archivo local se borró ("deleted") o se archivó ("archived")."""
+        _register_disposal(local_path, action, archive_path)
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+# Carpeta y archivo de estado
+STATE_DIR = Path(__file__).resolve().parents[2] / "state"
+EMBEDS_FILE = STATE_DIR / "embeds.json"
+
+
+def _load() -> dict:
+    """Carga la marca de la última generación de embeds ({} si nunca se generaron)."""
+    if not EMBEDS_FILE.exists():
+        return {}
+    with open(EMBEDS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(mark: dict) -> None:
+    """Guarda la marca (escritura atómica: debe quedar en sync con los archivos generados)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = EMBEDS_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(mark, f, ensure_ascii=False)
+    tmp_file.replace(EMBEDS_FILE)
+
+
+def _clear() -> None:
+    """Borra la marca: la próxima generación será completa."""
+    EMBEDS_FILE.unlink(missing_ok=True)
+
+
+class EmbedRegistry():
+    """
+    Marca de agua de la generación de iframes: cuántos registros de
+    uploads.json ya se volcaron, el hash del último y dónde termina el
+    contenido de cada archivo generado (para agregar sin reescribir).
+    """
+
+    @staticmethod
+    def get_mark() -> dict:
+        """Devuelve la marca guardada, o {} si no hay."""
+        return _load()
+
+    @staticmethod
+    def save_mark(mark: dict) -> None:
+        """Guarda la marca de la última generación."""
+        _save(mark)
+
+    @staticmethod
+    def clear() -> None:
+        """Borra la marca (fuerza una regeneración completa)."""
+        _clear()
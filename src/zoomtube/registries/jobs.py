@@ -0,0 +1,343 @@
+import json
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from zoomtube.constants import JOB_MAX_ATTEMPTS, JOB_RETRY_BASE, JOB_RETRY_CAP
+from zoomtube.utils.logger import logger
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# Carpeta y archivo de estado. A diferencia de los demás registros es SQLite:
+# varios procesos toman trabajos de la misma cola, y cada toma tiene que ser
+# atómica. Todos en el mismo host y con la carpeta en un disco local: WAL
+# (memoria compartida) y flock no funcionan sobre NFS/SMB.
+STATE_DIR = Path(__file__).resolve().parents[2] / "state"
+JOBS_FILE = STATE_DIR / "jobs.db"
+
+# Estados: queued → leased → done | failed (o de vuelta a queued para reintentar)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    priority REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, kind, not_before);
+"""
+
+# Columnas agregadas después de la primera versión del esquema: (nombre, definición)
+_MIGRATIONS = [
+    ("priority", "REAL NOT NULL DEFAULT 0"),
+]
+
+# Archivos ya inicializados (el esquema se crea una vez por proceso y archivo)
+_initialized: set[Path] = set()
+
+
+def _now_iso() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _connect() -> "sqlite3.Connection":
+    """
+    Conexión nueva por operación (las conexiones de sqlite3 no se comparten
+    entre threads). WAL: los lectores no bloquean a quien toma un trabajo
+    (necesita que jobs.db esté en un disco local, no en una carpeta de red).
+    """
+    import sqlite3
+
+    path = JOBS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for name, definition in _MIGRATIONS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+        _initialized.add(path)
+    return conn
+
+
+def _to_job(row: "sqlite3.Row") -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def _backoff(attempts: int) -> float:
+    """Espera antes de reintentar un trabajo que falló `attempts` veces."""
+    return min(JOB_RETRY_CAP, JOB_RETRY_BASE * 2 ** max(0, attempts - 1))
+
+
+def _enqueue(
+    kind: str, key: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS, priority: float = 0
+) -> Optional[int]:
+    """
+    Encola un trabajo. (kind, key) es único: volver a encolar lo mismo (ej:
+    listar otra vez el mismo día) no hace nada y devuelve None.
+    Entre los trabajos listos se toma primero el de mayor priority.
+    """
+    now = _now_iso()
+    with closing(_connect()) as conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO jobs (kind, key, payload, max_attempts, priority, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, key, json.dumps(payload, ensure_ascii=False), max_attempts, priority, now, now),
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+
+def _claim(owner: str, kinds: list[str], lease_seconds: float) -> Optional[dict]:
+    """
+    Toma el próximo trabajo listo de esos tipos, el de mayor prioridad: uno
+    en cola cuyo reintento ya venció, o uno cuyo lease expiró (su worker murió o se colgó). Queda a
+    nombre de owner hasta now + lease_seconds y cuenta como un intento.
+    Devuelve el trabajo (con payload decodificado) o None.
+    """
+    now = time.time()
+    marks = ",".join("?" * len(kinds))
+    with closing(_connect()) as conn:
+        # BEGIN IMMEDIATE: nadie más escribe entre el SELECT y el UPDATE
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, "
+                "last_error = 'lease vencido en el último intento', updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts",
+                (_now_iso(), now),
+            ).rowcount
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE kind IN ({marks}) AND ("
+                f"(status = 'queued' AND not_before <= ?) OR (status = 'leased' AND lease_until < ?)"
+                f") ORDER BY priority DESC, not_before, id LIMIT 1",
+                (*kinds, now, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (owner, now + lease_seconds, _now_iso(), row["id"]),
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    if expired:
+        logger.warning(f"{expired} trabajo(s) sin intentos restantes perdieron su lease: quedan en failed")
+    if row is None:
+        return None
+    if row["attempts"] > 1:
+        logger.info(f"Reintento {row['attempts']}/{row['max_attempts']} de {row['kind']} {row['key']}")
+    return _to_job(row)
+
+
+def _update_leased(job_id: int, owner: str, sql: str, params: tuple) -> bool:
+    """UPDATE sobre un trabajo solo si owner todavía tiene su lease."""
+    with closing(_connect()) as conn:
+        cursor = conn.execute(
+            f"UPDATE jobs SET {sql}, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (*params, _now_iso(), job_id, owner),
+        )
+        return cursor.rowcount == 1
+
+
+def _heartbeat(job_id: int, owner: str, lease_seconds: float) -> bool:
+    """Renueva el lease. False si ya no es de owner (venció y otro lo tomó)."""
+    return _update_leased(job_id, owner, "lease_until = ?", (time.time() + lease_seconds,))
+
+
+def _save_payload(job_id: int, owner: str, payload: dict) -> bool:
+    """Guarda el payload de un trabajo en curso (ej: el destino elegido de una descarga)."""
+    return _update_leased(job_id, owner, "payload = ?", (json.dumps(payload, ensure_ascii=False),))
+
+
+def _complete(job_id: int, owner: str) -> bool:
+    return _update_leased(job_id, owner, "status = 'done', lease_owner = NULL, last_error = NULL", ())
+
+
+def _fail(job_id: int, owner: str, error: str, retry: bool = True) -> Optional[str]:
+    """
+    Registra un intento fallido: vuelve a la cola con espera exponencial si
+    quedan intentos (y retry), si no queda en "failed".
+    Devuelve el nuevo estado, o None si owner ya no tenía el lease.
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (job_id, owner),
+        ).fetchone()
+    if row is None:
+        return None
+    if retry and row["attempts"] < row["max_attempts"]:
+        status, not_before = "queued", time.time() + _backoff(row["attempts"])
+    else:
+        status, not_before = "failed", 0
+    ok = _update_leased(
+        job_id, owner, "status = ?, not_before = ?, lease_owner = NULL, last_error = ?",
+        (status, not_before, error[:2000]),
+    )
+    return status if ok else None
+
+
+def _release(job_id: int, owner: str, delay: float, reason: str) -> bool:
+    """
+    Devuelve un trabajo a la cola sin gastar un intento (ej: sin cuota de
+    YouTube hasta mañana): no se vuelve a tomar antes de `delay` segundos.
+    """
+    return _update_leased(
+        job_id, owner,
+        "status = 'queued', attempts = attempts - 1, not_before = ?, lease_owner = NULL, last_error = ?",
+        (time.time() + delay, reason),
+    )
+
+
+def _counts() -> list[dict]:
+    """Cantidad de trabajos por tipo y estado."""
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT kind, status, COUNT(*) AS count FROM jobs GROUP BY kind, status ORDER BY kind, status"
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _pending(kinds: list[str]) -> int:
+    """Trabajos de esos tipos que todavía pueden correr (en cola o tomados)."""
+    marks = ",".join("?" * len(kinds))
+    with closing(_connect()) as conn:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM jobs WHERE kind IN ({marks}) AND status IN ('queued', 'leased')", kinds
+        ).fetchone()[0]
+
+
+def _get_failed(limit: int = 50) -> list[dict]:
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'failed' ORDER BY updated_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+    return [_to_job(row) for row in rows]
+
+
+def _retry_failed(kinds: Optional[list[str]] = None) -> int:
+    """Vuelve a encolar los trabajos fallidos con los intentos en cero."""
+    query = "UPDATE jobs SET status = 'queued', attempts = 0, not_before = 0, updated_at = ? WHERE status = 'failed'"
+    params: tuple = (_now_iso(),)
+    if kinds:
+        query += f" AND kind IN ({','.join('?' * len(kinds))})"
+        params += tuple(kinds)
+    with closing(_connect()) as conn:
+        return conn.execute(query, params).rowcount
+
+
+def _requeue(kind: str, key: str, payload: dict) -> bool:
+    """
+    Vuelve a encolar un trabajo que quedó en "failed" (intentos en cero y el
+    payload nuevo). False si no existe o no está fallido.
+    """
+    with closing(_connect()) as conn:
+        return conn.execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, not_before = 0, payload = ?, updated_at = ? "
+            "WHERE kind = ? AND key = ? AND status = 'failed'",
+            (json.dumps(payload, ensure_ascii=False), _now_iso(), kind, key),
+        ).rowcount == 1
+
+
+def _purge_done() -> int:
+    """Borra los trabajos terminados (las claves se pueden volver a encolar)."""
+    with closing(_connect()) as conn:
+        return conn.execute("DELETE FROM jobs WHERE status = 'done'").rowcount
+
+
+class JobRegistry():
+    """
+    Cola de trabajos durable (download / analyze / upload por grabación, y
+    los eventos recibidos por zoomtube serve), compartida por los workers de todos los procesos del host que usan la
+    misma carpeta de estado (local). Cada trabajo se toma con un lease que el worker
+    renueva mientras trabaja; si el worker muere, el lease vence y otro lo
+    retoma.
+    """
+
+    @staticmethod
+    def enqueue(
+        kind: str, key: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS, priority: float = 0
+    ) -> Optional[int]:
+        """Encola un trabajo; None si (kind, key) ya estaba en la cola."""
+        return _enqueue(kind, key, payload, max_attempts, priority)
+
+    @staticmethod
+    def claim(owner: str, kinds: list[str], lease_seconds: float) -> Optional[dict]:
+        """Toma el próximo trabajo listo de esos tipos (o None)."""
+        return _claim(owner, kinds, lease_seconds)
+
+    @staticmethod
+    def heartbeat(job_id: int, owner: str, lease_seconds: float) -> bool:
+        """Renueva el lease. False si owner lo perdió."""
+        return _heartbeat(job_id, owner, lease_seconds)
+
+    @staticmethod
+    def save_payload(job_id: int, owner: str, payload: dict) -> bool:
+        """Guarda el payload de un trabajo en curso."""
+        return _save_payload(job_id, owner, payload)
+
+    @staticmethod
+    def complete(job_id: int, owner: str) -> bool:
+        """Marca un trabajo como terminado."""
+        return _complete(job_id, owner)
+
+    @staticmethod
+    def fail(job_id: int, owner: str, error: str, retry: bool = True) -> Optional[str]:
+        """Registra un intento fallido; devuelve "queued" (se reintenta) o "failed"."""
+        return _fail(job_id, owner, error, retry)
+
+    @staticmethod
+    def release(job_id: int, owner: str, delay: float, reason: str) -> bool:
+        """Devuelve un trabajo a la cola sin gastar un intento."""
+        return _release(job_id, owner, delay, reason)
+
+    @staticmethod
+    def counts() -> list[dict]:
+        """Cantidad de trabajos por tipo y estado."""
+        return _counts()
+
+    @staticmethod
+    def pending(kinds: list[str]) -> int:
+        """Trabajos de esos tipos en cola o tomados."""
+        return _pending(kinds)
+
+    @staticmethod
+    def get_failed(limit: int = 50) -> list[dict]:
+        """Los últimos trabajos fallidos, con su error."""
+        return _get_failed(limit)
+
+    @staticmethod
+    def retry_failed(kinds: Optional[list[str]] = None) -> int:
+        """Vuelve a encolar los trabajos fallidos."""
+        return _retry_failed(kinds)
+
+    @staticmethod
+    def requeue(kind: str, key: str, payload: dict) -> bool:
+        """Vuelve a encolar un trabajo fallido con un payload nuevo."""
+        return _requeue(kind, key, payload)
+
+    @staticmethod
+    def purge_done() -> int:
+        """Borra los trabajos terminados."""
+        return _purge_done()
@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from zoomtube.utils.logger import logger
+from zoomtube.utils import metrics as prom
+from zoomtube.utils.filelock import StateLock
+
+# Carpeta y archivo de estado
+STATE_DIR = Path(__file__).resolve().parents[2] / "state"
+QUOTA_FILE = STATE_DIR / "quota.json"
+
+# Serializar lectura/escritura, también entre procesos (varios `zoomtube jobs work`)
+_LOCK = StateLock(lambda: STATE_DIR / "quota.lock")
+
+
+def _pacific_now() -> datetime:
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo("America/Los_Angeles"))
+    except Exception:
+        # Sin base de zonas horarias (ej: Windows sin tzdata): aproximar con UTC-8
+        return datetime.now(timezone(timedelta(hours=-8)))
+
+
+def _quota_day() -> str:
+    """
+    Día de cuota de YouTube: se reinicia a medianoche, hora del Pacífico.
+    """
+    return _pacific_now().strftime("%Y-%m-%d")
+
+
+def _seconds_until_reset() -> float:
+    """Segundos que faltan para el próximo día de cuota."""
+    now = _pacific_now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+def _ensure_file():
+    """Crea la carpeta/archivo si no existen."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    if not QUOTA_FILE.exists():
+        with open(QUOTA_FILE, "w", encoding="utf-8") as f:
+            json.dump({}, f)
+
+
+def _load() -> dict:
+    """Carga el consumo del día; si cambió el día de cuota, arranca de cero."""
+    _ensure_file()
+    with open(QUOTA_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    today = _quota_day()
+    if data.get("day") != today:
+        data = {"day": today, "used": 0}
+    return data
+
+
+def _save(data: dict) -> None:
+    """Guarda el consumo del día en JSON."""
+    with open(QUOTA_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _get_used() -> int:
+    with _LOCK:
+        return _load()["used"]
+
+
+def _try_consume(units: int, daily_limit: int) -> bool:
+    """
+    Reserva unidades de cuota si alcanzan para no pasarse del límite diario.
+    Devuelve False (sin consumir nada) si no alcanzan.
+    """
+    with _LOCK:
+        data = _load()
+        if data["used"] + units > daily_limit:
+            return False
+        data["used"] += units
+        _save(data)
+    prom.YOUTUBE_QUOTA_USED.set(data["used"])
+    prom.YOUTUBE_QUOTA_LIMIT.set(daily_limit)
+    logger.debug(f"Cuota de YouTube: +{units} → {data['used']}/{daily_limit}")
+    return True
+
+
+def _mark_exhausted(daily_limit: int) -> None:
+    """
+    Marca la cuota del día como agotada (ej: la API respondió quotaExceeded).
+    """
+    with _LOCK:
+        data = _load()
+        data["used"] = max(data["used"], daily_limit)
+        _save(data)
+    prom.YOUTUBE_QUOTA_USED.set(data["used"])
+    prom.YOUTUBE_QUOTA_LIMIT.set(daily_limit)
+    logger.warning(f"Cuota diaria de YouTube marcada como agotada ({data['day']})")
+
+
+class QuotaRegistry():
+    """
+    Lleva la cuenta de unidades de cuota de la YouTube Data API usadas en el día.
+    """
+
+    @staticmethod
+    def get_used() -> int:
+        """Unidades usadas en el día de cuota actual."""
+        return _get_used()
+
+    @staticmethod
+    def seconds_until_reset() -> float:
+        """Segundos que faltan para que se reinicie la cuota (medianoche del Pacífico)."""
+        return _seconds_until_reset()
+
+    @staticmethod
+    def remaining(daily_limit: int) -> int:
+        """Unidades que quedan disponibles en el día de cuota actual."""
+        return max(daily_limit - _get_used(), 0)
+
+    @staticmethod
+    def try_consume(units: int, daily_limit: int) -> bool:
+        """
+        Reserva unidades de cuota si alcanzan para no pasarse del límite diario.
+        Devuelve False (sin consumir nada) si no alcanzan.
+        """
+        return _try_consume(units, daily_limit)
+
+    @staticmethod
+    def mark_exhausted(daily_limit: int) -> None:
+        """Marca la cuota del día como agotada."""
+        _mark_exhausted(daily_limit)
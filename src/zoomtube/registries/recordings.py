@@ -1,12 +1,21 @@
 import json
 from pathlib import Path
+from typing import Iterator, Optional
 from datetime import datetime
 from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import span
+from zoomtube.utils.jsonstream import iter_array
+from zoomtube.utils import metrics as prom
+from zoomtube.utils.filelock import StateLock
 
 # Carpeta y archivo de estado
 STATE_DIR = Path(__file__).resolve().parents[2] / "state"
 RECORDINGS_FILE = STATE_DIR / "recordings.json"
 
+# zoomtube serve procesa reuniones en paralelo: serializar lectura/escritura del JSON
+# (también entre procesos: varios `zoomtube jobs work` comparten el estado)
+_LOCK = StateLock(lambda: STATE_DIR / "recordings.lock")
+
 
 def _ensure_file():
     """Crea la carpeta/archivo si no existen."""
@@ -19,13 +28,13 @@ def _ensure_file():
 def _load() -> list[dict]:
     """Carga todas las reuniones registradas."""
     _ensure_file()
-    with open(RECORDINGS_FILE, "r", encoding="utf-8") as f:
+    with span("registry.load", registry="recordings"), open(RECORDINGS_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
 def _save(data: list[dict]) -> None:
     """Guarda todas las reuniones en el archivo JSON."""
-    with open(RECORDINGS_FILE, "w", encoding="utf-8") as f:
+    with span("registry.save", registry="recordings", records=len(data)), open(RECORDINGS_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
@@ -40,43 +49,72 @@ def _register_meeting(meeting_id: str, topic: str, start_time: str, duration: in
         duration: duración en minutos.
         files: lista de dicts con { "type": str, "status": str }
                status inicial puede ser "available"
+
+    Si la reunión ya estaba registrada (misma reunión, mismo inicio), sus
+    archivos conservan el estado y la ruta local anteriores: así un resume o
+    un re-listado no vuelve a descargar lo que ya se descargó.
     """
-    records = _load()
-
-    # Armar entrada
-    entry = {
-        "meeting_id": meeting_id,
-        "topic": topic,
-        "start_time": start_time,
-        "duration": duration,
-        "files": files,
-        "registered_at": datetime.now().isoformat(timespec="seconds"),
-    }
-
-    # Reemplazar si ya existía
-    records = [r for r in records if r["meeting_id"] != meeting_id]
-    records.append(entry)
-
-    _save(records)
+    with _LOCK:
+        records = _load()
+
+        previous = next((r for r in records if r["meeting_id"] == meeting_id), None)
+        # Las ocurrencias de una reunión recurrente comparten meeting_id pero no el inicio
+        is_new = previous is None or previous.get("start_time") != start_time
+        if not is_new:
+            known = {f["type"]: f for f in previous["files"]}
+            files = [{**f, **known.get(f["type"], {})} for f in files]
+
+        # Armar entrada
+        entry = {
+            "meeting_id": meeting_id,
+            "topic": topic,
+            "start_time": start_time,
+            "duration": duration,
+            "files": files,
+            "registered_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        # Reemplazar si ya existía
+        records = [r for r in records if r["meeting_id"] != meeting_id]
+        records.append(entry)
+
+        _save(records)
+    # Solo se cuentan reuniones nuevas: un resume o un re-listado no las descubre de nuevo
+    if is_new:
+        prom.RECORDINGS_DISCOVERED.inc(len(files))
     logger.debug(f"Reunión registrada en recordings.json: {topic} ({meeting_id})")
 
 
-def _update_file_status(meeting_id: str, file_type: str, status: str) -> None:
+def _update_file_status(meeting_id: str, file_type: str, status: str, local_path: Optional[str] = None) -> None:
     """
     Actualiza el estado de un archivo dentro de una reunión.
     Ej: status = "downloaded", "discarded_audio", "skipped_by_preference"
+    local_path: dónde quedó la descarga (con status "downloaded").
     """
-    records = _load()
+    with _LOCK:
+        records = _load()
+
+        for r in records:
+            if r["meeting_id"] == meeting_id:
+                for f in r["files"]:
+                    if f["type"] == file_type:
+                        f["status"] = status
+                        if local_path:
+                            f["local_path"] = local_path
+                break
+
+        _save(records)
+    logger.debug(f"Estado actualizado: meeting {meeting_id}, file {file_type} → {status}")
 
-    for r in records:
-        if r["meeting_id"] == meeting_id:
-            for f in r["files"]:
-                if f["type"] == file_type:
-                    f["status"] = status
-            break
 
-    _save(records)
-    logger.debug(f"Estado actualizado: meeting {meeting_id}, file {file_type} → {status}")
+def _get_meeting(meeting_id: str) -> Optional[dict]:
+    """Devuelve el registro de una reunión, o None si no está registrada."""
+    return next((r for r in _load() if r["meeting_id"] == meeting_id), None)
+
+
+def _iter_recordings() -> Iterator[dict]:
+    """Recorre los registros de a uno, sin cargar el archivo entero (ej: zoomtube list)."""
+    return iter_array(RECORDINGS_FILE)
 
 
 def _get_all_recordings() -> list[dict]:
@@ -89,14 +127,25 @@ class RecordingRegistry():
     def get_all_recordings() -> list[dict]:
         """Devuelve todas las reuniones registradas."""
         return _load()
+
+    @staticmethod
+    def get_meeting(meeting_id: str) -> Optional[dict]:
+        """Devuelve el registro de una reunión, o None si no está registrada."""
+        return _get_meeting(meeting_id)
+
+    @staticmethod
+    def iter_recordings() -> Iterator[dict]:
+        """Recorre los registros de a uno, sin cargar el archivo entero."""
+        return _iter_recordings()
     
     @staticmethod
-    def update_file_status(meeting_id: str, file_type: str, status: str) -> None:
+    def update_file_status(meeting_id: str, file_type: str, status: str, local_path: Optional[str] = None) -> None:
         """
         Actualiza el estado de un archivo dentro de una reunión.
         Ej: status = "downloaded", "discarded_audio", "skipped_by_preference"
+        local_path: dónde quedó la descarga (con status "downloaded").
         """
-        _update_file_status(meeting_id, file_type, status)
+        _update_file_status(meeting_id, file_type, status, local_path)
     
     @staticmethod
     def register_meeting(meeting_id: str, topic: str, start_time: str, duration: int, files: list[dict]) -> None:
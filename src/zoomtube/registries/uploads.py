@@ -1,11 +1,23 @@
 import json
 from pathlib import Path
+from typing import Iterator
 from datetime import datetime
 from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import span
+from zoomtube.utils.jsonstream import iter_array
+from zoomtube.utils import metrics as prom
+from zoomtube.utils.filelock import StateLock
 
 # Carpeta y archivo de estado
 STATE_DIR = Path(__file__).resolve().parents[2] / "state"
 UPLOADS_FILE = STATE_DIR / "uploads.json"
+SESSIONS_FILE = STATE_DIR / "upload_sessions.json"
+# Asignaciones a playlists / cambios de metadata que quedaron sin aplicar por cuota
+PENDING_METADATA_FILE = STATE_DIR / "pending_metadata.json"
+
+# Las subidas pueden correr en paralelo: serializar lectura/escritura del JSON
+# (también entre procesos: varios `zoomtube jobs work` comparten el estado)
+_LOCK = StateLock(lambda: STATE_DIR / "uploads.lock")
 
 
 def _ensure_file():
@@ -19,13 +31,13 @@ def _ensure_file():
 def _load() -> list[dict]:
     """Carga el registro completo desde JSON."""
     _ensure_file()
-    with open(UPLOADS_FILE, "r", encoding="utf-8") as f:
+    with span("registry.load", registry="uploads"), open(UPLOADS_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
 def _save(data: list[dict]) -> None:
     """Guarda el registro completo en JSON."""
-    with open(UPLOADS_FILE, "w", encoding="utf-8") as f:
+    with span("registry.save", registry="uploads", records=len(data)), open(UPLOADS_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
@@ -33,14 +45,21 @@ def _is_uploaded(local_path: str) -> bool:
     """
     Verifica si un archivo ya fue subido con éxito.
     """
-    records = _load()
+    with _LOCK:
+        records = _load()
     for r in records:
         if r["local_path"] == local_path and r["status"] == "success":
             return True
     return False
 
 
-def _register_upload(local_path: str, youtube_id: str, title: str, status: str) -> None:
+def _register_upload(
+    local_path: str,
+    youtube_id: str,
+    title: str,
+    status: str,
+    metrics: dict | None = None,
+) -> None:
     """
     Registra una subida (exitosa o fallida).
 
@@ -49,9 +68,8 @@ def _register_upload(local_path: str, youtube_id: str, title: str, status: str)
         youtube_id: ID del video en YouTube (None si falló).
         title: título usado en la subida.
         status: "success" o "failed".
+        metrics: métricas de la transferencia (ej: {"retries": 2, ...}), opcional.
     """
-    records = _load()
-
     entry = {
         "local_path": local_path,
         "youtube_id": youtube_id,
@@ -59,17 +77,131 @@ def _register_upload(local_path: str, youtube_id: str, title: str, status: str)
         "uploaded_at": datetime.now().isoformat(timespec="seconds"),
         "status": status,
     }
-    records.append(entry)
-    _save(records)
+    if metrics:
+        entry["metrics"] = metrics
+
+    with _LOCK:
+        records = _load()
+        records.append(entry)
+        _save(records)
+    prom.UPLOADS.inc(status=status)
+    prom.record_transfer(metrics)
 
     logger.info(f"Registro actualizado: {local_path} → {status}")
 
 
+def _load_sessions() -> dict:
+    """Carga las sesiones resumables en curso (local_path → sesión)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    if not SESSIONS_FILE.exists():
+        return {}
+    with open(SESSIONS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_sessions(sessions: dict) -> None:
+    """Guarda las sesiones resumables (escritura atómica: se llama en cada chunk)."""
+    tmp_file = SESSIONS_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(sessions, f, ensure_ascii=False, indent=2)
+    tmp_file.replace(SESSIONS_FILE)
+
+
+def _file_signature(local_path: str) -> dict:
+    stat = Path(local_path).stat()
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def _get_session(local_path: str) -> dict | None:
+    """
+    Devuelve la sesión resumable guardada para un archivo, o None.
+    Si el archivo cambió desde que se abrió la sesión, la descarta.
+    """
+    with _LOCK:
+        sessions = _load_sessions()
+        session = sessions.get(local_path)
+        if session is None:
+            return None
+        try:
+            signature = _file_signature(local_path)
+        except OSError:
+            signature = None
+        if signature is None or any(session.get(k) != v for k, v in signature.items()):
+            sessions.pop(local_path, None)
+            _save_sessions(sessions)
+            logger.info(f"Sesión de subida descartada (el archivo cambió): {local_path}")
+            return None
+        return session
+
+
+def _save_session(local_path: str, session_uri: str, offset: int) -> None:
+    """
+    Guarda la URI de la sesión resumable y el offset confirmado por el servidor.
+    """
+    entry = {
+        "session_uri": session_uri,
+        "offset": offset,
+        **_file_signature(local_path),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with _LOCK:
+        sessions = _load_sessions()
+        sessions[local_path] = entry
+        _save_sessions(sessions)
+    logger.debug(f"Sesión de subida guardada: {local_path} @ {offset} bytes")
+
+
+def _clear_session(local_path: str) -> None:
+    """Elimina la sesión resumable de un archivo (ej: al terminar la subida)."""
+    with _LOCK:
+        sessions = _load_sessions()
+        if sessions.pop(local_path, None) is not None:
+            _save_sessions(sessions)
+
+
+def _add_pending_metadata(items: list[dict]) -> None:
+    """
+    Guarda cambios de metadata / playlists que no se pudieron aplicar (ej: sin
+    cuota) para reintentarlos en la próxima ejecución. Ignora los repetidos.
+    """
+    with _LOCK:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        pending = []
+        if PENDING_METADATA_FILE.exists():
+            with open(PENDING_METADATA_FILE, "r", encoding="utf-8") as f:
+                pending = json.load(f)
+        added = [i for i in items if i not in pending]
+        if not added:
+            return
+        tmp_file = PENDING_METADATA_FILE.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(pending + added, f, ensure_ascii=False, indent=2)
+        tmp_file.replace(PENDING_METADATA_FILE)
+    logger.info(f"{len(added)} cambio(s) de metadata/playlists quedan pendientes")
+
+
+def _take_pending_metadata() -> list[dict]:
+    """Devuelve y borra los cambios de metadata / playlists pendientes."""
+    with _LOCK:
+        if not PENDING_METADATA_FILE.exists():
+            return []
+        with open(PENDING_METADATA_FILE, "r", encoding="utf-8") as f:
+            pending = json.load(f)
+        PENDING_METADATA_FILE.unlink()
+    return pending
+
+
+def _iter_uploads() -> Iterator[dict]:
+    """Recorre los registros de a uno, sin cargar el archivo entero (ej: zoomtube list)."""
+    return iter_array(UPLOADS_FILE)
+
+
 def _get_all_uploads() -> list[dict]:
     """
     Devuelve todos los registros (puede usarse para reportes).
     """
-    return _load()
+    with _LOCK:
+        return _load()
 
 # Posible clase para encapsular esta funcionalidad, aunque por ahora no es estrictamente necesaria. 
 class UploadRegistry():
@@ -82,14 +214,16 @@ class UploadRegistry():
         """
         Verifica si un archivo ya fue subido con éxito.
         """
-        records = _load()
-        for r in records:
-            if r["local_path"] == local_path and r["status"] == "success":
-                return True
-        return False
+        return _is_uploaded(local_path)
 
     @staticmethod
-    def register_upload(local_path: str, youtube_id: str, title: str, status: str) -> None:
+    def register_upload(
+        local_path: str,
+        youtube_id: str,
+        title: str,
+        status: str,
+        metrics: dict | None = None,
+    ) -> None:
         """
         Registra una subida (exitosa o fallida).
 
@@ -98,24 +232,51 @@ class UploadRegistry():
             youtube_id: ID del video en YouTube (None si falló).
             title: título usado en la subida.
             status: "success" o "failed".
+            metrics: métricas de la transferencia (ej: {"retries": 2, ...}), opcional.
         """
-        records = _load()
-
-        entry = {
-            "local_path": local_path,
-            "youtube_id": youtube_id,
-            "title": title,
-            "uploaded_at": datetime.now().isoformat(timespec="seconds"),
-            "status": status,
-        }
-        records.append(entry)
-        _save(records)
-
-        logger.info(f"Registro actualizado: {local_path} → {status}")
+        _register_upload(local_path, youtube_id, title, status, metrics)
 
     @staticmethod
     def get_all_uploads() -> list[dict]:
         """
         Devuelve todos los registros (puede usarse para reportes).
         """
-        return _load()
\ No newline at end of file
+        return _get_all_uploads()
+
+    @staticmethod
+    def iter_uploads() -> Iterator[dict]:
+        """Recorre los registros de a uno, sin cargar el archivo entero."""
+        return _iter_uploads()
+
+    @staticmethod
+    def get_session(local_path: str) -> dict | None:
+        """
+        Devuelve la sesión resumable guardada para un archivo
+        ({session_uri, offset, size, mtime, updated_at}), o None.
+        """
+        return _get_session(local_path)
+
+    @staticmethod
+    def save_session(local_path: str, session_uri: str, offset: int) -> None:
+        """
+        Guarda la URI de la sesión resumable y el offset confirmado por el servidor.
+        """
+        _save_session(local_path, session_uri, offset)
+
+    @staticmethod
+    def clear_session(local_path: str) -> None:
+        """Elimina la sesión resumable de un archivo."""
+        _clear_session(local_path)
+
+    @staticmethod
+    def add_pending_metadata(items: list[dict]) -> None:
+        """
+        Guarda cambios de metadata / playlists que no se pudieron aplicar (ej:
+        sin cuota) para reintentarlos en la próxima ejecución.
+        """
+        _add_pending_metadata(items)
+
+    @staticmethod
+    def take_pending_metadata() -> list[dict]:
+        """Devuelve y borra los cambios de metadata / playlists pendientes."""
+        return _take_pending_metadata()
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+# Carpeta y archivo de estado
+STATE_DIR = Path(__file__).resolve().parents[2] / "state"
+WATCH_FILE = STATE_DIR / "watch.json"
+
+
+def _load() -> dict:
+    """Carga el estado del watcher ({} si nunca corrió)."""
+    if not WATCH_FILE.exists():
+        return {}
+    with open(WATCH_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(state: dict) -> None:
+    """Guarda el estado (escritura atómica: un corte no debe dejar el cursor a medias)."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = WATCH_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    tmp_file.replace(WATCH_FILE)
+
+
+def _clear() -> None:
+    """Borra el estado: el próximo watch arranca desde --since."""
+    WATCH_FILE.unlink(missing_ok=True)
+
+
+class WatchRegistry():
+    """
+    Estado de `zoomtube watch`:
+    - cursor: fin de grabación (recording_end) más reciente ya procesado.
+    - pending: reuniones vistas que Zoom todavía está procesando o con archivos
+      que no se pudieron descargar (meeting_id → start_time).
+    - cursor_ids: reuniones procesadas con recording_end igual al cursor.
+    - to_upload: archivos descargados que todavía no se subieron.
+    """
+
+    @staticmethod
+    def get_state() -> dict:
+        """Devuelve el estado guardado, o {} si no hay."""
+        return _load()
+
+    @staticmethod
+    def save_state(state: dict) -> None:
+        """Guarda el estado del watcher."""
+        _save(state)
+
+    @staticmethod
+    def clear() -> None:
+        """Borra el estado del watcher."""
+        _clear()
@@ -6,6 +6,7 @@ import os
 import platform
 
 from zoomtube.utils.logger import logger
+from zoomtube.utils.profiling import run_tool
 
 
 class AudioAnalyzer:
@@ -32,7 +33,7 @@ class AudioAnalyzer:
 
         for attempt in range(self.retries):
             try:
-                result = subprocess.run(
+                result = run_tool(
                     self._build_command(file_path),
                     stderr=subprocess.PIPE,
                     stdout=subprocess.DEVNULL,
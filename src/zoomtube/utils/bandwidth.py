@@ -0,0 +1,161 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from zoomtube.utils import metrics as prom
+from zoomtube.utils.logger import logger
+
+# Cada cuánto se vuelve a evaluar el horario del límite (segundos)
+_SCHEDULE_RECHECK = 30.0
+# Ráfaga máxima del bucket: este tiempo de transferencia al límite actual
+_BURST_SECONDS = 1.0
+
+
+def _minutes(hhmm: str) -> int:
+    hours, _, minutes = hhmm.strip().partition(":")
+    value = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"Hora inválida: {hhmm}")
+    return value
+
+
+def _rate(mbps: str) -> Optional[float]:
+    value = float(mbps)
+    if value < 0:
+        raise ValueError(f"Límite negativo: {mbps}")
+    return value * 1_000_000 or None
+
+
+class BandwidthSchedule:
+    """
+    Límite de ancho de banda (MB/s) según la hora del día. Formato:
+
+        "5"                     → 5 MB/s todo el día
+        "08:00-19:00=5,0"       → 5 MB/s de 8 a 19 h, sin límite el resto
+        "08:00-13:00=3,13:00-19:00=5,22:00-06:00=0,20"
+
+    Cada franja es HH:MM-HH:MM=MB/s (puede cruzar medianoche); un valor suelto
+    es el límite fuera de las franjas. 0 = sin límite. Gana la primera franja
+    que coincide.
+    """
+
+    def __init__(self, windows: list[tuple[int, int, Optional[float]]], default: Optional[float], spec: str = ""):
+        self.windows = windows
+        self.default = default
+        self.spec = spec
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> Optional["BandwidthSchedule"]:
+        """None si spec está vacío (sin límite)."""
+        if not spec or not spec.strip():
+            return None
+        windows, default = [], None
+        try:
+            for part in spec.split(","):
+                part = part.strip()
+                if not part:
+                    continue
+                if "=" not in part:
+                    default = _rate(part)
+                    continue
+                span, _, mbps = part.partition("=")
+                start, sep, end = span.partition("-")
+                if not sep:
+                    raise ValueError(f"Franja inválida: {part}")
+                windows.append((_minutes(start), _minutes(end), _rate(mbps)))
+        except ValueError as e:
+            raise ValueError(f"Límite de ancho de banda inválido '{spec}': {e}") from e
+        return cls(windows, default, spec)
+
+    def window_at(self, at: datetime) -> tuple[str, Optional[float]]:
+        """(franja que aplica, límite en bytes/s o None) para ese momento."""
+        minute = at.hour * 60 + at.minute
+        for start, end, rate in self.windows:
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}", rate
+        return ("resto del día" if self.windows else "todo el día"), self.default
+
+    def rate_at(self, at: datetime) -> Optional[float]:
+        return self.window_at(at)[1]
+
+
+class TokenBucket:
+    """
+    Token bucket compartido por todas las transferencias de un sentido dentro
+    del proceso. Cada transferencia pide sus bytes con consume() antes de
+    mandarlos (o después de leerlos); si no hay tokens, espera lo que falta
+    para generarlos al límite actual. Con varias transferencias en paralelo
+    el límite es para el total, no por transferencia.
+
+    El límite sale de schedule() (se reevalúa cada _SCHEDULE_RECHECK segundos),
+    así el mismo proceso puede ir limitado de día y a toda velocidad de noche.
+    """
+
+    def __init__(self, direction: str, schedule: Callable[[], Optional[BandwidthSchedule]]):
+        self.direction = direction
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        self._rate: Optional[float] = None
+        self._window: Optional[str] = None
+        self._checked = float("-inf")
+        self._tokens = 0.0
+        self._last = time.monotonic()
+
+    def _refresh(self, now: float) -> None:
+        """Reevalúa el horario (con el lock tomado) y loguea cada cambio de límite."""
+        self._checked = now
+        schedule = self._schedule()
+        window, rate = schedule.window_at(datetime.now()) if schedule else (None, None)
+        if (window, rate) == (self._window, self._rate):
+            return
+        if schedule is not None:
+            limit = f"{rate / 1_000_000:g} MB/s" if rate else "sin límite"
+            logger.info(f"Ancho de banda de {self.direction}: {limit} ({window})")
+        self._window, self._rate = window, rate
+        # Al cambiar de límite se arranca sin ráfaga acumulada ni deuda
+        self._tokens, self._last = 0.0, now
+        prom.BANDWIDTH_LIMIT.set(rate or 0, direction=self.direction)
+
+    def limit(self) -> Optional[float]:
+        """Límite actual en bytes/s (None = sin límite)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked >= _SCHEDULE_RECHECK:
+                self._refresh(now)
+            return self._rate
+
+    def consume(self, nbytes: int) -> float:
+        """Toma nbytes del bucket, esperando si hace falta. Devuelve los segundos esperados."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked >= _SCHEDULE_RECHECK:
+                self._refresh(now)
+            rate = self._rate
+            if not rate:
+                return 0.0
+            self._tokens = min(rate * _BURST_SECONDS, self._tokens + (now - self._last) * rate)
+            self._last = now
+            # Los tokens pueden quedar negativos: la deuda la esperan este
+            # pedido y los siguientes, en orden de llegada
+            self._tokens -= nbytes
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            prom.BANDWIDTH_WAIT.inc(wait, direction=self.direction)
+            time.sleep(wait)
+        return wait
+
+
+def _setting(name: str) -> Callable[[], Optional[BandwidthSchedule]]:
+    def schedule() -> Optional[BandwidthSchedule]:
+        from zoomtube import config
+
+        return getattr(config, name)
+    return schedule
+
+
+# Buckets globales del proceso: ZoomClient.download_recording y
+# YoutubeClient.upload_video toman de acá
+DOWNLOAD = TokenBucket("bajada", _setting("BANDWIDTH_DOWN"))
+UPLOAD = TokenBucket("subida", _setting("BANDWIDTH_UP"))
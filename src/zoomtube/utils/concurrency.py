@@ -0,0 +1,204 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from zoomtube.constants import (
+    CONCURRENCY_ERROR_RATE,
+    CONCURRENCY_HOLD_WINDOWS,
+    CONCURRENCY_INTERVAL,
+    CONCURRENCY_MIN_GAIN,
+)
+from zoomtube.utils.logger import logger
+
+
+class _Signals:
+    """Lo que observan los clientes en un sentido: bytes transferidos, errores transitorios y 429."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def add(self, nbytes: int = 0, errors: int = 0, throttled: int = 0) -> None:
+        with self._lock:
+            self.bytes += nbytes
+            self.errors += errors
+            self.throttled += throttled
+
+    def snapshot(self) -> tuple[int, int, int]:
+        with self._lock:
+            return self.bytes, self.errors, self.throttled
+
+
+# Acumulados del proceso; cada controlador mira cuánto crecieron en su ventana
+_SIGNALS = {"download": _Signals(), "upload": _Signals()}
+
+
+def record_bytes(direction: str, nbytes: int) -> None:
+    """Bytes transferidos (se llama por chunk desde los clientes)."""
+    _SIGNALS[direction].add(nbytes=nbytes)
+
+
+def record_error(direction: str, throttled: bool = False) -> None:
+    """Un error de transferencia; throttled si fue un 429 / rate limit."""
+    if throttled:
+        _SIGNALS[direction].add(throttled=1)
+    else:
+        _SIGNALS[direction].add(errors=1)
+
+
+class ConcurrencyController:
+    """
+    Cantidad de transferencias en paralelo de un sentido, ajustada en la
+    corrida con AIMD (suma aditiva, baja multiplicativa):
+
+    - Cada `interval` segundos mira el throughput total, los errores y los
+      429 de la ventana (ver record_bytes / record_error).
+    - Con 429 o demasiados errores (más de CONCURRENCY_ERROR_RATE por
+      transferencia activa), el límite baja a la mitad.
+    - Después de una suba se deja pasar una ventana (la transferencia nueva
+      arranca); si en la siguiente el throughput no mejoró al menos
+      CONCURRENCY_MIN_GAIN respecto de antes de subir, vuelve uno atrás y se
+      queda ahí CONCURRENCY_HOLD_WINDOWS ventanas.
+    - Si no, sube de a uno, hasta ceiling.
+
+    Siempre entre floor y ceiling; con floor == ceiling es un límite fijo.
+    Cada decisión queda en el log. Se usa como context manager (arranca el
+    thread que decide) y cada transferencia toma un lugar con slot(),
+    try_acquire() o acquire(), y lo devuelve con release().
+    """
+
+    def __init__(self, label: str, direction: str, floor: int, ceiling: int,
+                 interval: float = CONCURRENCY_INTERVAL):
+        self.label = label
+        self.direction = direction
+        self.ceiling = max(1, ceiling)
+        self.floor = min(max(1, floor), self.ceiling)
+        self.interval = interval
+        self._limit = self.floor
+        self._active = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Estado de la última ventana
+        self._last_sample = _SIGNALS[direction].snapshot()
+        self._last_time = time.monotonic()
+        self._baseline: Optional[float] = None   # throughput antes de la última suba
+        self._settling = False
+        self._hold = 0
+
+    @property
+    def adaptive(self) -> bool:
+        return self.floor < self.ceiling
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def __enter__(self) -> "ConcurrencyController":
+        if self.adaptive:
+            logger.info(f"Concurrencia de {self.label}: adaptativa entre {self.floor} y {self.ceiling}, "
+                        f"empieza en {self._limit}")
+            self._last_sample, self._last_time = _SIGNALS[self.direction].snapshot(), time.monotonic()
+            self._thread = threading.Thread(target=self._run, name=f"concurrency-{self.direction}", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    # --- Lugares ---
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._active >= self._limit:
+                return False
+            self._active += 1
+            return True
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    # --- Decisiones ---
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.update()
+            except Exception as e:
+                logger.error(f"Concurrencia de {self.label}: {e}")
+
+    def _set_limit(self, limit: int) -> None:
+        with self._cond:
+            self._limit = limit
+            self._cond.notify_all()
+
+    def update(self) -> None:
+        """Cierra la ventana actual y decide el nuevo límite."""
+        now = time.monotonic()
+        sample = _SIGNALS[self.direction].snapshot()
+        nbytes, errors, throttled = (b - a for a, b in zip(self._last_sample, sample))
+        elapsed = now - self._last_time
+        self._last_sample, self._last_time = sample, now
+        with self._cond:
+            active = self._active
+        if elapsed <= 0 or (not active and not nbytes):
+            return   # sin transferencias en la ventana: nada que medir
+
+        rate = nbytes / elapsed
+        old = self._limit
+        seen = f"{rate / 1e6:.1f} MB/s con {active} activa(s)"
+        if errors:
+            seen += f", {errors} error(es)"
+        if throttled:
+            seen += f", {throttled} respuesta(s) 429"
+
+        new = old
+        if throttled or errors > CONCURRENCY_ERROR_RATE * max(active, 1):
+            new = max(self.floor, old // 2)
+            reason = "baja a la mitad" if new < old else "se mantiene (en el mínimo)"
+            self._baseline, self._settling, self._hold = None, False, CONCURRENCY_HOLD_WINDOWS
+        elif self._settling:
+            reason = "se mantiene (midiendo la suba)"
+            self._settling = False
+        elif active < old:
+            # Sobran lugares (no hay más trabajo en cola): la ventana no dice nada del límite
+            reason = "se mantiene (sin demanda para más)"
+            self._baseline = None
+        elif self._baseline is not None and rate < self._baseline * (1 + CONCURRENCY_MIN_GAIN):
+            new = max(self.floor, old - 1)
+            reason = f"vuelve atrás (con {old} no mejora los {self._baseline / 1e6:.1f} MB/s de antes)"
+            self._baseline, self._hold = None, CONCURRENCY_HOLD_WINDOWS
+        elif self._hold:
+            self._hold -= 1
+            reason = "se mantiene"
+        elif old < self.ceiling:
+            new, reason = old + 1, "sube"
+            self._baseline, self._settling = rate, True
+        else:
+            reason = "se mantiene (en el máximo)"
+            self._baseline = None
+
+        if new != old:
+            self._set_limit(new)
+        logger.info(f"Concurrencia de {self.label}: {old} → {new}, {reason} ({seen})")
@@ -0,0 +1,49 @@
+import threading
+from pathlib import Path
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:   # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+
+class StateLock:
+    """
+    Lock de un registro de estado, válido entre threads y entre procesos
+    (varios `zoomtube jobs work` comparten la carpeta de estado): un
+    threading.Lock más un flock sobre un archivo .lock al lado del registro.
+
+    lock_path es una función para que siga a la carpeta de estado actual
+    (ver registries.set_state_dir).
+    """
+
+    def __init__(self, lock_path: Callable[[], Path]):
+        self._lock_path = lock_path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self) -> "StateLock":
+        self._lock.acquire()
+        if fcntl is not None:
+            try:
+                path = self._lock_path()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(path, "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if self._file is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+                self._file.close()
+                self._file = None
+        finally:
+            self._lock.release()
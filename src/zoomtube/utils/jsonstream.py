@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from typing import Iterator
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_array(path: Path, chunk_size: int = _CHUNK_SIZE) -> Iterator:
+    """
+    Recorre los elementos de un archivo con un array JSON sin cargarlo entero:
+    lee de a chunks y decodifica un elemento a la vez, así la memoria depende
+    del tamaño de un registro y no del archivo (los registros son arrays de
+    dicts que crecen con cada descarga/subida).
+    Un archivo inexistente o vacío se toma como array vacío.
+    """
+    if not Path(path).exists():
+        return
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+        started = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        while True:
+            # Saltear espacios y separadores hasta el próximo elemento
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    break
+            if pos >= len(buf):
+                if started:
+                    raise ValueError(f"{path}: array JSON sin cerrar")
+                return
+
+            char = buf[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError(f"{path}: se esperaba un array JSON")
+                started, pos = True, pos + 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                pos += 1
+                continue
+
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # El elemento sigue en el próximo chunk
+                    if eof or not fill():
+                        raise
+                    continue
+                # Un número cortado en el borde del chunk decodifica "bien" pero incompleto:
+                # el elemento solo está entero si lo sigue un separador
+                if not eof and (end == len(buf) or buf[end] not in _DELIMITERS) and fill():
+                    continue
+                break
+            pos = end
+            yield item
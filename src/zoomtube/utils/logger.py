@@ -1,9 +1,24 @@
 # src/zoomtube/utils/logger.py
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 import os
 import platform
+from typing import Optional
+
+from zoomtube.constants import LOG_BACKUP_COUNT, LOG_FORMATS, LOG_MAX_MB
+
+# Handlers reales de cada logger configurado (viven detrás de su QueueListener)
+_listeners: dict[str, QueueListener] = {}
+
+_TEXT_CONSOLE_FMT = "[%(levelname)s] %(message)s"
+_TEXT_FILE_FMT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
 
 def _get_log_dir() -> Path:
     """
@@ -23,43 +38,134 @@ def _get_log_dir() -> Path:
     return log_dir
 
 
-def get_logger(name: str = "zoomtube", verbose: bool = False, quiet: bool = False) -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """
+    Una línea JSON por registro. Además de ts/level/logger/thread/msg incluye
+    los campos de contexto del pipeline (meeting_id, file_type, stage, bytes)
+    cuando el registro los trae: por extra= o, dentro de un span, completados
+    por tracing a partir de los spans abiertos del thread.
+    """
+
+    FIELDS = ("meeting_id", "file_type", "stage", "bytes")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    QueueHandler que deja el traceback en el registro. El prepare() de la
+    stdlib lo formatea dentro de msg y borra exc_info/exc_text, así que el
+    JsonFormatter (del lado del QueueListener) nunca veía la excepción y la
+    escribía pegada a "msg" en vez de en "exc". Acá solo se resuelve el
+    mensaje con sus args; los formatters de consola y archivo agregan el
+    traceback cada uno a su manera.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _formatters(log_format: str) -> tuple[logging.Formatter, logging.Formatter]:
+    """Formatters de (consola, archivo) para "text" o "json"."""
+    if log_format == "json":
+        return JsonFormatter(), JsonFormatter()
+    return logging.Formatter(_TEXT_CONSOLE_FMT), logging.Formatter(_TEXT_FILE_FMT)
+
+
+def _console_level(verbose: bool, quiet: bool) -> int:
+    if quiet:
+        return logging.ERROR
+    if verbose:
+        return logging.DEBUG
+    return logging.INFO
+
+
+def get_logger(
+    name: str = "zoomtube",
+    verbose: bool = False,
+    quiet: bool = False,
+    log_format: Optional[str] = None,
+) -> logging.Logger:
     """
     Configura un logger con salida a consola y archivo rotativo.
+
+    El logger solo tiene un QueueHandler: formatear el mensaje y encolarlo es
+    todo lo que pasa en el thread que loguea. Un QueueListener escribe en
+    consola y en el archivo desde su propio thread, así la E/S de logs no
+    frena a los workers de descarga/subida.
+
+    Tamaño y cantidad de archivos rotados: ZOOMTUBE_LOG_MAX_MB y
+    ZOOMTUBE_LOG_BACKUPS. Formato ("text" o "json", JSON Lines):
+    log_format o ZOOMTUBE_LOG_FORMAT. Se leen del entorno del proceso (el
+    logger se configura al importarse, antes de cargar los .env).
+
+    Si el logger ya estaba configurado, solo actualiza el nivel de consola y,
+    si se pasa log_format, el formato.
     """
     logger = logging.getLogger(name)
+    listener = _listeners.get(name)
 
-    if logger.handlers:
-        return logger  # ya configurado
+    if listener is None:
+        logger.setLevel(logging.DEBUG)
+        log_format = log_format or os.getenv("ZOOMTUBE_LOG_FORMAT", "text")
+        if log_format not in LOG_FORMATS:
+            log_format = "text"
+        console_fmt, file_fmt = _formatters(log_format)
 
-    logger.setLevel(logging.DEBUG)
+        # --- Consola ---
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(console_fmt)
 
-    # --- Consola ---
-    console_handler = logging.StreamHandler()
+        # --- Archivo ---
+        log_file = _get_log_dir() / "zoomtube.log"
+        max_mb = float(os.getenv("ZOOMTUBE_LOG_MAX_MB", LOG_MAX_MB))
+        backups = int(os.getenv("ZOOMTUBE_LOG_BACKUPS", LOG_BACKUP_COUNT))
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=int(max_mb * 1_000_000), backupCount=backups, encoding="utf-8"
+        )
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(file_fmt)
 
-    if quiet:
-        console_handler.setLevel(logging.ERROR)
-    elif verbose:
-        console_handler.setLevel(logging.DEBUG)
-    else:
-        console_handler.setLevel(logging.INFO)
-
-    console_fmt = logging.Formatter("[%(levelname)s] %(message)s")
-    console_handler.setFormatter(console_fmt)
-
-    # --- Archivo ---
-    log_file = _get_log_dir() / "zoomtube.log"
-    file_handler = RotatingFileHandler(log_file, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)
-    file_fmt = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    file_handler.setFormatter(file_fmt)
-
-    # Agregar handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+        # --- Cola ---
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+        listener.start()
+        # Vaciar la cola antes de salir (incluye sys.exit y Ctrl+C)
+        atexit.register(listener.stop)
+        _listeners[name] = listener
+        logger.addHandler(_QueueHandler(log_queue))
+    elif log_format:
+        console_fmt, file_fmt = _formatters(log_format)
+        listener.handlers[0].setFormatter(console_fmt)
+        listener.handlers[1].setFormatter(file_fmt)
 
+    listener.handlers[0].setLevel(_console_level(verbose, quiet))
     return logger
 
 
+def set_console_level(level: int, name: str = "zoomtube") -> None:
+    """Cambia el nivel de la salida por consola (ej: benchmarks que solo quieren warnings)."""
+    _listeners[name].handlers[0].setLevel(level)
+
+
 # Logger por defecto
 logger = get_logger()
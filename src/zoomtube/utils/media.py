@@ -0,0 +1,217 @@
+import json
+import os
+import platform
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from zoomtube.models import MediaOptimizationResult
+from zoomtube.utils.logger import logger
+from zoomtube.utils.profiling import run_tool
+from zoomtube.constants import (
+    DEFAULT_OPTIMIZE_PRESET,
+    DEFAULT_OPTIMIZE_MIN_SAVING,
+)
+
+
+def available_cpus() -> int:
+    """
+    Cantidad de núcleos disponibles para este proceso (respeta afinidad en Linux).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def is_faststart(file_path: Path) -> bool:
+    """
+    Indica si el MP4 ya tiene el átomo 'moov' antes de 'mdat' (fast-start).
+    Solo lee los headers de los átomos de primer nivel, no el contenido.
+    """
+    with open(file_path, "rb") as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            size = int.from_bytes(header[:4], "big")
+            box_type = header[4:8]
+            if box_type == b"moov":
+                return True
+            if box_type == b"mdat":
+                return False
+            if size == 1:
+                size = int.from_bytes(f.read(8), "big")
+                f.seek(size - 16, os.SEEK_CUR)
+            elif size == 0:
+                return False
+            else:
+                f.seek(size - 8, os.SEEK_CUR)
+
+
+class MediaOptimizer:
+    """
+    Optimiza videos antes de subirlos a YouTube.
+    - Siempre intenta un remux "fast-start" (sin recodificar)
+    - Opcionalmente recodifica con tope de bitrate y/o resolución
+    - Omite la recodificación si el ahorro estimado es menor a min_saving
+    """
+
+    def __init__(
+        self,
+        ffmpeg_path: str = None,
+        ffprobe_path: str = None,
+        target_bitrate_kbps: Optional[int] = None,
+        max_height: Optional[int] = None,
+        preset: str = DEFAULT_OPTIMIZE_PRESET,
+        min_saving: float = DEFAULT_OPTIMIZE_MIN_SAVING,
+        threads: int = 0,
+    ):
+        self.ffmpeg_path = ffmpeg_path or self._default_bin_path("ffmpeg")
+        self.ffprobe_path = ffprobe_path or self._default_bin_path("ffprobe")
+        self.target_bitrate_kbps = target_bitrate_kbps
+        self.max_height = max_height
+        self.preset = preset
+        self.min_saving = min_saving
+        self.threads = threads  # 0 = que decida ffmpeg
+
+    @property
+    def reencode_enabled(self) -> bool:
+        return bool(self.target_bitrate_kbps or self.max_height)
+
+    def _default_bin_path(self, name: str) -> str:
+        if platform.system() == "Windows":
+            base_dir = Path(__file__).resolve().parents[2]
+            return str(base_dir / "bin" / f"{name}.exe")
+        return name
+
+    def optimize(self, file_path) -> MediaOptimizationResult:
+        """
+        Optimiza el archivo en el lugar (escribe a un temporal y lo reemplaza),
+        así los registros que usan local_path siguen siendo válidos.
+        Solo se optimizan .mp4: el resultado siempre es mp4, y reemplazar un
+        .mkv/.avi/.mov dejaría un mp4 con la extensión original.
+        """
+        file_path = Path(file_path)
+        original_size = file_path.stat().st_size
+
+        if file_path.suffix.lower() != ".mp4":
+            logger.debug(f"Sin optimizar (no es .mp4): {file_path}")
+            return MediaOptimizationResult(str(file_path), "skipped", original_size, original_size)
+
+        try:
+            if self.reencode_enabled:
+                saving = self.estimate_saving(file_path)
+                if saving >= self.min_saving:
+                    return self._run(file_path, original_size, "reencoded", self._reencode_command)
+                logger.debug(
+                    f"Ahorro estimado {saving:.0%} < {self.min_saving:.0%}, sin recodificar: {file_path}"
+                )
+
+            if is_faststart(file_path):
+                return MediaOptimizationResult(str(file_path), "skipped", original_size, original_size)
+
+            return self._run(file_path, original_size, "remuxed", self._remux_command)
+
+        except Exception as e:
+            logger.error(f"Error optimizando {file_path}: {e}")
+            return MediaOptimizationResult(str(file_path), "failed", original_size, original_size)
+
+    def estimate_saving(self, file_path: Path) -> float:
+        """
+        Estima la fracción de tamaño que se ahorraría al recodificar,
+        a partir del bitrate y la resolución actuales (ffprobe).
+        """
+        info = self._probe(file_path)
+        fmt = info.get("format", {})
+        duration = float(fmt.get("duration") or 0)
+        size = float(fmt.get("size") or file_path.stat().st_size)
+        if duration <= 0 or size <= 0:
+            return 0.0
+
+        video = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), None)
+        if video is None:
+            return 0.0
+
+        total_kbps = size * 8 / duration / 1000
+        video_kbps = float(video.get("bit_rate") or 0) / 1000 or total_kbps
+        other_kbps = max(total_kbps - video_kbps, 0.0)
+
+        estimated_video_kbps = video_kbps
+        height = int(video.get("height") or 0)
+        if self.max_height and height > self.max_height:
+            # El bitrate escala aprox. con la cantidad de píxeles
+            estimated_video_kbps *= (self.max_height / height) ** 2
+        if self.target_bitrate_kbps:
+            estimated_video_kbps = min(estimated_video_kbps, self.target_bitrate_kbps)
+
+        estimated_kbps = estimated_video_kbps + other_kbps
+        return max(0.0, 1 - estimated_kbps / total_kbps)
+
+    def _probe(self, file_path: Path) -> dict:
+        result = run_tool(
+            [
+                self.ffprobe_path,
+                "-v", "error",
+                "-show_entries", "format=duration,size:stream=codec_type,bit_rate,height",
+                "-of", "json",
+                str(file_path),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        return json.loads(result.stdout or "{}")
+
+    def _remux_command(self, src: Path, dst: Path) -> list[str]:
+        return [
+            self.ffmpeg_path, "-y", "-v", "error",
+            "-i", str(src),
+            "-map", "0", "-c", "copy",
+            "-movflags", "+faststart",
+            "-f", "mp4", str(dst),
+        ]
+
+    def _reencode_command(self, src: Path, dst: Path) -> list[str]:
+        cmd = [
+            self.ffmpeg_path, "-y", "-v", "error",
+            "-i", str(src),
+            "-map", "0:v:0", "-map", "0:a?",
+            "-c:v", "libx264", "-preset", self.preset,
+        ]
+        if self.target_bitrate_kbps:
+            kbps = self.target_bitrate_kbps
+            cmd += ["-b:v", f"{kbps}k", "-maxrate", f"{kbps}k", "-bufsize", f"{kbps * 2}k"]
+        if self.max_height:
+            cmd += ["-vf", f"scale=-2:'min({self.max_height},ih)'"]
+        if self.threads:
+            cmd += ["-threads", str(self.threads)]
+        cmd += [
+            "-c:a", "copy",
+            "-movflags", "+faststart",
+            "-f", "mp4", str(dst),
+        ]
+        return cmd
+
+    def _run(self, file_path: Path, original_size: int, action: str, build_command) -> MediaOptimizationResult:
+        # Sufijo fuera de VIDEO_EXTENSIONS para que run_batch nunca lo tome
+        tmp_path = file_path.with_name(file_path.name + ".optimizing")
+        try:
+            run_tool(
+                build_command(file_path, tmp_path),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+            final_size = tmp_path.stat().st_size
+
+            if action == "reencoded" and final_size >= original_size:
+                logger.debug(f"La recodificación no redujo el tamaño, se conserva el original: {file_path}")
+                tmp_path.unlink(missing_ok=True)
+                return MediaOptimizationResult(str(file_path), "skipped", original_size, original_size)
+
+            os.replace(tmp_path, file_path)
+            return MediaOptimizationResult(str(file_path), action, original_size, final_size)
+        finally:
+            tmp_path.unlink(missing_ok=True)
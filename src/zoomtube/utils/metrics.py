@@ -0,0 +1,216 @@
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+from zoomtube.utils.logger import logger
+from zoomtube.utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Formato de exposición de texto de Prometheus (sin depender de prometheus_client)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self):
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                yield self.name, dict(zip(self.labelnames, key)), value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], list] = {}   # key → [conteos por bucket, suma, cantidad]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                for bound, n in zip(self.buckets, counts):
+                    yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, n
+                yield f"{self.name}_sum", labels, total
+                yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """Conjunto de métricas del proceso, renderizables en formato Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Métricas del pipeline (se alimentan desde los registros, clientes y spans) ---
+RECORDINGS_DISCOVERED = registry.counter(
+    "zoomtube_recordings_discovered_total", "Archivos de grabación encontrados en Zoom")
+DOWNLOADS = registry.counter(
+    "zoomtube_downloads_total",
+    "Transiciones de estado de descargas (downloaded, success, discarded_silence, failed)",
+    ["status"])
+UPLOADS = registry.counter(
+    "zoomtube_uploads_total", "Subidas a YouTube por resultado", ["status"])
+TRANSFER_BYTES = registry.counter(
+    "zoomtube_transfer_bytes_total", "Bytes transferidos", ["direction"])
+STAGE_SECONDS = registry.histogram(
+    "zoomtube_stage_duration_seconds", "Duración de cada etapa del pipeline (spans)", ["stage"])
+ZOOM_RATE_LIMITED = registry.counter(
+    "zoomtube_zoom_rate_limited_total", "Respuestas 429 de la API de Zoom")
+YOUTUBE_QUOTA_USED = registry.gauge(
+    "zoomtube_youtube_quota_used_units", "Unidades de cuota de YouTube usadas en el día")
+YOUTUBE_QUOTA_LIMIT = registry.gauge(
+    "zoomtube_youtube_quota_limit_units", "Límite diario de cuota de YouTube")
+WATCH_POLLS = registry.counter(
+    "zoomtube_watch_polls_total", "Consultas a Zoom hechas por zoomtube watch")
+WATCH_CURSOR = registry.gauge(
+    "zoomtube_watch_cursor_timestamp_seconds", "Fin de la grabación más reciente procesada por zoomtube watch")
+WEBHOOK_EVENTS = registry.counter(
+    "zoomtube_webhook_events_total",
+    "Eventos recibidos por zoomtube serve (queued, duplicate, ignored, invalid_signature, queue_full, error, validation)",
+    ["result"])
+WEBHOOK_QUEUE = registry.gauge(
+    "zoomtube_webhook_queue_size", "Reuniones en cola o en proceso en zoomtube serve")
+STAGING_RESERVED = registry.gauge(
+    "zoomtube_staging_reserved_bytes", "Bytes reservados en el área de staging (descargas sin subir)")
+DISPOSALS = registry.counter(
+    "zoomtube_disposals_total", "Archivos locales borrados o archivados después de subirlos", ["action"])
+BANDWIDTH_LIMIT = registry.gauge(
+    "zoomtube_bandwidth_limit_bytes_per_second", "Límite de ancho de banda vigente (0 = sin límite)", ["direction"])
+BANDWIDTH_WAIT = registry.counter(
+    "zoomtube_bandwidth_wait_seconds_total", "Tiempo que las transferencias esperaron por el límite de ancho de banda",
+    ["direction"])
+LAST_RUN = registry.gauge(
+    "zoomtube_last_run_timestamp_seconds", "Momento en que terminó la última ejecución", ["command"])
+
+tracer.add_listener(lambda s: STAGE_SECONDS.observe(s.duration, stage=s.name))
+
+
+def record_transfer(metrics: Optional[dict]) -> None:
+    """Suma los bytes de una transferencia registrada (TransferStats.as_dict())."""
+    if metrics and metrics.get("bytes"):
+        TRANSFER_BYTES.inc(metrics["bytes"], direction=metrics.get("direction", "unknown"))
+
+
+def write_textfile(path, command: str) -> Path:
+    """
+    Escribe las métricas para el textfile collector de node_exporter.
+    La escritura es atómica (archivo temporal + rename), como pide el collector.
+    """
+    LAST_RUN.set(time.time(), command=command)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f".{path.name}.tmp")
+    tmp_file.write_text(registry.render(), encoding="utf-8")
+    tmp_file.replace(path)
+    return path
+
+
+def serve(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Expone /metrics en un thread aparte mientras dure el proceso."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Métricas disponibles en http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,260 @@
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from zoomtube.utils.logger import logger
+from zoomtube.constants import PROFILE_MODES
+
+
+# =========================
+# Procesos hijos (ffmpeg/ffprobe)
+# =========================
+
+class _ChildStats:
+    """Llamadas, tiempo de reloj y CPU de los procesos hijos, por herramienta."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tools: dict[str, dict] = {}
+
+    def add(self, tool: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            entry = self.tools.setdefault(tool, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            entry["calls"] += 1
+            entry["wall_s"] += wall
+            entry["cpu_s"] += cpu
+
+
+# Solo se registra mientras hay un Profiler activo
+_children: Optional[_ChildStats] = None
+
+
+def _children_cpu() -> float:
+    """CPU (user + sys) acumulada por los hijos ya terminados de este proceso."""
+    try:
+        import resource
+    except ImportError:   # Windows
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_tool(cmd: list, **kwargs) -> subprocess.CompletedProcess:
+    """
+    subprocess.run para las herramientas externas (ffmpeg, ffprobe). Con un
+    Profiler activo registra el tiempo de reloj y la CPU de cada llamada.
+    La CPU sale de RUSAGE_CHILDREN: si corren varias a la vez, cada una
+    cuenta también la de las que terminaron mientras tanto (el total de
+    CPU en procesos hijos del Profiler sí es exacto).
+    """
+    stats = _children
+    if stats is None:
+        return subprocess.run(cmd, **kwargs)
+    cpu0, t0 = _children_cpu(), time.perf_counter()
+    try:
+        return subprocess.run(cmd, **kwargs)
+    finally:
+        stats.add(Path(str(cmd[0])).stem, time.perf_counter() - t0, _children_cpu() - cpu0)
+
+
+# =========================
+# Profiler
+# =========================
+
+# Desde 3.12 cProfile usa sys.monitoring: un solo profiler activo por
+# intérprete (un segundo enable() lanza ValueError), que ya ve todos los threads
+_PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class Profiler:
+    """
+    Envuelve un subcomando con los profilers pedidos y deja los resultados en
+    out_dir, con el prefijo <comando>-<fecha>:
+
+    - cpu: cProfile de todos los threads que arrancan durante el comando
+      (.pstats, más un top por tiempo acumulado en .cpu.txt; en Python 3.12+
+      es un único cProfile, ver _PER_THREAD_PROFILES) y un muestreo
+      de los stacks de todos los threads cada `interval` segundos, en formato
+      collapsed (.collapsed) para flamegraph.pl o speedscope.
+    - mem: tracemalloc; al terminar guarda el top-N de asignaciones vivas por
+      línea y por traceback, y el pico (.mem.txt, más el snapshot en .mem.snapshot).
+    - Siempre: llamadas, tiempo y CPU de ffmpeg/ffprobe (.children.txt).
+    """
+
+    def __init__(self, mode: str, out_dir: str, name: str, top: int = 25, interval: float = 0.01):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de profiling desconocido: {mode}")
+        self.mode = mode
+        self.cpu = mode in ("cpu", "both")
+        self.mem = mode in ("mem", "both")
+        self.out_dir = Path(out_dir)
+        self.prefix = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        self.top = top
+        self.interval = interval
+        self._profile = None
+        self._thread_profiles: list = []
+        self._lock = threading.Lock()
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._cpu_started = 0.0
+        self._children_cpu_started = 0.0
+
+    # --- cpu ---
+
+    def _profile_thread(self, *args) -> None:
+        # threading.setprofile la llama con el primer evento de cada thread nuevo:
+        # cada thread tiene su propio cProfile (no son thread-safe) y enable()
+        # la reemplaza como función de profiling del thread
+        import cProfile
+
+        profile = cProfile.Profile()
+        with self._lock:
+            self._thread_profiles.append(profile)
+        profile.enable()
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    # co_qualname existe desde 3.11; en 3.10 alcanza con el nombre
+                    name = getattr(code, "co_qualname", code.co_name)
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}.{name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples[";".join(reversed(stack))] += 1
+
+    # --- ciclo de vida ---
+
+    def __enter__(self) -> "Profiler":
+        global _children
+        _children = _ChildStats()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._children_cpu_started = _children_cpu()
+
+        if self.mem:
+            import tracemalloc
+
+            tracemalloc.start(10)
+        if self.cpu:
+            import cProfile
+
+            # El thread de muestreo arranca antes del hook, así no se perfila a sí mismo
+            self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+            if _PER_THREAD_PROFILES:
+                threading.setprofile(self._profile_thread)
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        logger.info(f"Profiling ({self.mode}) → {self.out_dir}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _children
+        wall = time.perf_counter() - self._started
+        cpu = time.process_time() - self._cpu_started
+        children_cpu = _children_cpu() - self._children_cpu_started
+        children, _children = _children, None
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        # El snapshot de memoria va primero: armar los pstats también asigna memoria
+        if self.mem:
+            written += self._write_mem()
+        if self.cpu:
+            written += self._write_cpu()
+        written.append(self._write_children(children, wall, cpu, children_cpu))
+        logger.info(
+            f"Profiling: {wall:.1f} s de reloj, {cpu:.1f} s de CPU en Python, "
+            f"{children_cpu:.1f} s de CPU en procesos hijos → {', '.join(p.name for p in written)}"
+        )
+
+    # --- salida ---
+
+    def _path(self, suffix: str) -> Path:
+        return self.out_dir / f"{self.prefix}{suffix}"
+
+    def _write_cpu(self) -> list[Path]:
+        import io
+        import pstats
+
+        self._profile.disable()
+        if _PER_THREAD_PROFILES:
+            threading.setprofile(None)
+        self._stop.set()
+        self._sampler.join()
+
+        stats = pstats.Stats(self._profile)
+        with self._lock:
+            for profile in self._thread_profiles:
+                profile.create_stats()
+                if profile.stats:   # threads sin ningún evento perfilado
+                    stats.add(profile)
+        pstats_path = self._path(".pstats")
+        stats.dump_stats(pstats_path)
+
+        text_path = self._path(".cpu.txt")
+        buf = io.StringIO()
+        stats.stream = buf
+        stats.sort_stats("cumulative").print_stats(self.top)
+        text_path.write_text(buf.getvalue(), encoding="utf-8")
+
+        collapsed_path = self._path(".collapsed")
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return [pstats_path, text_path, collapsed_path]
+
+    def _write_mem(self) -> list[Path]:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        snapshot_path = self._path(".mem.snapshot")
+        snapshot.dump(str(snapshot_path))
+
+        lines = [f"Memoria trazada al terminar: {current / 1e6:.1f} MB · pico: {peak / 1e6:.1f} MB", ""]
+        lines.append(f"Top {self.top} por línea:")
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            lines.append(f"  {stat}")
+        lines += ["", "Top 5 por traceback:"]
+        for stat in snapshot.statistics("traceback")[:5]:
+            lines.append(f"  {stat.size / 1e6:.2f} MB en {stat.count} bloque(s)")
+            lines += [f"    {line}" for line in stat.traceback.format()]
+        text_path = self._path(".mem.txt")
+        text_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return [text_path, snapshot_path]
+
+    def _write_children(self, children: _ChildStats, wall: float, cpu: float, children_cpu: float) -> Path:
+        lines = [
+            f"Reloj: {wall:.2f} s",
+            f"CPU en Python (todos los threads): {cpu:.2f} s",
+            f"CPU en procesos hijos: {children_cpu:.2f} s",
+            "",
+            f"{'herramienta':<14} {'llamadas':>8} {'reloj s':>10} {'CPU s':>10}",
+        ]
+        for tool, entry in sorted(children.tools.items(), key=lambda kv: -kv[1]["wall_s"]):
+            lines.append(f"{tool:<14} {entry['calls']:>8} {entry['wall_s']:>10.2f} {entry['cpu_s']:>10.2f}")
+        path = self._path(".children.txt")
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
@@ -0,0 +1,56 @@
+import time
+from typing import Optional
+
+from zoomtube.constants import PROGRESS_LOG_INTERVAL
+from zoomtube.models import TransferStats
+from zoomtube.utils.logger import logger
+
+_ARROWS = {"upload": "⬆", "download": "⬇"}
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1_000_000:.1f}"
+
+
+class TransferProgress:
+    """
+    Muestra el progreso de una transferencia sin inundar el log: como mucho
+    una línea cada `interval` segundos (más la línea final con el resumen).
+    Se llama a update() después de cada chunk; las métricas salen de TransferStats.
+    """
+
+    def __init__(self, stats: TransferStats, label: str, interval: Optional[float] = None):
+        self.stats = stats
+        self.label = label
+        self.interval = PROGRESS_LOG_INTERVAL if interval is None else interval
+        self._last_log = time.monotonic()
+
+    def update(self) -> None:
+        now = time.monotonic()
+        if now - self._last_log < self.interval:
+            return
+        self._last_log = now
+
+        s = self.stats
+        done = s.start_offset + s.bytes_transferred
+        line = f"{_ARROWS.get(s.direction, '')} {self.label}: "
+        if s.total_bytes:
+            line += f"{s.progress:.0%} {_mb(done)}/{_mb(s.total_bytes)} MB"
+        else:
+            line += f"{_mb(done)} MB"
+        line += f" · {s.instant_mbps:.1f} MB/s (prom {s.avg_mbps:.1f})"
+        if s.total_bytes and s.avg_mbps > 0:
+            eta = (s.total_bytes - done) / 1_000_000 / s.avg_mbps
+            line += f" · ETA {eta:.0f}s"
+        logger.info(line, extra={"bytes": done})
+
+    def done(self) -> None:
+        s = self.stats
+        s.finish()
+        ttfb = f"{s.ttfb:.2f}s" if s.ttfb is not None else "-"
+        retries = f", {s.retries} reintento(s)" if s.retries else ""
+        logger.info(
+            f"{_ARROWS.get(s.direction, '')} {self.label}: {_mb(s.bytes_transferred)} MB en "
+            f"{s.elapsed:.1f}s · {s.avg_mbps:.1f} MB/s (pico {s.peak_mbps:.1f}) · TTFB {ttfb}{retries}",
+            extra={"bytes": s.bytes_transferred},
+        )
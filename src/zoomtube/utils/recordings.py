@@ -33,11 +33,14 @@ def get_unique_filename(output_path: Path, base_name: str) -> Path:
     file_path = output_path / base_name
     name, ext = os.path.splitext(base_name)
 
-    while file_path.exists():
-        file_path = output_path / f"{name} ({counter}){ext}"
-        counter += 1
-
-    return file_path
+    while True:
+        try:
+            # Crear el archivo reserva el nombre: dos descargas en paralelo no eligen el mismo
+            file_path.touch(exist_ok=False)
+            return file_path
+        except FileExistsError:
+            file_path = output_path / f"{name} ({counter}){ext}"
+            counter += 1
 
 
 def sanitize_filename(name: str) -> str:
@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import Callable, Iterable, TypeVar
+
+from zoomtube.constants import ORDER_POLICIES
+from zoomtube.utils.logger import logger
+
+T = TypeVar("T")
+
+
+def order(
+    items: Iterable[T],
+    policy: str,
+    size: Callable[[T], int],
+    newest: Callable[[T], str],
+) -> list[T]:
+    """
+    Ordena el trabajo según la política:
+    - "api": como vino (orden de la API de Zoom o del directorio).
+    - "largest": los más grandes primero; con transferencias en paralelo,
+      el archivo más pesado no queda solo al final estirando la corrida.
+    - "smallest": los más chicos primero (más archivos terminados antes).
+    - "newest": los más recientes primero (según newest, comparable como str).
+    """
+    if policy not in ORDER_POLICIES:
+        raise ValueError(f"Política de orden desconocida: {policy}")
+    items = list(items)
+    if policy == "largest":
+        items.sort(key=size, reverse=True)
+    elif policy == "smallest":
+        items.sort(key=size)
+    elif policy == "newest":
+        items.sort(key=newest, reverse=True)
+    return items
+
+
+def priority(policy: str, size: int, timestamp: float) -> float:
+    """
+    Prioridad de un trabajo en la cola (registries.jobs: se toma primero el
+    de mayor prioridad) equivalente al orden de la política.
+    """
+    if policy not in ORDER_POLICIES:
+        raise ValueError(f"Política de orden desconocida: {policy}")
+    if policy == "largest":
+        return float(size)
+    if policy == "smallest":
+        return -float(size)
+    if policy == "newest":
+        return timestamp
+    return 0.0
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class Eta:
+    """
+    Progreso y tiempo restante de un lote de transferencias: el throughput
+    observado (bytes terminados / tiempo desde el inicio, sumando todas las
+    transferencias en paralelo) aplicado a los bytes que faltan.
+    """
+
+    def __init__(self, label: str, files: int, total_bytes: int):
+        self.label = label
+        self.files = files
+        self.total_bytes = total_bytes
+        self.done_files = 0
+        self.done_bytes = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def advance(self, nbytes: int, files: int = 1) -> None:
+        """Registra archivos terminados (o descartados) y loguea el progreso."""
+        if self.files <= 1:
+            return   # un solo archivo: el progreso ya lo loguea la transferencia
+        with self._lock:
+            self.done_files += files
+            self.done_bytes += nbytes
+            done_files, done_bytes = self.done_files, self.done_bytes
+        elapsed = time.monotonic() - self._started
+        rate = done_bytes / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total_bytes - done_bytes, 0)
+        eta = f" · ETA {_format_eta(remaining / rate)}" if rate > 0 and remaining else ""
+        logger.info(
+            f"{self.label}: {done_files}/{self.files} archivo(s), "
+            f"{done_bytes / 1e9:.2f}/{self.total_bytes / 1e9:.2f} GB, {rate / 1e6:.1f} MB/s{eta}"
+        )
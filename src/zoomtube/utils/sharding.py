@@ -0,0 +1,83 @@
+import hashlib
+from typing import Optional
+
+from zoomtube.constants import SHARD_KEYS
+
+
+class Shard:
+    """
+    Parte i de N de una cuenta de Zoom (i empieza en 0). Cada clave (id de
+    usuario o uuid de reunión) va a un solo shard según su hash, igual en
+    cualquier proceso o host: N procesos con --shard 0/N … N-1/N se reparten
+    la cuenta sin pisarse ni dejar nada afuera.
+    """
+
+    def __init__(self, index: int, count: int, by: str = "user"):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Shard inválido: {index}/{count} (se espera 0 <= i < N)")
+        if by not in SHARD_KEYS:
+            raise ValueError(f"Clave de shard desconocida: {by}")
+        self.index = index
+        self.count = count
+        self.by = by
+
+    @classmethod
+    def parse(cls, spec: str, by: str = "user") -> "Shard":
+        """Interpreta "i/N" (ej: "0/4")."""
+        try:
+            index, count = (int(part) for part in spec.split("/"))
+        except ValueError:
+            raise ValueError(f"Shard inválido: {spec!r} (formato i/N, ej: 0/4)") from None
+        return cls(index, count, by)
+
+    @property
+    def name(self) -> str:
+        """Nombre de la subcarpeta de estado y de descargas del shard."""
+        return f"shard-{self.index}-of-{self.count}"
+
+    def owns(self, key) -> bool:
+        # sha1 y no hash(): hash() de str cambia entre procesos (PYTHONHASHSEED)
+        digest = hashlib.sha1(str(key).encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index
+
+    def __repr__(self) -> str:
+        return f"Shard({self.index}/{self.count}, by={self.by})"
+
+
+def _user_filter() -> Optional[set[str]]:
+    from zoomtube import config
+
+    users = config.ZOOM_USERS
+    return {u.lower() for u in users} if users else None
+
+
+def wants_user(user: dict) -> bool:
+    """
+    Si hay que procesar las grabaciones de un usuario: está en ZOOM_USERS
+    (por id o email, si hay filtro) y, con un shard por usuario, le toca a
+    este shard.
+    """
+    from zoomtube import config
+
+    wanted = _user_filter()
+    if wanted is not None and not {
+        str(user.get(k) or "").lower() for k in ("id", "email")
+    } & wanted:
+        return False
+    shard = config.SHARD
+    return shard is None or shard.by != "user" or shard.owns(user.get("id"))
+
+
+def select_users(users: list[dict]) -> list[dict]:
+    """Los usuarios de la cuenta que le tocan a este proceso (ver wants_user)."""
+    return [user for user in users if wants_user(user)]
+
+
+def owns_meeting(meeting: dict) -> bool:
+    """Con un shard por reunión, si la reunión le toca a este shard (por uuid)."""
+    from zoomtube import config
+
+    shard = config.SHARD
+    if shard is None or shard.by != "meeting":
+        return True
+    return shard.owns(meeting.get("uuid") or meeting.get("id"))
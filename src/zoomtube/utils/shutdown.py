@@ -0,0 +1,39 @@
+import signal
+import threading
+
+from zoomtube.utils.logger import logger
+
+
+class GracefulShutdown:
+    """
+    SIGINT/SIGTERM para los modos de larga duración (watch, serve): la primera
+    señal pide terminar después del trabajo en curso (el estado queda guardado);
+    la segunda corta ya. Una subida cortada se retoma en la próxima corrida
+    desde su sesión resumable.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.event = threading.Event()
+        self._previous = {}
+
+    def __enter__(self):
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                self._previous[sig] = signal.signal(sig, self._handle)
+        return self
+
+    def __exit__(self, *exc):
+        for sig, handler in self._previous.items():
+            signal.signal(sig, handler)
+        return False
+
+    def _handle(self, signum, frame):
+        if self.event.is_set():
+            raise KeyboardInterrupt
+        logger.warning(f"Deteniendo {self.name} al terminar el trabajo en curso (otra señal corta ya)")
+        self.event.set()
+
+    @property
+    def requested(self) -> bool:
+        return self.event.is_set()
@@ -0,0 +1,79 @@
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from zoomtube.registries import downloads
+from zoomtube.utils.logger import logger
+from zoomtube.utils import metrics as prom
+
+
+class StagingArea:
+    """
+    Presupuesto de disco para las descargas que todavía no se subieron.
+
+    Antes de cada descarga se reserva su tamaño (file_size de Zoom); si no
+    entra en el presupuesto, reserve() bloquea hasta que alguna subida termine
+    y libere su reserva (backpressure). Un archivo más grande que todo el
+    presupuesto pasa solo, cuando no hay nada más reservado.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget = budget_bytes
+        self._reserved: Dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    @property
+    def used(self) -> int:
+        return sum(self._reserved.values())
+
+    def reserve(self, path, nbytes: int) -> None:
+        """Reserva nbytes para path, esperando si el presupuesto está agotado."""
+        with self._cond:
+            if self._reserved and self.used + nbytes > self.budget:
+                logger.info(
+                    f"Staging lleno ({self.used / 1e9:.2f}/{self.budget / 1e9:.2f} GB): "
+                    f"esperando subidas antes de descargar {Path(path).name}"
+                )
+                while self._reserved and self.used + nbytes > self.budget:
+                    self._cond.wait()
+            self._reserved[str(path)] = nbytes
+            prom.STAGING_RESERVED.set(self.used)
+
+    def release(self, path) -> None:
+        """Libera la reserva de path (subido, descartado o fallido)."""
+        with self._cond:
+            if self._reserved.pop(str(path), None) is not None:
+                prom.STAGING_RESERVED.set(self.used)
+                self._cond.notify_all()
+
+
+def dispose(path, action: str, archive_dir: Optional[str] = None) -> Optional[Path]:
+    """
+    Aplica la política post-subida a un archivo ya subido:
+    - "keep": no hace nada.
+    - "delete": lo borra.
+    - "archive": lo mueve a archive_dir/<carpeta del día>/.
+    Registra la acción en downloads.json. Devuelve el destino si se archivó.
+    """
+    path = Path(path)
+    if action == "keep" or not path.exists():
+        return None
+
+    if action == "delete":
+        path.unlink()
+        downloads.register_disposal(str(path), "deleted")
+        prom.DISPOSALS.inc(action="deleted")
+        return None
+
+    if action == "archive":
+        if not archive_dir:
+            raise ValueError("archive requiere archive_dir")
+        dest_dir = Path(archive_dir) / path.parent.name
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        dest = Path(shutil.move(str(path), str(dest_dir / path.name)))
+        downloads.register_disposal(str(path), "archived", str(dest))
+        prom.DISPOSALS.inc(action="archived")
+        return dest
+
+    raise ValueError(f"Acción post-subida desconocida: {action}")
@@ -0,0 +1,178 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from zoomtube.utils.logger import logger
+
+
+class Span:
+    """Tramo de tiempo con nombre y atributos (ej: meeting_id, file_type, bytes)."""
+
+    __slots__ = ("name", "attrs", "start", "end", "tid")
+
+    def __init__(self, name: str, attrs: dict, tid: int):
+        self.name = name
+        self.attrs = attrs
+        self.tid = tid
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    def set(self, **attrs) -> None:
+        """Agrega atributos mientras el span está abierto (ej: bytes al terminar)."""
+        self.attrs.update(attrs)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+
+class Tracer:
+    """
+    Spans anidados (por thread), exportables en formato Chrome trace
+    (chrome://tracing, Perfetto) y resumibles en una tabla por etapa.
+    Son baratos (un perf_counter y un append por span), así que están
+    siempre activos.
+    """
+
+    def __init__(self):
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._listeners: List[Callable[[Span], None]] = []
+        self._local = threading.local()
+
+    def add_listener(self, fn: Callable[[Span], None]) -> None:
+        """Registra una función que recibe cada span al cerrarse (ej: métricas)."""
+        self._listeners.append(fn)
+
+    def open_spans(self) -> List[Span]:
+        """Spans abiertos del thread actual, del más externo al más interno."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        s = Span(name, attrs, threading.get_ident())
+        stack = self.open_spans()
+        stack.append(s)
+        try:
+            yield s
+        except BaseException as e:
+            s.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            s.end = time.perf_counter()
+            stack.remove(s)
+            with self._lock:
+                self._spans.append(s)
+            for fn in self._listeners:
+                fn(s)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._origin = time.perf_counter()
+
+    def export_chrome(self, path) -> Path:
+        """Guarda los spans como Chrome trace (eventos "X" con ts/dur en µs)."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": s.name,
+                "ph": "X",
+                "ts": round((s.start - self._origin) * 1e6, 1),
+                "dur": round(s.duration * 1e6, 1),
+                "pid": pid,
+                "tid": s.tid,
+                "args": {k: v if isinstance(v, (int, float, bool)) or v is None else str(v)
+                         for k, v in s.attrs.items()},
+            }
+            for s in self.spans()
+        ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+    def summary(self) -> List[Dict]:
+        """
+        Agrega los spans por nombre: cantidad, total, promedio, máximo y bytes.
+        Ordena por el primer inicio de cada etapa (orden del pipeline). Los spans
+        anidados se cuentan también dentro del total de sus padres.
+        """
+        rows: Dict[str, Dict] = {}
+        for s in sorted(self.spans(), key=lambda s: s.start):
+            row = rows.setdefault(s.name, {"name": s.name, "count": 0, "total": 0.0, "max": 0.0,
+                                           "bytes": 0, "errors": 0})
+            row["count"] += 1
+            row["total"] += s.duration
+            row["max"] = max(row["max"], s.duration)
+            row["bytes"] += s.attrs.get("bytes") or 0
+            row["errors"] += "error" in s.attrs
+        return list(rows.values())
+
+    def log_summary(self) -> None:
+        """Loguea la tabla de tiempos por etapa."""
+        rows = self.summary()
+        if not rows:
+            return
+        lines = [f"{'etapa':<28} {'n':>5} {'total s':>9} {'prom ms':>9} {'máx ms':>9} {'MB':>8}"]
+        for r in rows:
+            mb = f"{r['bytes'] / 1_000_000:.1f}" if r["bytes"] else ""
+            errors = f"  ({r['errors']} con error)" if r["errors"] else ""
+            lines.append(
+                f"{r['name']:<28} {r['count']:>5} {r['total']:>9.2f} "
+                f"{r['total'] / r['count'] * 1000:>9.1f} {r['max'] * 1000:>9.1f} {mb:>8}{errors}"
+            )
+        logger.info("Tiempos por etapa:\n" + "\n".join(lines))
+
+
+# Tracer por defecto del proceso
+tracer = Tracer()
+span = tracer.span
+
+
+def _log_context(record) -> bool:
+    """
+    Filtro del logger: completa stage (span más interno), meeting_id y
+    file_type (del span abierto más cercano que los tenga) en cada registro
+    logueado dentro de un span, salvo que ya vengan por extra=.
+    """
+    stack = tracer.open_spans()
+    if stack:
+        if not hasattr(record, "stage"):
+            record.stage = stack[-1].name
+        for key in ("meeting_id", "file_type"):
+            if hasattr(record, key):
+                continue
+            for s in reversed(stack):
+                if key in s.attrs:
+                    setattr(record, key, s.attrs[key])
+                    break
+    return True
+
+
+logger.addFilter(_log_context)
+
+
+def traced(name: str):
+    """Decorador: registra cada llamada a la función como un span `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator